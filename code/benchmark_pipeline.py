@@ -0,0 +1,451 @@
+import os
+import sys
+import json
+import shutil
+import platform
+import argparse
+import tempfile
+import tracemalloc
+from datetime import datetime, timezone
+import file_management as fm
+import event_description_generator as edg
+import split_ground_truth as sgt
+import id_allocators as ia
+import triple_file as tf
+import synthetic_ground_truth as sgen
+import change_predicates as cp
+import auxiliary_functions as af
+import pipeline_report as pr
+
+# Historique local des mesures, non versionné : les durées dépendent de la machine et de la révision mesurée
+DEFAULT_RESULTS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "benchmarks", "pipeline_results.jsonl")
+DEFAULT_SIZES = [10_000, 1_000_000]
+STAGES = ["read_csv", "simple", "bert_simple", "complex", "serialize", "write_jsonl", "write_triples", "split"]
+MB = 1 << 20
+
+def synthetic_input(n_rows: int, cache_dir: str, seed: int = 0) -> str:
+    """
+    Chemin d'une vérité terrain synthétique de `n_rows` lignes, générée une seule fois puis conservée dans `cache_dir`.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    path = os.path.join(cache_dir, f"ground_truth_{n_rows}_{seed}.csv")
+    if not os.path.exists(path):
+        sgen.write_synthetic_ground_truth(path + ".tmp", n_rows, seed=seed)
+        os.replace(path + ".tmp", path)
+    return path
+
+def run_benchmark(in_path: str, work_dir: str, id_mode: str = "uuid5") -> dict:
+    """
+    Exécute les étapes de prepare_dataset.py une par une sur `in_path` et mesure la durée de chacune.
+    Les étapes de génération (simple, simple pour BERT, complexe) et de sérialisation sont mesurées séparément
+    sur l'ensemble du fichier, ce qui demande plus de mémoire que le pipeline par lots.
+
+    Returns:
+        dict: Durée (secondes) et pic de mémoire résidente (octets) de chaque étape, taille des fichiers produits.
+    """
+    report = pr.PipelineReport()
+
+    def timed(stage, function, *args, **kwargs):
+        with report.stage(stage):
+            return function(*args, **kwargs)
+
+    jsonl_paths = [os.path.join(work_dir, f"{name}_ground_truth.jsonl") for name in ["simple", "bert_simple", "complex"]]
+    triple_paths = [os.path.splitext(path)[0] + ".triples" for path in jsonl_paths]
+    id_allocator = ia.get_id_allocator(id_mode)
+
+    df = timed("read_csv", edg.read_ground_truth, in_path, separator="\t")
+    simple = timed("simple", edg.create_simple_event_table, df)
+    bert_simple = timed("bert_simple", simple.to_bert_simple)
+    complex_ = timed("complex", edg.create_complex_event_table, df, id_allocator)
+    tables = [simple, bert_simple, complex_]
+    lines = timed("serialize", lambda: [table.to_json_lines() for table in tables])
+
+    def write_jsonl():
+        for table_lines, path in zip(lines, jsonl_paths):
+            fm.write_jsonl(table_lines, path, encoded=True)
+
+    def write_triples():
+        for table, path in zip(tables, triple_paths):
+            tf.write_triple_file([table], path)
+
+    timed("write_jsonl", write_jsonl)
+    timed("write_triples", write_triples)
+    timed("split", sgt.split_jsonl_files, jsonl_paths[::-1], output_dir=work_dir, train_ratio=0.8, val_ratio=0.1, test_ratio=0.1)
+
+    seconds = {entry["name"]: entry["seconds"] for entry in report.stages}
+    return {
+        "rows": len(df),
+        "events": simple.n_events,
+        "triples": [len(table) for table in tables],
+        "seconds": seconds,
+        "total_seconds": round(sum(seconds.values()), 4),
+        "peak_rss": {entry["name"]: entry["peak_rss"] for entry in report.stages},
+        "bytes": {
+            "input": os.path.getsize(in_path),
+            "jsonl": sum(os.path.getsize(path) for path in jsonl_paths),
+            "triples": sum(os.path.getsize(path) for path in triple_paths),
+        },
+    }
+
+def _measured_stages(report: pr.PipelineReport) -> dict:
+    return {entry["name"]: {"seconds": entry["seconds"], "peak_rss": entry["peak_rss"]} for entry in report.stages}
+
+def repeat_jsonl(source_path: str, out_path: str, target_bytes: int) -> int:
+    """
+    Écrit dans `out_path` les lignes de `source_path` répétées jusqu'à atteindre environ `target_bytes` octets.
+
+    Returns:
+        int: Taille du fichier produit.
+    """
+    with open(source_path, "rb") as f:
+        block = f.read()
+    if block and not block.endswith(b"\n"):
+        block += b"\n"
+    with open(out_path, "wb") as f:
+        while block and f.tell() < target_bytes:
+            f.write(block)
+        return f.tell()
+
+def benchmark_split(in_path: str, work_dir: str, target_gb: float = 2.0, in_memory: bool = True) -> dict:
+    """
+    Compare split_jsonl_streaming() et split_jsonl() sur un fichier JSONL d'environ `target_gb` Go,
+    formé des descriptions complexes de `in_path` répétées.
+
+    Returns:
+        dict: Durée, débit (Mo/s) et pic de mémoire résidente de chaque méthode.
+    """
+    source_path = os.path.join(work_dir, "complex_ground_truth.jsonl")
+    df = edg.read_ground_truth(in_path, separator="\t")
+    fm.write_jsonl(edg.create_complex_event_table(df, ia.get_id_allocator("uuid5")).to_json_lines(), source_path, encoded=True)
+    del df
+    split_path = os.path.join(work_dir, "split.jsonl")
+    size = repeat_jsonl(source_path, split_path, int(target_gb * (1 << 30)))
+    os.remove(source_path)
+
+    report = pr.PipelineReport()
+    methods = [("split_jsonl_streaming", sgt.split_jsonl_streaming)] + ([("split_jsonl", sgt.split_jsonl)] if in_memory else [])
+    for name, split in methods:
+        with report.stage(name):
+            split(split_path, work_dir)
+    stages = _measured_stages(report)
+    return {
+        "bytes": size,
+        "seconds": {name: stage["seconds"] for name, stage in stages.items()},
+        "measures": {
+            **{f"{name} Mo/s": round(size / MB / stage["seconds"], 1) for name, stage in stages.items()},
+            **{f"{name} pic Mo": round(stage["peak_rss"] / MB) for name, stage in stages.items() if stage["peak_rss"]},
+        },
+    }
+
+def benchmark_workers(in_path: str, work_dir: str, workers=(1, 2, 4, 8), batch_size: int = 20_000) -> dict:
+    """
+    Mesure la génération des trois versions (iter_event_tables) avec 1, 2, 4 et 8 processus de travail.
+    Les lots de `batch_size` lignes sont répartis entre les processus : il en faut plusieurs par processus.
+
+    Returns:
+        dict: Durée, débit (événements/s) et accélération par rapport à un seul processus.
+    """
+    df = edg.read_ground_truth(in_path, separator="\t")
+    id_allocator = ia.get_id_allocator("uuid5")
+    report = pr.PipelineReport()
+    events = 0
+    for n in workers:
+        with report.stage(f"workers={n}"):
+            events = sum(tables[0].n_events for tables in edg.iter_event_tables(df, batch_size=batch_size, workers=n,
+                                                                                 id_allocator=id_allocator))
+    seconds = {entry["name"]: entry["seconds"] for entry in report.stages}
+    first = seconds[f"workers={workers[0]}"]
+    return {
+        "rows": len(df),
+        "events": events,
+        "cpus": os.cpu_count(),
+        "seconds": seconds,
+        "measures": {
+            **{f"{name} évén./s": round(events / value) for name, value in seconds.items()},
+            **{f"{name} accélération": round(first / value, 2) for name, value in seconds.items()},
+        },
+    }
+
+def _rule_scan(rules, change_type, change_on, attribute_type=None):
+    """
+    Ancienne recherche des prédicats, conservée pour comparaison : la liste des règles et le dict des conditions
+    sont reconstruits à chaque appel, puis les règles sont parcourues dans l'ordre.
+    """
+    rules = [(dict(conditions), dict(predicates)) for conditions, predicates in rules]
+    for conditions, predicates in rules:
+        if all(conditions.get(k) == v for k, v in {"change_type": change_type, "change_on": change_on,
+                                                    "attribute_type": attribute_type}.items() if k in conditions):
+            return predicates
+    return None
+
+def benchmark_predicates(in_path: str, work_dir: str) -> dict:
+    """
+    Micro-mesure de la recherche des prédicats de changement sur les lignes de `in_path` : parcours linéaire des règles
+    (ancienne version), index précompilé ligne par ligne (get_change_predicates) et recherche colonnaire (lookup_columns).
+
+    Returns:
+        dict: Durée totale et coût par ligne (µs) de chaque méthode.
+    """
+    df = edg.read_ground_truth(in_path, separator="\t")
+    columns = [df[column].astype(object).where(df[column].notna(), None).to_numpy() for column in cp.CONDITION_COLUMNS]
+    rows = list(zip(*columns))
+    index = cp.load_change_predicate_index()
+
+    report = pr.PipelineReport()
+    with report.stage("rule_scan"):
+        scanned = [_rule_scan(index.rules, *row) for row in rows]
+    with report.stage("lookup"):
+        looked_up = [edg.get_change_predicates(*row) for row in rows]
+    with report.stage("lookup_columns"):
+        index.lookup_columns(*columns)
+    assert scanned == looked_up, "L'index ne donne pas les mêmes prédicats que le parcours des règles"
+
+    seconds = {entry["name"]: entry["seconds"] for entry in report.stages}
+    return {
+        "rows": len(rows),
+        "seconds": seconds,
+        "measures": {f"{name} µs/ligne": round(value / len(rows) * 1e6, 3) for name, value in seconds.items()},
+    }
+
+def benchmark_triple_table(in_path: str, work_dir: str) -> dict:
+    """
+    Compare les triplets simples et complexes de `in_path` sous forme de TripleTable et de dicts {"sub", "rel", "obj"} :
+    mémoire occupée (tracemalloc pour les dicts) et durée de la suppression des doublons de chaque événement
+    (auxiliary_functions.deduplicate_triples contre TripleTable.deduplicate).
+
+    Returns:
+        dict: Durées de suppression des doublons, tailles (Mo) et rapports de taille.
+    """
+    df = edg.read_ground_truth(in_path, separator="\t")
+    tables = {"simple": edg.create_simple_event_table(df), "complex": edg.create_complex_event_table(df, ia.get_id_allocator("uuid5"))}
+    report = pr.PipelineReport()
+    measures = {}
+    for name, table in tables.items():
+        tracemalloc.start()
+        descriptions = table.to_descriptions()
+        dict_bytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        with report.stage(f"{name} dedup dicts"):
+            deduplicated = sum(len(af.deduplicate_triples(description["triples"])) for description in descriptions)
+        with report.stage(f"{name} dedup table"):
+            assert len(table.deduplicate()) == deduplicated
+        measures.update({f"{name} triplets": len(table), f"{name} dicts Mo": round(dict_bytes / MB, 1),
+                         f"{name} table Mo": round(table.nbytes / MB, 1), f"{name} rapport": round(dict_bytes / table.nbytes, 1)})
+        del descriptions
+    return {
+        "rows": len(df),
+        "seconds": {entry["name"]: entry["seconds"] for entry in report.stages},
+        "measures": measures,
+    }
+
+def benchmark_jsonl(in_path: str, work_dir: str) -> dict:
+    """
+    Débit (Mo/s) de l'écriture et de la lecture JSONL des descriptions complexes de `in_path` pour chaque backend
+    JSON installé (file_management.JSON_BACKENDS), comparé à l'écriture d'origine (json.dump puis un retour à la ligne
+    pour chaque enregistrement).
+
+    Returns:
+        dict: Durées et débits de chaque méthode.
+    """
+    df = edg.read_ground_truth(in_path, separator="\t")
+    records = edg.create_complex_event_table(df, ia.get_id_allocator("uuid5")).to_descriptions()
+    del df
+    path = os.path.join(work_dir, "complex_ground_truth.jsonl")
+
+    def write_per_record():
+        with open(path, "w", encoding="utf-8") as f:
+            for record in records:
+                json.dump(record, f, ensure_ascii=False)
+                f.write("\n")
+
+    report = pr.PipelineReport()
+    sizes = {}
+    with report.stage("write json.dump"):
+        write_per_record()
+    sizes["write json.dump"] = os.path.getsize(path)
+    for backend in fm.JSON_BACKENDS:
+        with report.stage(f"write {backend}"):
+            fm.write_jsonl(records, path, backend=backend)
+        sizes[f"write {backend}"] = sizes[f"read {backend}"] = os.path.getsize(path)
+        with report.stage(f"read {backend}"):
+            assert sum(1 for _ in fm.iter_jsonl(path, backend=backend)) == len(records)
+
+    seconds = {entry["name"]: entry["seconds"] for entry in report.stages}
+    return {
+        "rows": len(records),
+        "seconds": seconds,
+        "measures": {**{f"{name} Mo/s": round(sizes[name] / MB / value, 1) for name, value in seconds.items()},
+                     **{f"{name} Mo": round(sizes[name] / MB, 1) for name in sizes if name.startswith("write")}},
+    }
+
+def benchmark_schema(in_path: str, work_dir: str) -> dict:
+    """
+    Compare la lecture de `in_path` sans schéma (toutes les colonnes, types déduits, puis copie df.where(pd.notna(df), None)
+    comme avant le schéma) et avec le schéma de la vérité terrain (edg.read_ground_truth) : durée, pic de mémoire
+    résidente et taille du DataFrame.
+
+    Returns:
+        dict: Durées, pics de mémoire et tailles (Mo) des deux lectures.
+    """
+    report = pr.PipelineReport()
+    frames = {}
+    with report.stage("untyped"):
+        df = fm.read_csv_as_dataframe(in_path, separator="\t")
+        frames["untyped"] = df.where(df.notna(), None)
+        del df
+    untyped_bytes = frames.pop("untyped").memory_usage(deep=True).sum()
+    with report.stage("typed"):
+        frames["typed"] = edg.read_ground_truth(in_path, separator="\t")
+    typed_bytes = frames["typed"].memory_usage(deep=True).sum()
+
+    stages = _measured_stages(report)
+    return {
+        "rows": len(frames["typed"]),
+        "seconds": {name: stage["seconds"] for name, stage in stages.items()},
+        "measures": {
+            "untyped DataFrame Mo": round(untyped_bytes / MB, 1),
+            "typed DataFrame Mo": round(typed_bytes / MB, 1),
+            **{f"{name} pic Mo": round(stage["peak_rss"] / MB) for name, stage in stages.items() if stage["peak_rss"]},
+        },
+    }
+
+# Mesures disponibles (--suite) : chacune est appelée avec la vérité terrain synthétique, un dossier de travail
+# temporaire et ses options, et retourne un dict {"seconds": ..., "measures": ...}
+SUITES = {
+    "pipeline": run_benchmark,
+    "split": benchmark_split,
+    "workers": benchmark_workers,
+    "predicates": benchmark_predicates,
+    "triple_table": benchmark_triple_table,
+    "jsonl": benchmark_jsonl,
+    "schema": benchmark_schema,
+}
+
+def record_result(result: dict, results_path: str = DEFAULT_RESULTS_PATH):
+    """
+    Ajoute un résultat à la fin du fichier d'historique des mesures (une ligne JSON par exécution).
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(results_path)), exist_ok=True)
+    with open(results_path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(result, ensure_ascii=False) + "\n")
+
+def benchmark_sizes(sizes=DEFAULT_SIZES, cache_dir: str = None, results_path: str = DEFAULT_RESULTS_PATH, seed: int = 0,
+                    id_mode: str = "uuid5", label: str = None, suite: str = "pipeline", **options):
+    """
+    Mesure le pipeline (ou l'une des autres mesures de SUITES) pour chaque taille de vérité terrain synthétique
+    et enregistre les résultats dans l'historique.
+
+    Args:
+        sizes (list): Nombres de lignes des fichiers synthétiques (ex. 10 000, 1 000 000, 10 000 000).
+        cache_dir (str): Dossier où les fichiers synthétiques sont conservés d'une exécution à l'autre.
+        results_path (str): Fichier d'historique (JSONL) ; None pour ne rien enregistrer.
+        seed (int): Graine de la génération des données synthétiques.
+        id_mode (str): Mode d'allocation des identifiants (voir id_allocators.py).
+        label (str): Libellé libre associé aux mesures (ex. nom de la modification évaluée).
+        suite (str): Mesure effectuée (voir SUITES).
+        **options: Paramètres propres à la mesure (ex. target_gb pour "split").
+
+    Returns:
+        list: Les résultats, un par taille.
+    """
+    cache_dir = cache_dir or os.path.join(tempfile.gettempdir(), "ground_truth_benchmark")
+    results = []
+    for n_rows in sizes:
+        in_path = synthetic_input(n_rows, cache_dir, seed)
+        work_dir = tempfile.mkdtemp(prefix="benchmark_")
+        try:
+            result = run_benchmark(in_path, work_dir, id_mode) if suite == "pipeline" else SUITES[suite](in_path, work_dir, **options)
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+        result = {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "revision": pr.git_revision(),
+            "label": label,
+            "suite": suite,
+            "size": n_rows,
+            "seed": seed,
+            "id_mode": id_mode,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            **result,
+        }
+        if suite == "pipeline":
+            result["rows_per_second"] = round(result["rows"] / result["total_seconds"]) if result["total_seconds"] else None
+        if results_path:
+            record_result(result, results_path)
+        results.append(result)
+        print(format_result(result) if suite == "pipeline" else format_measures(result))
+    return results
+
+def format_measures(result: dict) -> str:
+    """
+    Tableau lisible des durées et des mesures d'une mesure autre que "pipeline".
+    """
+    header = f"{result['suite']} — {result['size']} lignes — révision {result.get('revision')}"
+    if "cpus" in result:
+        header += f" — {result['cpus']} processeurs"
+    lines = [header]
+    lines += [f"  {name:<32}{seconds:>10.3f} s" for name, seconds in result["seconds"].items()]
+    lines += [f"  {name:<32}{value:>10}" for name, value in result["measures"].items()]
+    return "\n".join(lines)
+
+def format_result(result: dict, previous: dict = None) -> str:
+    """
+    Tableau lisible des durées par étape, avec l'écart relatif à une mesure précédente si elle est fournie.
+    """
+    header = f"{result['size']} lignes ({result['events']} événements) — révision {result.get('revision')}"
+    lines = [header]
+    for stage in STAGES + ["total"]:
+        seconds = result["total_seconds"] if stage == "total" else result["seconds"].get(stage)
+        if seconds is None:
+            continue
+        line = f"  {stage:<14}{seconds:>10.3f} s"
+        if previous:
+            before = previous["total_seconds"] if stage == "total" else previous["seconds"].get(stage)
+            if before:
+                line += f"  ({(seconds - before) / before:+.1%} par rapport à {previous.get('revision')})"
+        lines.append(line)
+    lines.append(f"  {'lignes/s':<14}{result['rows_per_second']:>10}")
+    return "\n".join(lines)
+
+def compare_results(results_path: str = DEFAULT_RESULTS_PATH, size: int = None) -> str:
+    """
+    Compare, pour chaque taille, la dernière mesure enregistrée à la précédente.
+    """
+    if not os.path.exists(results_path):
+        return "Aucune mesure enregistrée"
+    by_size = {}
+    for result in fm.iter_jsonl(results_path):
+        if result.get("suite", "pipeline") == "pipeline" and (size is None or result["size"] == size):
+            by_size.setdefault(result["size"], []).append(result)
+    reports = [format_result(history[-1], history[-2] if len(history) > 1 else None) for _, history in sorted(by_size.items())]
+    return "\n\n".join(reports) or "Aucune mesure enregistrée"
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mesure les étapes de prepare_dataset.py sur des vérités terrain synthétiques.")
+    parser.add_argument("sizes", type=int, nargs="*", default=DEFAULT_SIZES, help="Nombres de lignes (ex. 10000 1000000 10000000)")
+    parser.add_argument("--suite", default="pipeline", choices=list(SUITES),
+                        help="pipeline : étapes de prepare_dataset.py ; split : découpage en flux et en mémoire d'un gros fichier JSONL ; "
+                             "workers : génération avec plusieurs processus ; predicates : recherche des prédicats de changement ; "
+                             "triple_table : mémoire et dédoublonnage des triplets ; jsonl : débit de lecture et d'écriture JSONL ; "
+                             "schema : lecture de la vérité terrain avec et sans schéma")
+    parser.add_argument("--split-gb", type=float, default=2.0, help="Taille du fichier JSONL découpé (Go, --suite split)")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8], help="Nombres de processus mesurés (--suite workers)")
+    parser.add_argument("--batch-size", type=int, default=20_000, help="Lignes par lot de génération (--suite workers)")
+    parser.add_argument("--no-in-memory", action="store_true", help="Ne pas mesurer split_jsonl, qui charge le fichier en mémoire (--suite split)")
+    parser.add_argument("--results", default=DEFAULT_RESULTS_PATH, help="Fichier d'historique des mesures (JSONL)")
+    parser.add_argument("--cache-dir", default=None, help="Dossier de conservation des fichiers synthétiques")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--id-mode", default="uuid5", choices=["uuid5", "counter", "random"])
+    parser.add_argument("--label", default=None, help="Libellé associé aux mesures")
+    parser.add_argument("--no-record", action="store_true", help="Ne pas enregistrer les mesures dans l'historique")
+    parser.add_argument("--compare", action="store_true", help="Afficher la comparaison des deux dernières mesures et quitter")
+    args = parser.parse_args()
+
+    if args.compare:
+        print(compare_results(args.results))
+        sys.exit(0)
+    options = {"split": {"target_gb": args.split_gb, "in_memory": not args.no_in_memory},
+               "workers": {"workers": args.workers, "batch_size": args.batch_size}}.get(args.suite, {})
+    benchmark_sizes(args.sizes, args.cache_dir, None if args.no_record else args.results, args.seed, args.id_mode, args.label,
+                    args.suite, **options)
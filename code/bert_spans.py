@@ -0,0 +1,338 @@
+import os
+import json
+import argparse
+import unicodedata
+from collections import Counter, deque
+from itertools import islice
+from typing import Dict, List, Optional
+import file_management as fm
+import auxiliary_functions as af
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data")
+SPLITS = ["train", "val", "test"]
+# Nombre d'événements dont les entités sont recherchées avec un même automate
+BATCH_SIZE = 10_000
+
+# Type de l'objet selon la relation (le sujet est un repère, sauf pour isLandmarkTypeOf)
+OBJECT_TYPES = {"isLandmarkType": "landmark_type", "hasOldName": "name", "hasNewName": "name"}
+SUBJECT_TYPES = {"isLandmarkTypeOf": "landmark_type"}
+# Caractères remplacés avant la recherche (apostrophes et tirets typographiques)
+_CHAR_REPLACEMENTS = {"’": "'", "‘": "'", "ʼ": "'", "‐": "-", "‑": "-", "–": "-", "—": "-"}
+# Valeurs conventionnelles absentes du texte (date inconnue) : ni recherchées, ni comptées comme introuvables
+PLACEHOLDER_VALUES = {"noTime"}
+
+def entity_type(rel: str, position: str) -> str:
+    """
+    Type de l'entité en position "sub" ou "obj" d'un triplet BERT simple : "landmark", "landmark_type",
+    "name" ou "time" (objet des relations de date, dont le nom se termine par "On").
+    """
+    if position == "sub":
+        return SUBJECT_TYPES.get(rel, "landmark")
+    if rel in OBJECT_TYPES:
+        return OBJECT_TYPES[rel]
+    if rel == "isLandmarkTypeOf":
+        return "landmark"
+    return "time" if rel.endswith("On") or rel == "hasTime" else "landmark"
+
+def _normalize_char(char: str) -> str:
+    char = _CHAR_REPLACEMENTS.get(char, char)
+    if char.isspace():
+        return " "
+    if char.isascii():
+        return char.lower()
+    return "".join(c for c in unicodedata.normalize("NFD", char.lower()) if not unicodedata.combining(c))
+
+class _NormalizationTable(dict):
+    """
+    Table de str.translate() complétée à la demande : code d'un caractère -> caractère(s) normalisé(s).
+    Les caractères qui ne donnent pas exactement un caractère (ex. un accent seul) sont retenus dans `irregular`.
+    """
+    def __init__(self):
+        super().__init__()
+        self.irregular = set()
+
+    def __missing__(self, code):
+        value = self[code] = _normalize_char(chr(code))
+        if len(value) != 1:
+            self.irregular.add(chr(code))
+        return value
+
+_table = _NormalizationTable()
+
+def normalize_with_offsets(text: str):
+    """
+    Normalise un texte pour la recherche (minuscules, sans accents, apostrophes et tirets simples,
+    espaces consécutifs réduits à un seul) en conservant, pour chaque caractère normalisé,
+    la position du caractère d'origine dont il provient.
+
+    Returns:
+        tuple: Texte normalisé et positions dans le texte d'origine (une liste, ou range() si chaque caractère
+            normalisé est à la même position que le caractère d'origine, cas le plus fréquent).
+    """
+    normalized = text.translate(_table)
+    if len(normalized) == len(text) and "  " not in normalized and _table.irregular.isdisjoint(text):
+        return normalized, range(len(text))
+
+    chars, offsets = [], []
+    for position, char in enumerate(text):
+        normalized = _table[ord(char)]
+        if normalized == " " and chars and chars[-1] == " ":
+            continue
+        chars.extend(normalized)
+        offsets.extend([position] * len(normalized))
+    return "".join(chars), offsets
+
+def normalize_text(text: str) -> str:
+    return normalize_with_offsets(text)[0].strip()
+
+def entity_aliases(value: str, type_: str) -> List[str]:
+    """
+    Formes sous lesquelles une entité peut apparaître dans la phrase : la valeur elle-même et,
+    pour une date ISO, la date en langage naturel (« 27 juillet 1930 », « 1er janvier 1900 »).
+    """
+    aliases = [value]
+    if type_ == "time":
+        natural = af.date_to_french_natural(value)
+        if natural != value:
+            aliases.append(natural)
+            if natural.startswith("1 "):
+                aliases.append("1er " + natural[2:])
+    return aliases
+
+class MultiPatternMatcher:
+    """
+    Automate d'Aho-Corasick : trouve en un seul parcours d'un texte toutes les occurrences d'un ensemble de motifs,
+    en un temps proportionnel à la longueur du texte plus le nombre d'occurrences (quel que soit le nombre de motifs).
+
+    Args:
+        patterns (list): Motifs (déjà normalisés), désignés ensuite par leur position dans la liste.
+    """
+    def __init__(self, patterns: List[str]):
+        self.lengths = [len(pattern) for pattern in patterns]
+        self.goto = [{}]
+        self.outputs = [[]]
+        for pattern_id, pattern in enumerate(patterns):
+            state = 0
+            for char in pattern:
+                next_state = self.goto[state].get(char)
+                if next_state is None:
+                    next_state = self.goto[state][char] = len(self.goto)
+                    self.goto.append({})
+                    self.outputs.append([])
+                state = next_state
+            self.outputs[state].append(pattern_id)
+
+        # Liens d'échec en largeur : plus long suffixe propre de l'état qui est aussi un préfixe d'un motif
+        self.fail = [0] * len(self.goto)
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.goto[fallback].get(char, 0)
+                self.fail[next_state] = target if target != next_state else 0
+                self.outputs[next_state] = self.outputs[next_state] + self.outputs[self.fail[next_state]]
+
+    def find(self, text: str):
+        """
+        Occurrences des motifs dans le texte.
+
+        Yields:
+            tuple: (début, fin, identifiant du motif), positions dans `text`.
+        """
+        goto, fail, outputs, lengths = self.goto, self.fail, self.outputs, self.lengths
+        state = 0
+        for end, char in enumerate(text, 1):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for pattern_id in outputs[state]:
+                yield end - lengths[pattern_id], end, pattern_id
+
+def _event_entities(event):
+    """
+    Entités distinctes (valeur, type) d'un événement et relations entre elles (indices des entités).
+    """
+    entities, relations = {}, []
+    for triple in event.get("triples", []):
+        rel = triple.get("rel", "")
+        ends = []
+        for position in ("sub", "obj"):
+            key = (str(triple.get(position, "")), entity_type(rel, position))
+            ends.append(entities.setdefault(key, len(entities)))
+        relations.append((ends[0], ends[1], rel))
+    return list(entities), relations
+
+def _is_word(text: str, start: int, end: int) -> bool:
+    # Occurrence délimitée par des caractères non alphanumériques (ou les bords du texte)
+    return (start == 0 or not text[start - 1].isalnum()) and (end == len(text) or not text[end].isalnum())
+
+def _choose_spans(candidates):
+    """
+    Choisit une occurrence par entité : les entités les plus longues d'abord, chacune à sa première occurrence
+    qui ne chevauche pas une entité déjà placée, ou à défaut à sa première occurrence (entités imbriquées,
+    ex. le type « avenue » dans « avenue Victor Hugo »).
+    """
+    spans, taken = {}, []
+    for entity, occurrences in sorted(candidates.items(), key=lambda item: -max(end - start for start, end in item[1])):
+        chosen = next((span for span in occurrences if all(span[1] <= start or span[0] >= end for start, end in taken)),
+                      occurrences[0])
+        spans[entity] = chosen
+        taken.append(chosen)
+    return spans
+
+def convert_events(events, batch_size: int = BATCH_SIZE, report: Optional[Dict[str, any]] = None):
+    """
+    Convertit des descriptions BERT simples ({"id", "sent", "triples"}) au format d'entraînement de BERT :
+    {"id", "sentence", "entities": [{"start", "end", "type", "text", "value"}], "relations": [{"head", "tail", "type"}]}.
+
+    Les entités (sujets et objets des triplets) sont recherchées dans la phrase sans tenir compte de la casse,
+    des accents ni des apostrophes typographiques, par mots entiers ; `start` et `end` sont les positions
+    des caractères dans la phrase d'origine, `text` le passage correspondant et `value` la valeur du triplet.
+    Les entités d'un lot de `batch_size` événements sont réunies dans un seul automate (voir MultiPatternMatcher),
+    de sorte que chaque phrase n'est parcourue qu'une fois. Une entité introuvable est listée dans "unmatched"
+    et les relations qui la concernent sont retirées, comme celles qui concernent une valeur conventionnelle (noTime).
+
+    Args:
+        events (iterable): Descriptions BERT simples.
+        batch_size (int): Nombre d'événements traités avec un même automate.
+        report (dict): Si fourni, complété par les compteurs de la conversion (voir new_report).
+
+    Yields:
+        dict: Descriptions au format BERT, dans l'ordre d'entrée.
+    """
+    report = report if report is not None else new_report()
+    events = iter(events)
+    while True:
+        batch = list(islice(events, batch_size))
+        if not batch:
+            break
+
+        patterns, pattern_ids, prepared = [], {}, []
+        for event in batch:
+            entities, relations = _event_entities(event)
+            # Motifs de l'événement : motif -> entités qu'il désigne
+            event_patterns = {}
+            for index, (value, type_) in enumerate(entities):
+                if value in PLACEHOLDER_VALUES:
+                    continue
+                for alias in entity_aliases(value, type_):
+                    pattern = normalize_text(alias)
+                    if not pattern:
+                        continue
+                    if pattern not in pattern_ids:
+                        pattern_ids[pattern] = len(patterns)
+                        patterns.append(pattern)
+                    event_patterns.setdefault(pattern_ids[pattern], []).append(index)
+            prepared.append((entities, relations, event_patterns))
+
+        matcher = MultiPatternMatcher(patterns)
+        for event, (entities, relations, event_patterns) in zip(batch, prepared):
+            sentence = str(event.get("sent") or "")
+            text, offsets = normalize_with_offsets(sentence)
+            candidates = {}
+            for start, end, pattern_id in matcher.find(text):
+                targets = event_patterns.get(pattern_id)
+                if targets and _is_word(text, start, end):
+                    span = (offsets[start], offsets[end - 1] + 1)
+                    for index in targets:
+                        candidates.setdefault(index, []).append(span)
+            for occurrences in candidates.values():
+                occurrences.sort()
+            spans = _choose_spans(candidates)
+
+            positions, output_entities, unmatched = {}, [], []
+            for index, (value, type_) in enumerate(entities):
+                if value in PLACEHOLDER_VALUES:
+                    report["placeholders"][type_] += 1
+                    continue
+                report["entities"][type_] += 1
+                if index not in spans:
+                    report["unmatched"][type_] += 1
+                    unmatched.append({"value": value, "type": type_})
+                    if len(report["unmatched_examples"]) < report["max_examples"]:
+                        report["unmatched_examples"].append({"id": event.get("id"), "value": value, "type": type_, "sentence": sentence})
+                    continue
+                start, end = spans[index]
+                positions[index] = len(output_entities)
+                output_entities.append({"start": start, "end": end, "type": type_, "text": sentence[start:end], "value": value})
+
+            output_relations = []
+            for head, tail, rel in relations:
+                if head in positions and tail in positions:
+                    output_relations.append({"head": positions[head], "tail": positions[tail], "type": rel})
+                else:
+                    report["dropped_relations"][rel] += 1
+            report["events"] += 1
+            report["relations"] += len(relations)
+
+            converted = {"id": event.get("id"), "sentence": sentence, "entities": output_entities, "relations": output_relations}
+            if unmatched:
+                converted["unmatched"] = unmatched
+            yield converted
+
+def new_report(max_examples: int = 20) -> Dict[str, any]:
+    """
+    Compteurs d'une conversion : événements, entités, entités introuvables et valeurs conventionnelles par type,
+    relations et relations retirées par relation, et quelques exemples d'entités introuvables.
+    """
+    return {"events": 0, "entities": Counter(), "unmatched": Counter(), "placeholders": Counter(),
+            "relations": 0, "dropped_relations": Counter(),
+            "unmatched_examples": [], "max_examples": max_examples}
+
+def format_report(report: Dict[str, any]) -> str:
+    """
+    Résumé lisible des entités trouvées par type.
+    """
+    lines = [f"{report['events']} événements, {report['relations'] - sum(report['dropped_relations'].values())}"
+             f"/{report['relations']} relations conservées",
+             f"{'type':<16}{'entités':>10}{'trouvées':>10}{'%':>8}"]
+    for type_, total in sorted(report["entities"].items()):
+        found = total - report["unmatched"][type_]
+        lines.append(f"{type_:<16}{total:>10}{found:>10}{100 * found / total:>8.1f}")
+    return "\n".join(lines)
+
+def convert_file(in_path: str, out_path: str, report_path: Optional[str] = None, batch_size: int = BATCH_SIZE) -> Dict[str, any]:
+    """
+    Convertit un fichier JSONL de descriptions BERT simples (ex. bert_simple_ground_truth_train.jsonl)
+    au format d'entraînement de BERT (voir convert_events), et enregistre éventuellement le rapport de conversion.
+    """
+    report = new_report()
+    fm.write_jsonl(convert_events(fm.iter_jsonl(in_path), batch_size, report), out_path)
+    if report_path:
+        with open(report_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps({key: value for key, value in report.items() if key != "max_examples"}, ensure_ascii=False, indent=2))
+    return report
+
+def output_path(in_path: str, output_dir: Optional[str] = None) -> str:
+    """
+    Fichier produit pour un fichier d'entrée : bert_simple_ground_truth_test.jsonl -> bert_ground_truth_test.jsonl
+    (<nom>_bert.jsonl pour un autre nom), dans `output_dir` ou à côté du fichier d'entrée.
+    """
+    name = os.path.basename(in_path)
+    if name.startswith("bert_simple_"):
+        name = "bert_" + name[len("bert_simple_"):]
+    else:
+        name = os.path.splitext(name)[0] + "_bert.jsonl"
+    return os.path.join(output_dir or os.path.dirname(in_path), name)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convertit les descriptions BERT simples en entités (positions dans la phrase) et relations.")
+    parser.add_argument("inputs", nargs="*", help="Fichiers JSONL à convertir (par défaut : bert_simple_ground_truth_{train,val,test}.jsonl)")
+    parser.add_argument("--output-dir", default=None, help="Dossier des fichiers produits (par défaut : celui des fichiers d'entrée)")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="Nombre d'événements traités avec un même automate")
+    parser.add_argument("--report", action="store_true", help="Enregistrer le rapport de chaque conversion (<sortie>_report.json)")
+    args = parser.parse_args()
+
+    inputs = args.inputs or [os.path.join(DATA_DIR, f"bert_simple_ground_truth_{split}.jsonl") for split in SPLITS]
+    if args.output_dir:
+        fm.create_folder_if_not_exists(args.output_dir)
+    for in_path in inputs:
+        out_path = output_path(in_path, args.output_dir)
+        report_path = os.path.splitext(out_path)[0] + "_report.json" if args.report else None
+        report = convert_file(in_path, out_path, report_path, args.batch_size)
+        print(f"{os.path.basename(in_path)} -> {out_path}")
+        print(format_report(report))
@@ -0,0 +1,473 @@
+import os
+import ssl
+import json
+import time
+import random
+import asyncio
+import hashlib
+import argparse
+from itertools import chain, islice
+from urllib.parse import urlsplit
+from typing import Dict, List, Optional
+import numpy as np
+import file_management as fm
+import prompt_builder as pb
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data")
+DEFAULT_TEST_PATH = os.path.join(DATA_DIR, "simple_ground_truth_test.jsonl")
+DEFAULT_CACHE_PATH = os.path.join(DATA_DIR, "llm_cache.jsonl")
+# Point d'accès compatible OpenAI (chat/completions ou completions) et modèle, modifiables par variables d'environnement
+DEFAULT_URL = os.environ.get("LLM_API_URL", "http://localhost:8000/v1/chat/completions")
+DEFAULT_MODEL = os.environ.get("LLM_MODEL", "default")
+# Nombre maximal de requêtes en cours (une connexion persistante par requête en cours)
+DEFAULT_CONCURRENCY = 16
+# Nombre d'événements dont les prompts sont construits ensemble, et de réponses écrites entre deux points de reprise
+DEFAULT_BATCH_SIZE = 256
+# Nouvelles tentatives après une erreur réseau ou un statut temporaire, avec une attente exponentielle (en secondes)
+MAX_RETRIES = 5
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 30.0
+REQUEST_TIMEOUT = 120.0
+RETRY_STATUSES = {408, 409, 425, 429, 500, 502, 503, 504}
+LATENCY_PERCENTILES = (50, 90, 99)
+
+class HttpError(Exception):
+    """
+    Réponse HTTP en erreur (statut >= 400). `retry_after` : attente demandée par le serveur (en-tête Retry-After), en secondes.
+    """
+    def __init__(self, status: int, body: bytes, retry_after: Optional[float] = None):
+        super().__init__(f"HTTP {status} : {body[:200].decode('utf-8', 'replace')}")
+        self.status = status
+        self.retry_after = retry_after
+
+def _retry_after(value: Optional[str]) -> Optional[float]:
+    try:
+        return max(0.0, float(value)) if value is not None else None
+    except ValueError:
+        return None
+
+async def _read_headers(reader: asyncio.StreamReader) -> Dict[str, str]:
+    headers = {}
+    while True:
+        line = await reader.readuntil(b"\r\n")
+        if line == b"\r\n":
+            return headers
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+async def _read_body(reader: asyncio.StreamReader, headers: Dict[str, str]) -> bytes:
+    if "chunked" in headers.get("transfer-encoding", "").lower():
+        chunks = []
+        while True:
+            size = int((await reader.readuntil(b"\r\n")).split(b";")[0], 16)
+            if size == 0:
+                await _read_headers(reader)
+                return b"".join(chunks)
+            chunks.append(await reader.readexactly(size))
+            await reader.readexactly(2)
+    if "content-length" in headers:
+        return await reader.readexactly(int(headers["content-length"]))
+    return await reader.read()
+
+class HttpConnection:
+    """
+    Connexion HTTP/1.1 persistante (keep-alive) vers le serveur d'une URL, ouverte à la première requête
+    et rouverte après une erreur ou une fermeture demandée par le serveur.
+    Une connexion ne traite qu'une requête à la fois.
+    """
+    def __init__(self, url: str):
+        parts = urlsplit(url)
+        self.host = parts.hostname
+        self.secure = parts.scheme == "https"
+        self.port = parts.port or (443 if self.secure else 80)
+        self.path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        self.reader = self.writer = None
+
+    async def post(self, body: bytes, headers: Dict[str, str]):
+        """
+        Envoie une requête POST et retourne (statut, en-têtes, corps) de la réponse.
+        """
+        if self.writer is None:
+            context = ssl.create_default_context() if self.secure else None
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port, ssl=context)
+        try:
+            lines = [f"POST {self.path} HTTP/1.1", f"Host: {self.host}", "Content-Type: application/json",
+                     f"Content-Length: {len(body)}"] + [f"{name}: {value}" for name, value in headers.items()]
+            self.writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+            await self.writer.drain()
+            status = int((await self.reader.readuntil(b"\r\n")).split()[1])
+            response_headers = await _read_headers(self.reader)
+            response = await _read_body(self.reader, response_headers)
+        except BaseException:
+            # État de la connexion inconnu (y compris après une annulation) : elle ne peut pas être réutilisée
+            self.close()
+            raise
+        if response_headers.get("connection", "").lower() == "close":
+            self.close()
+        return status, response_headers, response
+
+    def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+def cache_key(model: str, prompt: str, params: Optional[Dict[str, any]] = None) -> str:
+    """
+    Clé de cache d'une requête : empreinte SHA-256 du modèle, du prompt et des paramètres de génération.
+    """
+    content = json.dumps([model, prompt, params or {}], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+class ResponseCache:
+    """
+    Cache persistant des réponses du modèle : fichier JSONL ({"key", "response"}) complété au fur et à mesure,
+    chargé en mémoire à l'ouverture. Une relance avec le même modèle, les mêmes prompts et les mêmes paramètres
+    ne refait aucune requête.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self.responses = {}
+        if os.path.exists(path):
+            for record in fm.iter_jsonl(path):
+                self.responses[record["key"]] = record["response"]
+        folder = os.path.dirname(path)
+        if folder:
+            fm.create_folder_if_not_exists(folder)
+        self.file = open(path, "a", encoding="utf-8")
+
+    def __len__(self):
+        return len(self.responses)
+
+    def get(self, key: str) -> Optional[str]:
+        return self.responses.get(key)
+
+    def put(self, key: str, response: str) -> None:
+        self.responses[key] = response
+        self.file.write(json.dumps({"key": key, "response": response}, ensure_ascii=False) + "\n")
+
+    def flush(self) -> None:
+        self.file.flush()
+
+    def close(self) -> None:
+        self.file.close()
+
+class RunStats:
+    """
+    Compteurs d'une exécution : réponses obtenues (dont celles du cache), échecs, nouvelles tentatives,
+    latence de chaque requête (en secondes) et tokens consommés (champ "usage" des réponses).
+    """
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.completed = self.cached = self.skipped = self.failed = self.retries = 0
+        self.latencies = []
+        self.usage = {"prompt_tokens": 0, "completion_tokens": 0}
+        self.errors = []
+
+    def to_dict(self) -> Dict[str, any]:
+        seconds = time.perf_counter() - self.start
+        latencies = np.array(self.latencies)
+        return {
+            "completed": self.completed, "cached": self.cached, "skipped": self.skipped, "failed": self.failed,
+            "requests": len(self.latencies), "retries": self.retries, "seconds": round(seconds, 3),
+            "events_per_second": round(self.completed / seconds, 2) if seconds else None,
+            "latency": {f"p{p}": round(float(np.percentile(latencies, p)), 4) for p in LATENCY_PERCENTILES}
+                       if len(latencies) else {},
+            "usage": self.usage, "errors": self.errors[:20],
+        }
+
+def format_stats(stats: Dict[str, any]) -> str:
+    latency = " ".join(f"{name}={1000 * value:.0f}ms" for name, value in stats["latency"].items())
+    return (f"{stats['completed']} réponses ({stats['cached']} en cache, {stats['skipped']} déjà faites), "
+            f"{stats['failed']} échecs, {stats['retries']} nouvelles tentatives en {stats['seconds']} s "
+            f"({stats['events_per_second']} événements/s)\nlatence : {latency or '-'}")
+
+class LLMRunner:
+    """
+    Envoie des prompts à un point d'accès compatible OpenAI avec au plus `concurrency` requêtes simultanées,
+    chacune sur sa propre connexion persistante. Les erreurs réseau et les statuts temporaires (429, 5xx)
+    sont retentés `max_retries` fois avec une attente exponentielle aléatoire (ou celle de l'en-tête Retry-After).
+
+    Args:
+        url (str): URL de chat/completions (messages) ou de completions (prompt).
+        model (str): Nom du modèle.
+        api_key (str): Clé d'API (en-tête Authorization), par défaut la variable d'environnement OPENAI_API_KEY.
+        params (dict): Paramètres de génération ajoutés à chaque requête (temperature, max_tokens...).
+        cache (ResponseCache): Cache des réponses, consulté avant chaque requête.
+    """
+    def __init__(self, url: str = DEFAULT_URL, model: str = DEFAULT_MODEL, api_key: Optional[str] = None,
+                 concurrency: int = DEFAULT_CONCURRENCY, params: Optional[Dict[str, any]] = None,
+                 cache: Optional[ResponseCache] = None, max_retries: int = MAX_RETRIES, timeout: float = REQUEST_TIMEOUT):
+        self.url = url
+        self.model = model
+        self.params = dict(params or {})
+        self.cache = cache
+        self.concurrency = max(1, concurrency)
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.chat = urlsplit(url).path.rstrip("/").endswith("chat/completions")
+        api_key = api_key if api_key is not None else os.environ.get("OPENAI_API_KEY")
+        self.headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
+        self.stats = RunStats()
+
+    def _payload(self, prompt: str) -> bytes:
+        payload = {"model": self.model, **self.params}
+        if self.chat:
+            payload["messages"] = [{"role": "user", "content": prompt}]
+        else:
+            payload["prompt"] = prompt
+        return json.dumps(payload, ensure_ascii=False).encode("utf-8")
+
+    @staticmethod
+    def _content(response: Dict[str, any]) -> str:
+        choice = response["choices"][0]
+        return choice["message"]["content"] if "message" in choice else choice["text"]
+
+    async def _request(self, connections: asyncio.Queue, prompt: str) -> str:
+        body = self._payload(prompt)
+        for attempt in range(self.max_retries + 1):
+            connection = await connections.get()
+            start = time.perf_counter()
+            try:
+                status, headers, response = await asyncio.wait_for(connection.post(body, self.headers), self.timeout)
+                if status >= 400:
+                    raise HttpError(status, response, _retry_after(headers.get("retry-after")))
+                data = json.loads(response)
+                content = self._content(data)
+            except (HttpError, OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError) as error:
+                if isinstance(error, HttpError) and error.status not in RETRY_STATUSES or attempt == self.max_retries:
+                    raise
+                delay = error.retry_after if isinstance(error, HttpError) and error.retry_after is not None \
+                    else min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt) * random.uniform(0.5, 1)
+            else:
+                delay = None
+            finally:
+                self.stats.latencies.append(time.perf_counter() - start)
+                connections.put_nowait(connection)
+            if delay is None:
+                for name in self.stats.usage:
+                    self.stats.usage[name] += (data.get("usage") or {}).get(name) or 0
+                return content
+            # Attente sans garder la connexion, qui peut servir à d'autres requêtes
+            self.stats.retries += 1
+            await asyncio.sleep(delay)
+
+    async def _complete(self, connections: asyncio.Queue, record: Dict[str, any]) -> Dict[str, any]:
+        prompt = record["prompt"]
+        key = cache_key(self.model, prompt, self.params)
+        response = self.cache.get(key) if self.cache is not None else None
+        result = {"id": record.get("id"), "model": self.model}
+        if response is not None:
+            self.stats.cached += 1
+        else:
+            try:
+                response = await self._request(connections, prompt)
+            except Exception as error:
+                self.stats.failed += 1
+                self.stats.errors.append({"id": record.get("id"), "error": f"{type(error).__name__}: {error}"})
+                return None
+            if self.cache is not None:
+                self.cache.put(key, response)
+        self.stats.completed += 1
+        result["response"] = response
+        return result
+
+    async def run(self, records, output_path: str, batch_size: int = DEFAULT_BATCH_SIZE) -> Dict[str, any]:
+        """
+        Envoie les prompts ({"id", "prompt"}) et ajoute les réponses ({"id", "model", "response"}) au fichier de sortie,
+        dans leur ordre d'arrivée. Le fichier de sortie sert de point de reprise : les événements qui y ont déjà
+        une réponse sont ignorés, et il est vidé sur disque (avec le cache) toutes les `batch_size` réponses.
+        Les événements en échec n'y sont pas écrits : une relance les retente.
+
+        Returns:
+            dict: Statistiques de l'exécution (voir RunStats.to_dict).
+        """
+        done = {str(record["id"]) for record in fm.iter_jsonl(output_path)} if os.path.exists(output_path) else set()
+        connections = asyncio.Queue()
+        for _ in range(self.concurrency):
+            connections.put_nowait(HttpConnection(self.url))
+        pending, written = set(), 0
+        records = iter(records)
+        with open(output_path, "a", encoding="utf-8") as output:
+            def write(tasks):
+                nonlocal written
+                for task in tasks:
+                    result = task.result()
+                    if result is not None:
+                        output.write(json.dumps(result, ensure_ascii=False) + "\n")
+                        written += 1
+                        if written % batch_size == 0:
+                            output.flush()
+                            if self.cache is not None:
+                                self.cache.flush()
+            try:
+                for record in records:
+                    if str(record.get("id")) in done:
+                        self.stats.skipped += 1
+                        continue
+                    # Fenêtre glissante : jamais plus de 2 x concurrency tâches en attente (les autres prompts restent à produire)
+                    if len(pending) >= 2 * self.concurrency:
+                        finished, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                        write(finished)
+                    pending.add(asyncio.ensure_future(self._complete(connections, record)))
+                if pending:
+                    finished, pending = await asyncio.wait(pending)
+                    write(finished)
+            finally:
+                for task in pending:
+                    task.cancel()
+                while not connections.empty():
+                    connections.get_nowait().close()
+                if self.cache is not None:
+                    self.cache.flush()
+        return self.stats.to_dict()
+
+def iter_records(path: str, index: Optional[pb.FewShotIndex] = None, k: int = pb.DEFAULT_K,
+                 token_budget: Optional[int] = pb.DEFAULT_TOKEN_BUDGET, batch_size: int = DEFAULT_BATCH_SIZE):
+    """
+    Prompts d'un fichier JSONL : repris tels quels si le fichier en contient déjà (sortie de prompt_builder.py),
+    sinon construits par lots à partir des exemples d'entraînement les plus proches (voir prompt_builder.iter_prompts).
+    """
+    records = fm.iter_jsonl(path)
+    first = list(islice(records, 1))
+    records = chain(first, records)
+    if not first or "prompt" in first[0]:
+        return records
+    return pb.iter_prompts(records, index or pb.load_or_build_index(), k, token_budget, batch_size=batch_size)
+
+def run(records, output_path: str, batch_size: int = DEFAULT_BATCH_SIZE, cache_path: Optional[str] = DEFAULT_CACHE_PATH,
+        **kwargs) -> Dict[str, any]:
+    """
+    Exécute LLMRunner(**kwargs).run sur une liste ou un itérable de prompts, avec le cache `cache_path` (aucun si None).
+    """
+    cache = ResponseCache(cache_path) if cache_path else None
+    try:
+        return asyncio.run(LLMRunner(cache=cache, **kwargs).run(records, output_path, batch_size))
+    finally:
+        if cache is not None:
+            cache.close()
+
+class StubServer:
+    """
+    Serveur HTTP local imitant un point d'accès compatible OpenAI, pour tester et mesurer le runner sans modèle :
+    chaque réponse arrive après `delay` secondes et contient la dernière ligne du prompt sans triplet.
+    Une part `failure_rate` des requêtes reçoit une erreur 503.
+    """
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, delay: float = 0.05, failure_rate: float = 0.0, seed: int = 0):
+        self.host = host
+        self.port = port
+        self.delay = delay
+        self.failure_rate = failure_rate
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.server = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}/v1/chat/completions"
+
+    async def start(self) -> "StubServer":
+        self.server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    async def close(self) -> None:
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    await reader.readuntil(b"\r\n")
+                except asyncio.IncompleteReadError:
+                    break
+                headers = await _read_headers(reader)
+                request = json.loads(await _read_body(reader, headers) or b"{}")
+                self.requests += 1
+                await asyncio.sleep(self.delay)
+                if self.random.random() < self.failure_rate:
+                    status, body = "503 Service Unavailable", b'{"error": "indisponible"}'
+                else:
+                    prompt = request["messages"][-1]["content"] if "messages" in request else request.get("prompt", "")
+                    content = json.dumps({"sentence": prompt.rsplit("\n", 1)[-1], "triples": []}, ensure_ascii=False)
+                    message = {"message": {"role": "assistant", "content": content}} if "messages" in request else {"text": content}
+                    status, body = "200 OK", json.dumps({
+                        "model": request.get("model"), "choices": [{"index": 0, **message}],
+                        "usage": {"prompt_tokens": pb.estimate_tokens(prompt), "completion_tokens": pb.estimate_tokens(content)},
+                    }, ensure_ascii=False).encode("utf-8")
+                writer.write(f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n".encode("latin-1") + body)
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            # Connexion fermée par le client, ou serveur arrêté avec des connexions encore ouvertes
+            pass
+        finally:
+            writer.close()
+
+async def _benchmark(n_prompts: int, concurrency_levels, delay: float, failure_rate: float, output_dir: str) -> List[Dict[str, any]]:
+    server = await StubServer(delay=delay, failure_rate=failure_rate).start()
+    records = [{"id": i, "prompt": f"Exemple {i}\nphrase {i}"} for i in range(n_prompts)]
+    results = []
+    try:
+        for concurrency in concurrency_levels:
+            output_path = os.path.join(output_dir, f"llm_benchmark_{concurrency}.jsonl")
+            fm.remove_file_if_exists(output_path)
+            runner = LLMRunner(server.url, "stub", api_key="", concurrency=concurrency)
+            stats = await runner.run(records, output_path)
+            fm.remove_file_if_exists(output_path)
+            results.append({"concurrency": concurrency, **{key: stats[key] for key in
+                            ["completed", "failed", "retries", "seconds", "events_per_second", "latency"]}})
+            print(results[-1])
+    finally:
+        await server.close()
+    return results
+
+def benchmark(n_prompts: int = 2_000, concurrency_levels=(1, 16, 64), delay: float = 0.02, failure_rate: float = 0.01,
+              output_dir: Optional[str] = None) -> List[Dict[str, any]]:
+    """
+    Mesure le débit et la latence du runner contre un StubServer local, pour plusieurs niveaux de concurrence.
+    """
+    return asyncio.run(_benchmark(n_prompts, concurrency_levels, delay, failure_rate, output_dir or DATA_DIR))
+
+async def _serve(host: str, port: int, delay: float, failure_rate: float) -> None:
+    server = await StubServer(host, port, delay, failure_rate).start()
+    print(f"Serveur de test : {server.url}")
+    await server.server.serve_forever()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Interroge un modèle (API compatible OpenAI) sur un ensemble de test, avec cache et reprise.")
+    parser.add_argument("test", nargs="?", default=DEFAULT_TEST_PATH, help="Fichier JSONL des événements ou des prompts (sortie de prompt_builder.py)")
+    parser.add_argument("--output", default=None, help="Fichier JSONL des réponses (par défaut : <test>_responses.jsonl), complété en cas de reprise")
+    parser.add_argument("--url", default=DEFAULT_URL, help="URL du point d'accès (chat/completions ou completions)")
+    parser.add_argument("--model", default=DEFAULT_MODEL, help="Nom du modèle")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="Nombre maximal de requêtes simultanées")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Nombre de prompts construits ensemble et de réponses entre deux points de reprise")
+    parser.add_argument("--temperature", type=float, default=0.0, help="Température de génération")
+    parser.add_argument("--max-tokens", type=int, default=None, help="Nombre maximal de tokens générés par réponse")
+    parser.add_argument("--cache", default=DEFAULT_CACHE_PATH, help="Fichier du cache des réponses")
+    parser.add_argument("--no-cache", action="store_true", help="Ne pas utiliser de cache")
+    parser.add_argument("--k", type=int, default=pb.DEFAULT_K, help="Nombre d'exemples par prompt")
+    parser.add_argument("--report", action="store_true", help="Enregistrer les statistiques (<sortie>_report.json)")
+    parser.add_argument("--stub-server", type=int, default=None, metavar="PORT", help="Lancer le serveur de test local sur ce port")
+    parser.add_argument("--stub-delay", type=float, default=0.05, help="Latence (en secondes) du serveur de test")
+    parser.add_argument("--stub-failure-rate", type=float, default=0.0, help="Part des requêtes en erreur 503 sur le serveur de test")
+    parser.add_argument("--benchmark", type=int, nargs="?", const=2_000, default=None, metavar="PROMPTS",
+                        help="Mesurer le débit contre le serveur de test local avec ce nombre de prompts")
+    args = parser.parse_args()
+
+    if args.stub_server is not None:
+        asyncio.run(_serve("127.0.0.1", args.stub_server, args.stub_delay, args.stub_failure_rate))
+    elif args.benchmark is not None:
+        benchmark(args.benchmark)
+    else:
+        params = {"temperature": args.temperature}
+        if args.max_tokens is not None:
+            params["max_tokens"] = args.max_tokens
+        output = args.output or os.path.splitext(args.test)[0] + "_responses.jsonl"
+        stats = run(iter_records(args.test, k=args.k, batch_size=args.batch_size), output, args.batch_size,
+                    None if args.no_cache else args.cache, url=args.url, model=args.model,
+                    concurrency=args.concurrency, params=params)
+        print(f"Réponses : {output}")
+        print(format_stats(stats))
+        if args.report:
+            with open(os.path.splitext(output)[0] + "_report.json", "w", encoding="utf-8") as f:
+                f.write(json.dumps(stats, ensure_ascii=False, indent=2))
@@ -0,0 +1,288 @@
+import os
+import io
+import json
+import time
+import pstats
+import cProfile
+import platform
+import resource
+import threading
+import subprocess
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+# Nombre de fonctions les plus coûteuses conservées dans le rapport pour chaque étape profilée
+PROFILE_TOP = 25
+
+def git_revision() -> str:
+    """
+    Commit courant (suivi de "-dirty" si l'arbre de travail est modifié), ou None hors d'un dépôt git.
+    """
+    cwd = os.path.dirname(os.path.abspath(__file__))
+    try:
+        revision = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=cwd, capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=cwd, capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return revision + ("-dirty" if dirty else "")
+
+def peak_rss() -> int:
+    """
+    Pic de mémoire résidente du processus (en octets) depuis le début ou depuis le dernier reset_peak_rss().
+    """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    # ru_maxrss est en kilo-octets sous Linux, en octets sous macOS
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss if platform.system() == "Darwin" else maxrss * 1024
+
+def children_peak_rss() -> int:
+    """
+    Pic de mémoire résidente (en octets) du plus gros des processus fils terminés (processus de travail).
+    """
+    maxrss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return maxrss if platform.system() == "Darwin" else maxrss * 1024
+
+def reset_peak_rss() -> bool:
+    """
+    Remet le pic de mémoire résidente à la mémoire actuelle (Linux uniquement), pour mesurer le pic de chaque étape.
+
+    Returns:
+        bool: False si le pic ne peut pas être remis à zéro : il couvre alors tout le début de l'exécution.
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+def output_bytes(paths) -> int:
+    """
+    Taille totale des fichiers existants parmi `paths`.
+    """
+    return sum(os.path.getsize(path) for path in paths if os.path.exists(path))
+
+def profile_summary(profile: cProfile.Profile, top: int = PROFILE_TOP) -> list:
+    """
+    Fonctions les plus coûteuses d'un profil (temps propre), au format JSON.
+    """
+    stats = pstats.Stats(profile, stream=io.StringIO())
+    rows = sorted(stats.stats.items(), key=lambda item: item[1][2], reverse=True)[:top]
+    return [
+        {
+            "function": f"{os.path.basename(filename)}:{line}({name})",
+            "calls": calls,
+            "tottime": round(tottime, 4),
+            "cumtime": round(cumtime, 4),
+        }
+        for (filename, line, name), (_, calls, tottime, cumtime, _) in rows
+    ]
+
+class PipelineReport:
+    """
+    Rapport d'exécution d'un pipeline : pour chaque étape, durée, débit (lignes/s et événements/s),
+    pic de mémoire résidente et taille des fichiers produits, avec en option le profil cProfile de certaines étapes.
+
+    Exemple :
+        report = PipelineReport(profile_stages=["generate"])
+        with report.stage("read_csv") as stage:
+            df = fm.read_csv_as_dataframe(in_path)
+            stage["rows"] = len(df)
+        report.write("report.json")
+
+    Args:
+        profile_stages (list): Noms des étapes à profiler avec cProfile.
+        profile_dir (str): Si donné, dossier où le profil complet de chaque étape profilée est enregistré (<étape>.prof),
+            pour une analyse avec pstats ou snakeviz.
+        settings (dict): Paramètres de l'exécution, recopiés dans le rapport.
+
+    Des étapes peuvent être mesurées en même temps depuis plusieurs threads : le pic de mémoire, propre au processus,
+    n'est alors plus remis à zéro et les étapes concernées sont marquées `"concurrent": true`.
+    """
+    def __init__(self, profile_stages=(), profile_dir: str = None, settings: dict = None):
+        self.profile_stages = set(profile_stages)
+        self.profile_dir = profile_dir
+        self.settings = settings or {}
+        self.stages = []
+        self.started = datetime.now(timezone.utc)
+        self._start = time.perf_counter()
+        self._peak_resettable = reset_peak_rss()
+        self._lock = threading.Lock()
+        self._active = []
+        self._local = threading.local()
+
+    @property
+    def _nested_seconds(self):
+        # Temps des étapes imbriquées dans l'étape en cours du thread courant
+        return getattr(self._local, "nested_seconds", None)
+
+    @_nested_seconds.setter
+    def _nested_seconds(self, value):
+        self._local.nested_seconds = value
+
+    def _enter(self, entry: dict) -> None:
+        with self._lock:
+            for active in self._active:
+                active["concurrent"] = True
+            if self._active:
+                entry["concurrent"] = True
+            elif self._peak_resettable:
+                reset_peak_rss()
+            self._active.append(entry)
+
+    def _exit(self, entry: dict) -> None:
+        with self._lock:
+            self._active.remove(entry)
+            self.stages.append(entry)
+
+    def _profile(self, name: str):
+        return cProfile.Profile() if name in self.profile_stages else None
+
+    def _finish_profile(self, entry: dict, profile: cProfile.Profile) -> None:
+        if profile is None:
+            return
+        entry["profile"] = profile_summary(profile)
+        if self.profile_dir:
+            os.makedirs(self.profile_dir, exist_ok=True)
+            profile.dump_stats(os.path.join(self.profile_dir, f"{entry['name']}.prof"))
+
+    @staticmethod
+    def _rates(entry: dict) -> None:
+        seconds = entry["seconds"]
+        for key in ["rows", "events"]:
+            if entry.get(key) is not None:
+                entry[f"{key}_per_second"] = round(entry[key] / seconds) if seconds else None
+
+    @contextmanager
+    def stage(self, name: str, rows: int = None, events: int = None, outputs=()):
+        """
+        Mesure une étape. Le dictionnaire produit peut être complété dans le bloc (ex. stage["rows"] = len(df)).
+        Le temps passé dans les itérateurs mesurés par timed_iter() pendant l'étape est compté dans leur propre étape
+        et retiré de celle-ci (voir `wall_seconds` pour la durée totale).
+
+        Args:
+            name (str): Nom de l'étape.
+            rows (int): Nombre de lignes traitées, si connu d'avance.
+            events (int): Nombre d'événements traités, si connu d'avance.
+            outputs (list): Fichiers produits par l'étape, dont la taille est mesurée à la fin.
+        """
+        entry = {"name": name, "rows": rows, "events": events}
+        self._enter(entry)
+        outer_nested, self._nested_seconds = self._nested_seconds, 0.0
+        profile = self._profile(name)
+        start = time.perf_counter()
+        if profile:
+            profile.enable()
+        try:
+            yield entry
+        finally:
+            if profile:
+                profile.disable()
+            wall = time.perf_counter() - start
+            nested, self._nested_seconds = self._nested_seconds, outer_nested
+            if self._nested_seconds is not None:
+                self._nested_seconds += wall
+            entry["seconds"] = round(wall - nested, 4)
+            entry["wall_seconds"] = round(wall, 4)
+            entry["peak_rss"] = peak_rss()
+            if outputs:
+                entry["output_bytes"] = output_bytes(outputs)
+                entry["outputs"] = [os.path.basename(path) for path in outputs]
+            self._rates(entry)
+            self._finish_profile(entry, profile)
+            self._exit(entry)
+
+    def timed_iter(self, name: str, iterable, count=None, rows=None):
+        """
+        Mesure le temps passé à produire les éléments d'un itérateur (ex. les lots de descriptions générés),
+        lorsque la production et l'écriture sont entrelacées. L'étape est ajoutée au rapport une fois l'itérateur épuisé.
+        Le pic de mémoire n'est pas mesuré séparément : il est compté dans l'étape englobante.
+
+        Args:
+            name (str): Nom de l'étape.
+            iterable: Itérateur mesuré.
+            count (callable): Nombre d'événements de chaque élément (1 par élément si None).
+            rows (int): Nombre de lignes traitées, si connu.
+        """
+        entry = {"name": name, "rows": rows, "events": 0}
+        profile = self._profile(name)
+        seconds = 0.0
+        iterator = iter(iterable)
+        try:
+            while True:
+                start = time.perf_counter()
+                if profile:
+                    profile.enable()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+                finally:
+                    if profile:
+                        profile.disable()
+                    elapsed = time.perf_counter() - start
+                    seconds += elapsed
+                    if self._nested_seconds is not None:
+                        self._nested_seconds += elapsed
+                entry["events"] += 1 if count is None else count(item)
+                yield item
+        finally:
+            entry["seconds"] = entry["wall_seconds"] = round(seconds, 4)
+            self._rates(entry)
+            self._finish_profile(entry, profile)
+            with self._lock:
+                self.stages.append(entry)
+
+    def add_stages(self, entries) -> None:
+        """
+        Ajoute au rapport des étapes mesurées dans un autre rapport (ex. celui d'un processus séparé).
+        Comme pour timed_iter(), leur durée est retirée de l'étape en cours du thread courant.
+        """
+        entries = list(entries)
+        if self._nested_seconds is not None:
+            self._nested_seconds += sum(entry["seconds"] for entry in entries)
+        with self._lock:
+            self.stages.extend(entries)
+
+    def to_dict(self) -> dict:
+        return {
+            "started": self.started.isoformat(timespec="seconds"),
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "pid": os.getpid(),
+            "settings": self.settings,
+            "total_seconds": round(time.perf_counter() - self._start, 4),
+            "peak_rss_per_stage": self._peak_resettable,
+            "children_peak_rss": children_peak_rss(),
+            "stages": self.stages,
+        }
+
+    def write(self, path: str) -> None:
+        """
+        Écrit le rapport au format JSON.
+        """
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(json.dumps(self.to_dict(), ensure_ascii=False, indent=2))
+
+    def summary(self) -> str:
+        """
+        Résumé lisible des étapes (durée, débit, pic de mémoire).
+        """
+        lines = []
+        for entry in self.stages:
+            line = f"{entry['name']:<20}{entry['seconds']:>9.3f} s"
+            if entry.get("events_per_second"):
+                line += f"  {entry['events_per_second']:>9} évén./s"
+            elif entry.get("rows_per_second"):
+                line += f"  {entry['rows_per_second']:>9} lignes/s"
+            if entry.get("peak_rss"):
+                line += f"  pic {entry['peak_rss'] / 2 ** 20:.0f} Mo"
+            lines.append(line)
+        return "\n".join(lines)
@@ -1,28 +1,73 @@
-import file_management as fm
-import event_description_generator as edg
-import split_ground_truth as sgt
+import os
+import pipeline as pl
+import validate_ground_truth as vgt
+
+# Paramètres par défaut de la préparation de la vérité terrain. Chacun peut être remplacé en ligne de commande :
+#   python prepare_dataset.py --variants bert_simple --stages split
+#   python prepare_dataset.py --mode streaming --input ../data/ground_truth_10M.csv --output-dir /tmp/out
+# (voir python prepare_dataset.py --help et pipeline.py). Les chemins sont relatifs au dépôt, pas au dossier courant.
 
 # === Paramètres ===
-in_path = "../data/ground_truth.csv"
-simple_out_path = "../data/simple_ground_truth.jsonl"
-bert_simple_out_path = "../data/bert_simple_ground_truth.jsonl"
-complex_out_path = "../data/complex_ground_truth.jsonl"
-split_output_dir = "../data/"
-
-# === Étape 1 : Lecture du fichier CSV de vérité terrain ===
-# Le séparateur utilisé est la tabulation ('\t')
-df = fm.read_csv_as_dataframe(in_path, separator='\t')
-
-# === Étape 2 : Génération des descriptions d'événements ===
-# Renvoie deux listes : une version simple et une version complexe
-simple_event_desc, bert_simple_event_desc, complex_event_desc = edg.create_event_descriptions(df)
-
-# === Étape 3 : Écriture des fichiers JSONL ===
-fm.write_jsonl(simple_event_desc, simple_out_path)
-fm.write_jsonl(bert_simple_event_desc, bert_simple_out_path)
-fm.write_jsonl(complex_event_desc, complex_out_path)
-
-# === Étape 4 : Découpage en ensembles entraînement / validation / test ===
-sgt.split_jsonl(complex_out_path, output_dir=split_output_dir, train_ratio=0.8, val_ratio=0.1, test_ratio=0.1)
-sgt.split_jsonl(bert_simple_out_path, output_dir=split_output_dir, train_ratio=0.8, val_ratio=0.1, test_ratio=0.1)
-sgt.split_jsonl(simple_out_path, output_dir=split_output_dir, train_ratio=0.8, val_ratio=0.1, test_ratio=0.1)
+data_dir = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data"))
+in_path = os.path.join(data_dir, "ground_truth.csv")
+# Vérité terrain brute à valider et normaliser d'abord (ex. os.path.join(data_dir, "ground_truth_raw.csv"), None : pas de validation).
+# Les lignes valides sont écrites dans ground_truth_clean.csv (dans output_dir), qui remplace in_path, les autres
+# dans ground_truth_clean_rejected.csv avec leurs motifs de rejet (voir validate_ground_truth.py)
+raw_path = None
+# Motifs de rejet pour lesquels la ligne est tout de même conservée (voir validate_ground_truth.REASONS, [] : validation stricte).
+# Par défaut unknown_change (validate_ground_truth.DEFAULT_ALLOW) : les lignes de classement et de numérotation
+# n'ont pas de règle de changement mais sont des annotations valides
+validation_allow = list(vgt.DEFAULT_ALLOW)
+output_dir = data_dir
+# Dossier des sous-ensembles entraînement / validation / test et manifeste de la construction incrémentale (None : dans output_dir)
+split_output_dir = None
+manifest_path = None
+
+# Versions produites : "simple", "bert_simple" (simple pour BERT) et "complex".
+# Chaque version est écrite puis découpée indépendamment des autres, en même temps qu'elles (`jobs` étapes à la fois)
+variants = ["simple", "bert_simple", "complex"]
+jobs = 4
+
+# Format colonnaire (.triples) écrit en plus des fichiers JSONL : valeurs stockées une seule fois dans un dictionnaire,
+# relecture instantanée par projection en mémoire (voir triple_file.TripleFile)
+write_triple_files = True
+
+# "memory" : lecture du CSV entier puis génération par lots.
+# "streaming" : lecture du CSV par morceaux, mémoire bornée quelle que soit la taille du fichier.
+#   Si le fichier n'est pas trié par event_id, un tri externe est effectué dans un dossier temporaire.
+# "incremental" : seuls les événements ajoutés ou modifiés depuis la dernière exécution sont régénérés,
+#   les autres sont recopiés depuis les fichiers JSONL existants (nécessite id_mode = "uuid5")
+mode = "memory"
+chunk_size = 100_000
+input_sorted_by_event = False
+
+# Nombre de processus utilisés pour générer les descriptions d'événements (1 : pas de parallélisme)
+workers = 1
+
+# Identifiants des nœuds des descriptions complexes : "uuid5" (déterministes, stables d'une exécution à l'autre),
+# "counter" (courts et séquentiels, incompatibles avec workers > 1) ou "random" (uuid4)
+id_mode = "uuid5"
+
+# Registre des repères (fichier JSON, None : pas de registre) : chaque repère reçoit un seul identifiant pour tous
+# les événements et ses triplets isLandmarkType et label ne sont produits qu'une fois dans les descriptions complexes.
+# Le registre est conservé d'une exécution à l'autre pour garder les mêmes identifiants (modes memory et streaming, workers = 1)
+landmark_registry = None
+
+# Rapport d'exécution au format JSON : durée, débit (lignes/s, événements/s), pic de mémoire résidente
+# et taille des fichiers produits pour chaque étape (None : prepare_dataset_report.json dans output_dir, "" : pas de rapport)
+report_path = None
+
+# Étapes profilées avec cProfile (ex. ["write_complex"]) : les fonctions les plus coûteuses sont ajoutées au rapport
+# et le profil complet est enregistré dans profile_dir (<étape>.prof, à ouvrir avec pstats ou snakeviz ; None : output_dir/profiles).
+# Avec workers > 1, la génération a lieu dans les processus de travail et n'apparaît pas dans le profil.
+profile_stages = []
+profile_dir = None
+
+if __name__ == "__main__":
+    pl.main(defaults={
+        "in_path": in_path, "output_dir": output_dir, "split_dir": split_output_dir, "manifest_path": manifest_path,
+        "variants": variants, "jobs": jobs, "write_triples": write_triple_files, "mode": mode, "chunk_size": chunk_size,
+        "sorted_input": input_sorted_by_event, "workers": workers, "id_mode": id_mode, "report_path": report_path,
+        "landmark_registry": landmark_registry, "raw_path": raw_path, "allow": validation_allow,
+        "profile_stages": profile_stages, "profile_dir": profile_dir,
+    })
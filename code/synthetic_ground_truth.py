@@ -0,0 +1,211 @@
+import os
+import argparse
+import numpy as np
+import pandas as pd
+import file_management as fm
+
+DEFAULT_REFERENCE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", "ground_truth.csv")
+
+COLUMNS = [
+    "event_id", "event_label", "time", "line_id",
+    "landmark_label", "landmark_type",
+    "relatum_label", "relatum_type", "relation_type",
+    "change_type", "change_on", "attribute_type",
+    "outdates", "makes_effective",
+]
+
+# Colonnes catégorielles reprises telles quelles des lignes réelles : leurs distributions (jointes) sont ainsi conservées
+CATEGORICAL_COLUMNS = ["landmark_type", "relatum_type", "relation_type", "change_type", "change_on", "attribute_type"]
+
+# Vocabulaire des noms synthétiques de voies et de communes
+NAME_PARTICLES = ["", "de la ", "du ", "des ", "Saint-", "de "]
+NAME_WORDS = [
+    "Paix", "Victor Hugo", "Gare", "Chapelle", "Moulin", "Pierre Curie", "Fontaine", "Marché", "Jean Jaurès", "Pont",
+    "Rivoli", "Colombier", "Ecoles", "Arsenal", "Lilas", "Sources", "Martyrs", "Plaine", "Convention", "Charonne",
+    "Belles Feuilles", "Tourelles", "Abbaye", "Orme", "Roquette", "Louvre", "Temple", "Chemin Vert", "Cerisaie", "Vignes",
+]
+MUNICIPALITIES = [
+    "Belleville", "Gentilly", "Montrouge", "Neuilly", "Vaugirard", "Montmartre", "Charonne", "Issy-les-Moulineaux", "Ivry",
+    "La Chapelle", "Aubervilliers", "Grenelle", "La Villette", "Passy", "Paris", "Saint-Mandé", "Vincennes", "Pantin", "Batignolles",
+]
+SECTION_TEXTS = {
+    "Historique": "Précédemment, partie de la voie {name}",
+    "Dénomination": "Arrêté du {date}",
+    "Classement": "Arrêté du {date}",
+    "Ouverture": "Décret du {date}",
+    "Numérotation": "Arrêté du {date}",
+}
+FRENCH_MONTH_NAMES = ["janvier", "février", "mars", "avril", "mai", "juin", "juillet", "août", "septembre", "octobre", "novembre", "décembre"]
+
+def fit_profile(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Extrait des données réelles le « squelette » de chaque ligne : colonnes catégorielles, présence des valeurs libres,
+    format de la date, rubrique de l'événement et numéro du repère dans l'événement.
+    En tirant des événements réels entiers (avec remise), on reproduit les distributions des types de changement
+    et d'attribut, la fréquence des relatum, le nombre de lignes par événement et leurs corrélations.
+
+    Returns:
+        pd.DataFrame: Une ligne par ligne réelle, avec les colonnes `event` (numéro de l'événement réel) et `row` (rang dans l'événement).
+    """
+    df = df[df["event_id"].notna()]
+    skeleton = df[CATEGORICAL_COLUMNS].copy()
+    skeleton["event"] = df.groupby("event_id", sort=False).ngroup().to_numpy()
+    skeleton["section"] = df["event_label"].str.split(r" \|\| ").str[1].fillna("Historique").to_numpy()
+    skeleton["time_format"] = df["time"].str.len().where(df["time"].str.len().isin([4, 7, 10]), 0).fillna(0).astype(int).to_numpy()
+    for column in ["landmark_label", "relatum_label", "outdates", "makes_effective"]:
+        skeleton[f"has_{column}"] = df[column].notna().to_numpy()
+
+    # Un même repère peut apparaître sur plusieurs lignes d'un événement : on garde son numéro dans l'événement
+    skeleton["landmark_slot"] = df.groupby("event_id", sort=False)["landmark_label"].transform(lambda labels: pd.factorize(labels)[0]).to_numpy()
+    skeleton = skeleton.sort_values("event", kind="stable").reset_index(drop=True)
+    skeleton["row"] = skeleton.groupby("event").cumcount()
+    return skeleton
+
+def _names(indexes: np.ndarray) -> pd.Series:
+    """
+    Noms de voies synthétiques, tous différents pour des indices différents (ex. "de la Paix", "Victor Hugo 3").
+    """
+    particles = np.array(NAME_PARTICLES, dtype=object)[indexes % len(NAME_PARTICLES)]
+    words = np.array(NAME_WORDS, dtype=object)[(indexes // len(NAME_PARTICLES)) % len(NAME_WORDS)]
+    numbers = indexes // (len(NAME_PARTICLES) * len(NAME_WORDS))
+    suffix = np.where(numbers > 0, " " + numbers.astype(str).astype(object), "")
+    return pd.Series(particles + words + suffix, dtype=object)
+
+def _dates(rng: np.random.Generator, n: int):
+    """
+    Dates aléatoires (1750-1999) : formats ISO complet, année-mois et année, et texte en français.
+    """
+    years = rng.integers(1750, 2000, n).astype(str).astype(object)
+    months = rng.integers(1, 13, n)
+    days = rng.integers(1, 29, n)
+    iso_month = years + "-" + pd.Series(months).map("{:02d}".format).to_numpy(dtype=object)
+    iso_day = iso_month + "-" + pd.Series(days).map("{:02d}".format).to_numpy(dtype=object)
+    text = pd.Series(days).astype(str).to_numpy(dtype=object) + " " + np.array(FRENCH_MONTH_NAMES, dtype=object)[months - 1] + " " + years
+    return {4: years, 7: iso_month, 10: iso_day}, text
+
+def generate_events(skeleton: pd.DataFrame, n_events: int, rng: np.random.Generator, first_event_id: int = 1,
+                    landmarks_per_event: float = 0.43, shuffle_events: bool = False) -> pd.DataFrame:
+    """
+    Génère `n_events` événements synthétiques en tirant des squelettes d'événements réels et en remplaçant
+    les valeurs libres (libellés, dates, noms) par des valeurs synthétiques.
+
+    Args:
+        skeleton (pd.DataFrame): Squelette des données réelles (voir fit_profile).
+        n_events (int): Nombre d'événements à générer.
+        rng (np.random.Generator): Générateur aléatoire.
+        first_event_id (int): Identifiant du premier événement généré.
+        landmarks_per_event (float): Nombre de repères distincts par événement (0.43 dans les données réelles).
+        shuffle_events (bool): Si True, les identifiants first_event_id à first_event_id + n_events - 1
+            sont attribués aux événements dans un ordre aléatoire.
+
+    Returns:
+        pd.DataFrame: Lignes des événements générés, dans l'ordre des événements.
+    """
+    event_starts = np.flatnonzero(skeleton["row"].to_numpy() == 0)
+    event_sizes = np.diff(np.append(event_starts, len(skeleton)))
+    chosen = rng.integers(0, len(event_starts), n_events)
+    sizes = event_sizes[chosen]
+    rows = np.repeat(event_starts[chosen] - np.cumsum(np.append(0, sizes[:-1])), sizes) + np.arange(sizes.sum())
+    out = skeleton.iloc[rows].reset_index(drop=True)
+    events = np.repeat(np.arange(n_events), sizes)
+    n_rows = len(out)
+
+    # Repères : un nom tiré dans un vivier par (événement, numéro de repère), préfixé par le type de voie
+    pool = _names(np.arange(max(1, int(n_events * landmarks_per_event)))).to_numpy()
+    landmark_names = rng.integers(0, len(pool), n_events * 4)
+    slots = np.minimum(out["landmark_slot"].to_numpy(), 3)
+    names = pool[landmark_names[events * 4 + np.where(slots < 0, 0, slots)]]
+    landmark_type = out["landmark_type"].fillna("voie").to_numpy(dtype=object)
+    landmark_label = pd.Series(landmark_type).str.capitalize().to_numpy(dtype=object) + " " + names
+
+    dates, date_text = _dates(rng, n_events)
+    time = np.full(n_rows, None, dtype=object)
+    time_format = out["time_format"].to_numpy()
+    for length, values in dates.items():
+        mask = time_format == length
+        time[mask] = values[events[mask]]
+
+    first_rows = np.append(0, np.cumsum(sizes)[:-1])
+    sections = out["section"].to_numpy(dtype=object)
+    texts = np.array([SECTION_TEXTS.get(section, "Précédemment {name}").format(date=date if fmt else "date inconnue", name=name)
+                      for section, fmt, date, name in zip(sections[first_rows], time_format[first_rows], date_text, names[first_rows])],
+                     dtype=object)
+    event_label = pd.Series(landmark_label[first_rows]).str.lower().to_numpy(dtype=object) + " || " + sections[first_rows] + " || " + texts
+    event_ids = np.arange(first_event_id, first_event_id + n_events)
+    if shuffle_events:
+        event_ids = rng.permutation(event_ids)
+    line_id = (event_ids + 9000).astype(str).astype(object) + "_" + pd.Series(sections[first_rows]).str.lower().to_numpy(dtype=object)
+
+    result = pd.DataFrame({
+        "event_id": event_ids[events].astype(str),
+        "event_label": event_label[events],
+        "time": time,
+        "line_id": line_id[events],
+        "landmark_label": np.where(out["has_landmark_label"], landmark_label, None),
+        "landmark_type": out["landmark_type"].to_numpy(dtype=object),
+        "relatum_label": np.where(out["has_relatum_label"], np.array(MUNICIPALITIES, dtype=object)[rng.integers(0, len(MUNICIPALITIES), n_rows)], None),
+        "relatum_type": out["relatum_type"].to_numpy(dtype=object),
+        "relation_type": out["relation_type"].to_numpy(dtype=object),
+        "change_type": out["change_type"].to_numpy(dtype=object),
+        "change_on": out["change_on"].to_numpy(dtype=object),
+        "attribute_type": out["attribute_type"].to_numpy(dtype=object),
+    })
+    new_names = landmark_type + " " + pool[rng.integers(0, len(pool), n_rows)]
+    old_names = landmark_type + " " + pool[rng.integers(0, len(pool), n_rows)]
+    result["outdates"] = np.where(out["has_outdates"], old_names, None)
+    result["makes_effective"] = np.where(out["has_makes_effective"], new_names, None)
+    return result[COLUMNS]
+
+def iter_synthetic_ground_truth(n_rows: int, reference_path: str = DEFAULT_REFERENCE_PATH, seed: int = 0, chunk_rows: int = 1_000_000,
+                                shuffle_events: bool = True):
+    """
+    Produit, par morceaux d'environ `chunk_rows` lignes, une vérité terrain synthétique d'au moins `n_rows` lignes
+    (la dernière ligne termine un événement) dont les distributions reproduisent celles du fichier de référence.
+
+    Args:
+        n_rows (int): Nombre de lignes souhaité.
+        reference_path (str): Fichier de vérité terrain réel servant de modèle.
+        seed (int): Graine du générateur aléatoire (mêmes paramètres et même graine : même fichier).
+        chunk_rows (int): Taille approximative des morceaux produits.
+        shuffle_events (bool): Si True, les identifiants d'événements ne sont pas triés dans le fichier (dans chaque morceau),
+            comme dans le fichier réel ; les lignes d'un même événement restent contiguës.
+
+    Yields:
+        pd.DataFrame: Morceaux de la vérité terrain synthétique.
+    """
+    skeleton = fit_profile(fm.read_csv_as_dataframe(reference_path, separator="\t"))
+    rows_per_event = len(skeleton) / (skeleton["row"] == 0).sum()
+    rng = np.random.default_rng(seed)
+
+    produced, first_event_id = 0, 1
+    while produced < n_rows:
+        n_events = max(1, int(min(chunk_rows, n_rows - produced) / rows_per_event))
+        chunk = generate_events(skeleton, n_events, rng, first_event_id, shuffle_events=shuffle_events)
+        produced += len(chunk)
+        first_event_id += n_events
+        yield chunk
+
+def write_synthetic_ground_truth(out_path: str, n_rows: int, reference_path: str = DEFAULT_REFERENCE_PATH, seed: int = 0,
+                                 chunk_rows: int = 1_000_000, shuffle_events: bool = True) -> int:
+    """
+    Écrit une vérité terrain synthétique (voir iter_synthetic_ground_truth) au format du fichier réel (séparateur tabulation).
+
+    Returns:
+        int: Nombre de lignes écrites.
+    """
+    written = 0
+    for i, chunk in enumerate(iter_synthetic_ground_truth(n_rows, reference_path, seed, chunk_rows, shuffle_events)):
+        chunk.to_csv(out_path, sep="\t", index=False, encoding="utf-8", mode="w" if i == 0 else "a", header=i == 0)
+        written += len(chunk)
+    return written
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Génère une vérité terrain synthétique à partir des distributions du fichier réel.")
+    parser.add_argument("n_rows", type=int, help="Nombre de lignes (ex. 10000, 1000000, 10000000)")
+    parser.add_argument("out_path", help="Fichier CSV de sortie")
+    parser.add_argument("--reference", default=DEFAULT_REFERENCE_PATH, help="Fichier de vérité terrain servant de modèle")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--sorted", action="store_true", help="Événements triés par event_id")
+    args = parser.parse_args()
+    n = write_synthetic_ground_truth(args.out_path, args.n_rows, args.reference, args.seed, shuffle_events=not args.sorted)
+    print(f"{n} lignes écrites dans {args.out_path}")
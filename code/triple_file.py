@@ -0,0 +1,319 @@
+import os
+import json
+import mmap
+import shutil
+import struct
+import tempfile
+from typing import Dict, List
+import numpy as np
+import file_management as fm
+from triple_table import TripleTable, encode_json_values
+
+# Format colonnaire des triplets (fichiers .triples) :
+#   - 8 octets : MAGIC
+#   - 8 octets : taille de l'en-tête (entier non signé, petit-boutiste)
+#   - en-tête JSON : nombre d'événements, de triplets et de valeurs, position / type / longueur de chaque colonne
+#   - colonnes, chacune alignée sur 64 octets :
+#       sub, rel, obj                 codes (int32) des triplets dans le dictionnaire des valeurs
+#       event_offsets                 position (int64) du premier triplet de chaque événement, puis nombre total de triplets
+#       values, ids, labels           colonnes de chaînes : valeurs JSON séparées par "\n" (`*_data`)
+#                                     et position (int64) du début de chaque valeur (`*_offsets`)
+# Les valeurs sont stockées encodées en JSON, ce qui conserve leur type (chaîne, null, nombre).
+MAGIC = b"PGZTRIP\x01"
+ALIGNMENT = 64
+CODE_COLUMNS = ["sub", "rel", "obj"]
+STRING_COLUMNS = ["values", "ids", "labels"]
+BATCH_SIZE = 10_000
+
+class _Spill:
+    """
+    Colonne écrite au fur et à mesure dans un fichier temporaire.
+    """
+    def __init__(self, directory: str, name: str, dtype: str):
+        self.path = os.path.join(directory, name)
+        self.dtype = dtype
+        self.count = 0
+        self.file = open(self.path, "wb")
+
+    def write(self, values) -> None:
+        values = np.asarray(values, dtype=self.dtype)
+        self.file.write(values.tobytes())
+        self.count += len(values)
+
+class _StringSpill:
+    """
+    Colonne de chaînes JSON écrite au fur et à mesure : données séparées par "\n" et positions de début.
+    """
+    def __init__(self, directory: str, name: str):
+        self.data = _Spill(directory, f"{name}_data", "u1")
+        self.offsets = _Spill(directory, f"{name}_offsets", "<i8")
+        self.size = 0
+
+    def write(self, encoded: List[str]) -> None:
+        if not encoded:
+            return
+        data = ("\n".join(encoded) + "\n").encode("utf-8")
+        # Le JSON encodé ne contient jamais de retour à la ligne : chaque valeur commence après le "\n" précédent
+        ends = np.flatnonzero(np.frombuffer(data, dtype=np.uint8) == ord("\n"))
+        self.offsets.write(self.size + np.concatenate([[0], ends[:-1] + 1]))
+        self.data.file.write(data)
+        self.data.count += len(data)
+        self.size += len(data)
+
+class TripleFileWriter:
+    """
+    Écrit un fichier .triples à partir de tables de triplets (voir triple_table.py) ajoutées lot par lot.
+    Les colonnes sont déversées dans des fichiers temporaires puis assemblées à la fermeture ;
+    seul le dictionnaire global des valeurs (valeur -> code) est gardé en mémoire.
+
+    Args:
+        path (str): Chemin du fichier de sortie.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self.tmp_dir = tempfile.mkdtemp(dir=os.path.dirname(os.path.abspath(path)))
+        self.codes = {}
+        self.n_triples = 0
+        self.columns = {name: _Spill(self.tmp_dir, name, "<i4") for name in CODE_COLUMNS}
+        self.columns["event_offsets"] = _Spill(self.tmp_dir, "event_offsets", "<i8")
+        self.strings = {name: _StringSpill(self.tmp_dir, name) for name in STRING_COLUMNS}
+
+    def append(self, table: TripleTable) -> None:
+        """
+        Ajoute les événements d'une table, en réencodant ses codes dans le dictionnaire global.
+        """
+        mapping = np.empty(len(table.values), dtype=np.int32)
+        added = []
+        for code, value in enumerate(table.values):
+            global_code = self.codes.get(value)
+            if global_code is None:
+                global_code = self.codes[value] = len(self.codes)
+                added.append(value)
+            mapping[code] = global_code
+
+        self.strings["values"].write(encode_json_values(added))
+        for name in CODE_COLUMNS:
+            self.columns[name].write(mapping[getattr(table, name)])
+        self.columns["event_offsets"].write(self.n_triples + table.event_offsets[:-1])
+        self.n_triples += len(table)
+        self.strings["ids"].write(encode_json_values(table.event_ids))
+        self.strings["labels"].write(encode_json_values(table.event_labels))
+
+    def close(self) -> None:
+        """
+        Assemble l'en-tête et les colonnes dans le fichier de sortie.
+        """
+        try:
+            self.columns["event_offsets"].write([self.n_triples])
+            spills = dict(self.columns)
+            for name, column in self.strings.items():
+                column.offsets.write([column.size])
+                spills[f"{name}_offsets"] = column.offsets
+                spills[f"{name}_data"] = column.data
+            for spill in spills.values():
+                spill.file.close()
+
+            arrays, position = {}, 0
+            for name, spill in spills.items():
+                arrays[name] = {"offset": position, "dtype": spill.dtype, "count": spill.count}
+                position += _aligned(spill.count * np.dtype(spill.dtype).itemsize)
+            header = {
+                "n_events": self.columns["event_offsets"].count - 1,
+                "n_triples": self.n_triples,
+                "n_values": len(self.codes),
+                "arrays": arrays,
+            }
+            encoded_header = json.dumps(header).encode("utf-8")
+            data_start = _aligned(len(MAGIC) + 8 + len(encoded_header))
+
+            with open(self.path, "wb") as out:
+                out.write(MAGIC + struct.pack("<Q", len(encoded_header)) + encoded_header)
+                for name, spill in spills.items():
+                    out.seek(data_start + arrays[name]["offset"])
+                    with open(spill.path, "rb") as f:
+                        shutil.copyfileobj(f, out, fm.JSONL_BUFFER_SIZE)
+                out.truncate(data_start + position)
+        finally:
+            shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def discard(self) -> None:
+        """
+        Abandonne l'écriture : les fichiers temporaires sont supprimés et le fichier de sortie n'est pas créé.
+        """
+        for spill in list(self.columns.values()) + [s for column in self.strings.values() for s in (column.data, column.offsets)]:
+            spill.file.close()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+def _aligned(size: int) -> int:
+    return -(-size // ALIGNMENT) * ALIGNMENT
+
+def write_triple_file(tables, path: str) -> None:
+    """
+    Écrit un fichier .triples à partir d'une table ou d'un itérable de tables.
+    """
+    with TripleFileWriter(path) as writer:
+        for table in [tables] if isinstance(tables, TripleTable) else tables:
+            writer.append(table)
+
+def convert_jsonl_to_triple_file(jsonl_path: str, path: str, batch_size: int = BATCH_SIZE) -> None:
+    """
+    Convertit un fichier JSONL de descriptions ({"id", "sent", "triples"}) en fichier .triples, par lots.
+    """
+    records = fm.iter_jsonl(jsonl_path)
+
+    def tables():
+        batch = []
+        for record in records:
+            batch.append(record)
+            if len(batch) == batch_size:
+                yield TripleTable.from_descriptions(batch)
+                batch = []
+        if batch:
+            yield TripleTable.from_descriptions(batch)
+
+    write_triple_file(tables(), path)
+
+class TripleFile:
+    """
+    Lecteur d'un fichier .triples projeté en mémoire (mmap) : l'ouverture ne lit que l'en-tête,
+    et les triplets d'un événement sont décodés sans parcourir le reste du fichier.
+
+    Args:
+        path (str): Chemin du fichier .triples.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[:len(MAGIC)] != MAGIC:
+            self._mmap.close()
+            raise ValueError(f"{path} n'est pas un fichier .triples")
+        header_size, = struct.unpack_from("<Q", self._mmap, len(MAGIC))
+        self.header = json.loads(self._mmap[len(MAGIC) + 8:len(MAGIC) + 8 + header_size])
+        data_start = _aligned(len(MAGIC) + 8 + header_size)
+
+        self.arrays = {
+            name: np.frombuffer(self._mmap, dtype=spec["dtype"], count=spec["count"], offset=data_start + spec["offset"])
+            for name, spec in self.header["arrays"].items()
+        }
+        self._values = {}
+        self._positions = None
+
+    def __len__(self) -> int:
+        return self.header["n_events"]
+
+    @property
+    def n_triples(self) -> int:
+        return self.header["n_triples"]
+
+    def _string(self, column: str, i: int):
+        offsets = self.arrays[f"{column}_offsets"]
+        start, end = int(offsets[i]), int(offsets[i + 1]) - 1
+        return json.loads(self.arrays[f"{column}_data"][start:end].tobytes())
+
+    def _strings(self, column: str) -> np.ndarray:
+        """
+        Décode toute une colonne de chaînes en un seul appel.
+        """
+        data = self.arrays[f"{column}_data"].tobytes()
+        values = np.empty(self.arrays[f"{column}_offsets"].size - 1, dtype=object)
+        if data:
+            values[:] = json.loads(b"[" + data[:-1].replace(b"\n", b",") + b"]")
+        return values
+
+    def value(self, code: int):
+        """
+        Valeur du dictionnaire correspondant à un code (les valeurs décodées sont gardées en cache).
+        """
+        if code not in self._values:
+            self._values[code] = self._string("values", code)
+        return self._values[code]
+
+    def event_triples(self, i: int) -> List[Dict[str, any]]:
+        """
+        Triplets du i-ème événement, au format [{"sub", "rel", "obj"}].
+        """
+        start, end = (int(x) for x in self.arrays["event_offsets"][i:i + 2])
+        columns = [self.arrays[name][start:end].tolist() for name in CODE_COLUMNS]
+        return [{"sub": self.value(sub), "rel": self.value(rel), "obj": self.value(obj)} for sub, rel, obj in zip(*columns)]
+
+    def event(self, i: int) -> Dict[str, any]:
+        """
+        Description du i-ème événement, au format {"id", "sent", "triples"}.
+        """
+        if not -len(self) <= i < len(self):
+            raise IndexError(i)
+        i %= len(self)
+        return {"id": self._string("ids", i), "sent": self._string("labels", i), "triples": self.event_triples(i)}
+
+    def __getitem__(self, i: int) -> Dict[str, any]:
+        return self.event(i)
+
+    def __iter__(self):
+        return (self.event(i) for i in range(len(self)))
+
+    def find(self, event_id) -> int:
+        """
+        Position de l'événement d'identifiant `event_id` (l'index des identifiants est construit au premier appel).
+        """
+        if self._positions is None:
+            self._positions = {event_id: i for i, event_id in enumerate(self._strings("ids"))}
+        return self._positions[event_id]
+
+    def to_table(self) -> TripleTable:
+        """
+        Charge tout le fichier dans une table de triplets (les colonnes de codes ne sont pas copiées).
+        """
+        return TripleTable(self._strings("values"), *(self.arrays[name] for name in CODE_COLUMNS),
+                           self.arrays["event_offsets"], self._strings("ids"), self._strings("labels"))
+
+    def close(self) -> None:
+        self.arrays = {}
+        try:
+            self._mmap.close()
+        except BufferError:
+            # Des tableaux issus du fichier sont encore utilisés : la projection sera libérée avec eux
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+def write_event_tables(table_batches, jsonl_paths, triple_paths=None) -> None:
+    """
+    Écrit les fichiers JSONL et, si `triple_paths` est donné, les fichiers .triples correspondants
+    à partir des tables de triplets produites lot par lot (voir event_description_generator.iter_event_tables).
+    Chaque lot est sérialisé une seule fois pour les deux formats.
+
+    Args:
+        table_batches (iterable): Tuples de tables (simple, simple pour BERT, complexe).
+        jsonl_paths (list): Chemins des fichiers JSONL, dans l'ordre des tables.
+        triple_paths (list): Chemins des fichiers .triples, dans l'ordre des tables (optionnel).
+    """
+    writers = [TripleFileWriter(path) for path in triple_paths or []]
+
+    def lines():
+        for tables in table_batches:
+            for writer, table in zip(writers, tables):
+                writer.append(table)
+            yield from zip(*(table.to_json_lines() for table in tables))
+
+    try:
+        fm.write_jsonl_files(lines(), jsonl_paths, encoded=True)
+    except BaseException:
+        for writer in writers:
+            writer.discard()
+        raise
+    for writer in writers:
+        writer.close()
@@ -0,0 +1,209 @@
+import gc
+import json
+from json.encoder import encode_basestring
+from typing import Dict, List
+import numpy as np
+import pandas as pd
+import auxiliary_functions as af
+
+class TripleTable:
+    """
+    Représentation compacte des triplets d'un ensemble d'événements.
+
+    Chaque valeur distincte (sujet, relation ou objet) est stockée une seule fois dans un dictionnaire `values` ;
+    les triplets sont trois tableaux parallèles d'entiers (`sub`, `rel`, `obj`) qui indexent ce dictionnaire.
+    Les triplets de l'événement i occupent les positions event_offsets[i] à event_offsets[i + 1].
+    La conversion vers le format {"sub", "rel", "obj"} n'a lieu qu'à la sérialisation.
+
+    Args:
+        values (np.ndarray): Dictionnaire des valeurs distinctes (tableau d'objets).
+        sub, rel, obj (np.ndarray): Codes (int32) des sujets, relations et objets.
+        event_offsets (np.ndarray): Position du premier triplet de chaque événement, suivie du nombre total de triplets.
+        event_ids (np.ndarray): Identifiant de chaque événement.
+        event_labels (np.ndarray): Phrase de chaque événement.
+    """
+    def __init__(self, values, sub, rel, obj, event_offsets, event_ids, event_labels):
+        self.values = values
+        self.sub = sub
+        self.rel = rel
+        self.obj = obj
+        self.event_offsets = event_offsets
+        self.event_ids = event_ids
+        self.event_labels = event_labels
+        self._codes = None
+
+    @classmethod
+    def from_arrays(cls, event_ids, event_labels, triple_events, subs, rels, objs) -> "TripleTable":
+        """
+        Construit la table à partir de tableaux de valeurs alignés, les triplets étant déjà ordonnés par événement.
+        """
+        codes, values = pd.factorize(np.concatenate([subs, rels, objs]))
+        # Les valeurs manquantes (None) ont le code -1 : on leur réserve une case du dictionnaire
+        values = np.append(np.asarray(values, dtype=object), None)
+        codes = np.where(codes < 0, len(values) - 1, codes).astype(np.int32)
+        sub, rel, obj = np.split(codes, 3)
+
+        counts = np.bincount(triple_events, minlength=len(event_ids))
+        event_offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        return cls(values, sub, rel, obj, event_offsets, np.asarray(event_ids, dtype=object), np.asarray(event_labels, dtype=object))
+
+    @classmethod
+    def from_descriptions(cls, events: List[Dict[str, any]]) -> "TripleTable":
+        """
+        Construit la table à partir de descriptions au format {"id", "sent", "triples": [{"sub", "rel", "obj"}]}.
+        """
+        triples = [triple for event in events for triple in event.get("triples", [])]
+        counts = [len(event.get("triples", [])) for event in events]
+        return cls.from_arrays(
+            [event.get("id") for event in events],
+            [event.get("sent") for event in events],
+            np.repeat(np.arange(len(events)), counts),
+            np.array([t.get("sub") for t in triples], dtype=object),
+            np.array([t.get("rel") for t in triples], dtype=object),
+            np.array([t.get("obj") for t in triples], dtype=object),
+        )
+
+    def __len__(self) -> int:
+        return len(self.sub)
+
+    @property
+    def n_events(self) -> int:
+        return len(self.event_ids)
+
+    @property
+    def triple_events(self) -> np.ndarray:
+        """
+        Numéro d'événement de chaque triplet.
+        """
+        return np.repeat(np.arange(self.n_events), np.diff(self.event_offsets))
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Taille approximative de la table en mémoire (tableaux et chaînes du dictionnaire).
+        """
+        arrays = [self.sub, self.rel, self.obj, self.event_offsets, self.values]
+        return sum(a.nbytes for a in arrays) + sum(len(v) for v in self.values if isinstance(v, str))
+
+    def intern(self, values) -> np.ndarray:
+        """
+        Retourne les codes d'une liste de valeurs, en ajoutant au dictionnaire celles qui n'y sont pas encore.
+        """
+        if self._codes is None:
+            self._codes = {v: i for i, v in enumerate(self.values)}
+        missing = [v for v in dict.fromkeys(values) if v not in self._codes]
+        if missing:
+            self._codes.update((v, i) for i, v in enumerate(missing, start=len(self.values)))
+            added = np.empty(len(missing), dtype=object)
+            added[:] = missing
+            self.values = np.concatenate([self.values, added])
+        return np.array([self._codes[v] for v in values], dtype=np.int32)
+
+    def _with(self, keep: np.ndarray = None, sub=None, rel=None, obj=None) -> "TripleTable":
+        """
+        Nouvelle table (partageant le dictionnaire) restreinte aux triplets sélectionnés par `keep`,
+        avec éventuellement d'autres colonnes de codes.
+        """
+        sub = self.sub if sub is None else sub
+        rel = self.rel if rel is None else rel
+        obj = self.obj if obj is None else obj
+        if keep is None:
+            return TripleTable(self.values, sub, rel, obj, self.event_offsets, self.event_ids, self.event_labels)
+        counts = np.bincount(self.triple_events[keep], minlength=self.n_events)
+        event_offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        return TripleTable(self.values, sub[keep], rel[keep], obj[keep], event_offsets, self.event_ids, self.event_labels)
+
+    def deduplicate(self) -> "TripleTable":
+        """
+        Supprime les triplets en double au sein de chaque événement en gardant la première occurrence,
+        comme auxiliary_functions.deduplicate_triples(), mais sur des tuples d'entiers.
+        """
+        keys = pd.DataFrame({"event": self.triple_events, "sub": self.sub, "rel": self.rel, "obj": self.obj})
+        return self._with(~keys.duplicated().to_numpy())
+
+    def to_bert_simple(self) -> "TripleTable":
+        """
+        Applique les règles de create_bert_simple_event_description() à toute la table, colonne par colonne :
+        - les triplets hasNewName / hasOldName dont le sujet et l'objet sont égaux (sans tenir compte de la casse) sont supprimés ;
+        - les triplets isLandmarkType sont inversés et deviennent isLandmarkTypeOf ;
+        - les triplets hasTime sont supprimés (objet "noTime") ou leur date est convertie en français.
+        Comme dans la version par événement, un événement dont aucun triplet n'est conservé tel quel garde ses triplets d'origine.
+        """
+        table = self._with()
+        values = self.values
+        is_str = np.array([isinstance(v, str) for v in values], dtype=bool)
+        lowered = pd.factorize(np.array([v.lower() if isinstance(v, str) else None for v in values], dtype=object))[0]
+        lowered = np.where(is_str, lowered, -1 - np.arange(len(values)))
+
+        def rel_is(*names):
+            return np.isin(self.rel, np.flatnonzero(pd.Series(values).isin(names).to_numpy()))
+
+        is_name = rel_is("hasNewName", "hasOldName")
+        same_name = is_name & is_str[self.sub] & is_str[self.obj] & (lowered[self.sub] == lowered[self.obj])
+        is_type = rel_is("isLandmarkType")
+        is_time = rel_is("hasTime") & is_str[self.obj]
+        no_time = is_time & (values[self.obj] == "noTime")
+        kept_as_is = ~(same_name | is_type | is_time)
+
+        # Événements dont au moins un triplet est conservé tel quel : les autres gardent leurs triplets d'origine
+        transformed_events = np.bincount(self.triple_events[kept_as_is], minlength=self.n_events) > 0
+        transformed = transformed_events[self.triple_events]
+
+        # Conversion des dates, une seule fois par valeur distincte du dictionnaire
+        date_codes = np.unique(self.obj[is_time & ~no_time])
+        converted = np.arange(len(values), dtype=np.int32)
+        converted[date_codes] = table.intern(list(af.dates_to_french_natural(values[date_codes])))
+
+        type_of = table.intern(["isLandmarkTypeOf"])[0]
+        sub = np.where(is_type, self.obj, self.sub)
+        rel = np.where(is_type, type_of, self.rel)
+        obj = np.where(is_type, self.sub, np.where(is_time, converted[self.obj], self.obj))
+
+        keep = ~transformed | ~(same_name | no_time)
+        return table._with(keep,
+                          sub=np.where(transformed, sub, self.sub).astype(np.int32),
+                          rel=np.where(transformed, rel, self.rel).astype(np.int32),
+                          obj=np.where(transformed, obj, self.obj).astype(np.int32))
+
+    def to_descriptions(self) -> List[Dict[str, any]]:
+        """
+        Convertit la table en descriptions au format {"id", "sent", "triples": [{"sub", "rel", "obj"}]}.
+        """
+        subs, rels, objs = self.values[self.sub], self.values[self.rel], self.values[self.obj]
+        bounds = self.event_offsets.tolist()
+
+        # La création de millions de petits dicts déclenche inutilement le ramasse-miettes cyclique
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            triples = [{"sub": sub, "rel": rel, "obj": obj} for sub, rel, obj in zip(subs, rels, objs)]
+            return [
+                {"id": event_id, "sent": event_label, "triples": triples[start:end]}
+                for event_id, event_label, start, end in zip(self.event_ids, self.event_labels, bounds[:-1], bounds[1:])
+            ]
+        finally:
+            if gc_enabled:
+                gc.enable()
+
+    def to_json_lines(self) -> List[str]:
+        """
+        Sérialise directement chaque événement en une ligne JSON, identique à
+        json.dumps(description, ensure_ascii=False) : chaque valeur du dictionnaire n'est encodée qu'une fois.
+        """
+        encoded = np.array(encode_json_values(self.values), dtype=object)
+        subs, rels, objs = encoded[self.sub].tolist(), encoded[self.rel].tolist(), encoded[self.obj].tolist()
+        triples = [f'{{"sub": {sub}, "rel": {rel}, "obj": {obj}}}' for sub, rel, obj in zip(subs, rels, objs)]
+        bounds = self.event_offsets.tolist()
+
+        return [
+            f'{{"id": {event_id}, "sent": {event_label}, "triples": [{", ".join(triples[start:end])}]}}'
+            for event_id, event_label, start, end in zip(encode_json_values(self.event_ids), encode_json_values(self.event_labels),
+                                                         bounds[:-1], bounds[1:])
+        ]
+
+def encode_json_values(values) -> List[str]:
+    """
+    Encode chaque valeur en JSON comme json.dumps(valeur, ensure_ascii=False),
+    en appelant directement l'encodeur de chaînes pour éviter de créer un encodeur par valeur.
+    """
+    return [encode_basestring(v) if isinstance(v, str) else json.dumps(v, ensure_ascii=False) for v in values]
@@ -0,0 +1,251 @@
+import os
+import csv
+import time
+import argparse
+from collections import Counter
+from typing import Dict, Optional
+import numpy as np
+import pandas as pd
+import file_management as fm
+import auxiliary_functions as af
+import event_description_generator as edg
+import change_predicates as cp
+
+DATA_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data"))
+# Table déclarative des valeurs admises : une ligne par (colonne, valeur). Une cellule canonical non vide
+# fait de la valeur une variante (ex. faute de frappe) remplacée par la valeur canonique.
+DEFAULT_VOCABULARY_PATH = os.path.join(DATA_DIR, "ground_truth_vocabulary.tsv")
+
+# Statuts d'annotation acceptés dans la colonne `validated` (X, A, P) ; "ø" marque une ligne écartée, vide une ligne non relue
+VALIDATED_STATUSES = ["x", "a", "p"]
+REQUIRED_COLUMNS = ["event_id", "event_label", "landmark_label", "landmark_type"]
+ENUM_COLUMNS = ["landmark_type", "relatum_type", "relation_type", "change_type", "change_on", "attribute_type"]
+RELATION_COLUMNS = ["relatum_label", "relatum_type", "relation_type"]
+
+# Motifs de rejet, dans l'ordre du rapport
+REASONS = (["not_validated"] + [f"missing_{column}" for column in REQUIRED_COLUMNS] + ["invalid_event_id", "invalid_time"]
+           + [f"invalid_{column}" for column in ENUM_COLUMNS]
+           + ["incomplete_relation", "unknown_change", "missing_values", "unexpected_values"])
+# Motifs pour lesquels la ligne est conservée par défaut : les lignes de classement et de numérotation
+# n'ont pas de règle de changement (unknown_change) mais sont des annotations valides
+DEFAULT_ALLOW = ("unknown_change",)
+
+def load_vocabulary(file_path: str = DEFAULT_VOCABULARY_PATH, separator: str = "\t"):
+    """
+    Charge la table des valeurs admises (colonnes column, value, canonical).
+
+    Returns:
+        tuple: (valeurs canoniques par colonne, {variante: valeur canonique} par colonne).
+    """
+    values = {column: set() for column in ENUM_COLUMNS}
+    aliases = {column: {} for column in ENUM_COLUMNS}
+    with open(file_path, "r", encoding="utf-8", newline="") as f:
+        for row in csv.DictReader(f, delimiter=separator):
+            if row.get("canonical"):
+                aliases[row["column"]][row["value"]] = row["canonical"]
+            else:
+                values[row["column"]].add(row["value"])
+    return values, aliases
+
+def _has_rule(index: cp.ChangePredicateIndex, change_types: pd.Series, change_ons: pd.Series, attribute_types: pd.Series) -> np.ndarray:
+    """
+    Masque des lignes dont la combinaison (change_type, change_on, attribute_type) a des prédicats (voir get_change_predicates).
+    Les valeurs manquantes sont None (voir normalise_rows).
+    """
+    found = index.lookup_columns(change_types.to_numpy(dtype=object), change_ons.to_numpy(dtype=object),
+                                 attribute_types.to_numpy(dtype=object))["change_time"]
+    return found != None
+
+def _distinct(column: pd.Series, function) -> pd.Series:
+    """
+    Applique `function` (Series -> Series) aux seules valeurs distinctes de la colonne, puis diffuse le résultat sur les lignes.
+    """
+    codes, uniques = pd.factorize(column)
+    mapped = function(pd.Series(uniques, dtype=object)).to_numpy(dtype=object)
+    return pd.Series(np.append(mapped, None)[codes], index=column.index)
+
+def _strip_spaces(column: pd.Series) -> pd.Series:
+    # Un seul passage par valeur : espaces de début et de fin retirés, suites d'espaces (tabulations, sauts de ligne) réduites à une espace
+    values = [" ".join(value.split()) or None if isinstance(value, str) else None for value in column.to_numpy(dtype=object)]
+    return pd.Series(values, index=column.index, dtype=object)
+
+def _enum_values(column: pd.Series, aliases: Dict[str, str], stats: Counter) -> pd.Series:
+    """
+    Valeurs énumérées sans espaces en trop, en minuscules, les variantes étant remplacées par leur valeur canonique.
+    Le traitement porte sur les valeurs distinctes, peu nombreuses.
+    """
+    codes, uniques = pd.factorize(column)
+    distinct = [" ".join(value.split()).casefold() or None for value in uniques]
+    corrected = np.array([value in aliases for value in distinct], dtype=bool)
+    if corrected.any():
+        stats["corrected_values"] += int(np.bincount(codes[codes >= 0], minlength=len(distinct))[corrected].sum())
+    mapped = np.array([aliases.get(value, value) for value in distinct] + [None], dtype=object)
+    return pd.Series(mapped[codes], index=column.index)
+
+def normalise_rows(df: pd.DataFrame, aliases: Dict[str, Dict[str, str]], index: cp.ChangePredicateIndex, stats: Counter) -> pd.DataFrame:
+    """
+    Normalise un morceau lu en chaînes : espaces en trop retirés (cellule vide -> manquante, None), valeurs énumérées en minuscules
+    et variantes remplacées par leur valeur canonique, change_type et change_on échangés s'ils ne correspondent
+    à une règle de changement qu'une fois inversés (ex. "landmark" / "appearance").
+    """
+    df = df.apply(lambda column: _enum_values(column, aliases[column.name], stats) if column.name in ENUM_COLUMNS
+                  else _strip_spaces(column))
+
+    # Les combinaisons sont recherchées une fois chacune (voir ChangePredicateIndex.lookup_columns)
+    swapped = ((df["change_type"].to_numpy() != None) & ~_has_rule(index, df["change_type"], df["change_on"], df["attribute_type"])
+               & _has_rule(index, df["change_on"], df["change_type"], df["attribute_type"]))
+    if swapped.any():
+        df.loc[swapped, ["change_type", "change_on"]] = df.loc[swapped, ["change_on", "change_type"]].to_numpy()
+        stats["swapped_changes"] += int(swapped.sum())
+    return df
+
+def _invalid_dates(times: pd.Series) -> pd.Series:
+    """
+    Masque des dates présentes qui ne sont pas des dates ISO partielles existantes (ex. "C13", "1877-02-30").
+    Le motif et le calendrier sont ceux de la mise en forme des dates (voir auxiliary_functions.py), vérifiés
+    sans conversion en datetime, dont les bornes (1677-2262) excluraient les dates anciennes.
+    """
+    parts = times.str.extract(af.ISO_PARTIAL_DATE_PATTERN).apply(pd.to_numeric).to_numpy(dtype=float)
+    year, month, day = parts[:, 0], parts[:, 1], parts[:, 2]
+    with np.errstate(invalid="ignore"):
+        bad_month = (month < 1) | (month > 12)
+        known_month = np.where(np.isnan(month) | bad_month, 1, month).astype(int)
+        bad_day = (day < 1) | (day > af._days_in_month(year, known_month))
+    return times.notna() & (np.isnan(year) | bad_month | bad_day)
+
+def check_rows(df: pd.DataFrame, values: Dict[str, set], index: cp.ChangePredicateIndex) -> np.ndarray:
+    """
+    Contrôles colonne par colonne d'un morceau normalisé.
+
+    Returns:
+        np.ndarray: Matrice booléenne (lignes × REASONS), vraie pour chaque motif de rejet d'une ligne.
+    """
+    # Les valeurs manquantes sont None : comparaison directe, bien plus rapide que notna() sur des colonnes d'objets
+    present = pd.DataFrame(df.to_numpy(dtype=object) != None, index=df.index, columns=df.columns)
+    checks = {}
+    if "validated" in df.columns:
+        checks["not_validated"] = ~df["validated"].str.casefold().isin(VALIDATED_STATUSES)
+    for column in REQUIRED_COLUMNS:
+        checks[f"missing_{column}"] = ~present[column]
+    checks["invalid_event_id"] = present["event_id"] & ~df["event_id"].str.isdigit().astype(bool)
+    checks["invalid_time"] = _distinct(df["time"], _invalid_dates).fillna(False).astype(bool)
+    for column in ENUM_COLUMNS:
+        checks[f"invalid_{column}"] = present[column] & ~df[column].isin(list(values[column]))
+
+    # Un relatum a un libellé, un type et une relation ; un changement de relation en demande un
+    relation_parts = present[RELATION_COLUMNS].sum(axis=1)
+    checks["incomplete_relation"] = ((relation_parts != 0) & (relation_parts != len(RELATION_COLUMNS))
+                                     | (df["change_on"].eq("relation") & ~present["relatum_label"]))
+    # Changement sans règle : la ligne ne produirait aucun triplet de changement
+    has_change = present[["change_type", "change_on", "attribute_type"]].any(axis=1)
+    checks["unknown_change"] = has_change & ~_has_rule(index, df["change_type"], df["change_on"], df["attribute_type"])
+    # Les anciennes et nouvelles valeurs ne sont produites que pour une transition ; un changement de nom en demande au moins une
+    has_values = present[["outdates", "makes_effective"]].any(axis=1)
+    transition = df["change_type"].eq("transition")
+    checks["missing_values"] = transition & df["attribute_type"].eq("name") & ~has_values
+    checks["unexpected_values"] = has_values & ~transition
+
+    flags = np.zeros((len(df), len(REASONS)), dtype=bool)
+    for position, reason in enumerate(REASONS):
+        if reason in checks:
+            flags[:, position] = np.asarray(checks[reason], dtype=bool)
+    return flags
+
+def rejected_path(clean_path: str) -> str:
+    """
+    Rapport des lignes rejetées d'un fichier nettoyé : ground_truth_clean.csv -> ground_truth_clean_rejected.csv.
+    """
+    return os.path.splitext(clean_path)[0] + "_rejected.csv"
+
+def validate_file(raw_path: str, clean_path: str, report_path: Optional[str] = None, separator: str = "\t",
+                  chunksize: int = 100_000, allow=DEFAULT_ALLOW, vocabulary_path: str = DEFAULT_VOCABULARY_PATH) -> Counter:
+    """
+    Valide et normalise la vérité terrain brute (ex. data/ground_truth_raw.csv) en une seule lecture par morceaux :
+    les lignes valides sont écrites dans `clean_path` (colonnes de EventData), les autres dans le rapport
+    `report_path` avec leur numéro de ligne, leurs motifs (voir REASONS) et leurs valeurs d'origine.
+
+    Les contrôles portent sur des colonnes entières : statut d'annotation, champs obligatoires, dates ISO partielles,
+    valeurs énumérées (voir load_vocabulary), cohérence du relatum et du changement (une règle de change_predicates.tsv
+    doit exister, anciennes / nouvelles valeurs réservées aux transitions). Les lignes sont contrôlées une à une :
+    un événement dont une ligne est rejetée garde ses autres lignes.
+
+    Args:
+        allow (list): Motifs qui ne rejettent pas la ligne (par défaut DEFAULT_ALLOW, () : validation stricte) ;
+            elle figure alors dans le rapport avec le statut "kept".
+
+    Returns:
+        Counter: Lignes lues, conservées et rejetées, corrections et nombre de lignes par motif.
+    """
+    unknown = [reason for reason in allow if reason not in REASONS]
+    if unknown:
+        raise ValueError(f"Motif inconnu : {', '.join(unknown)} (motifs disponibles : {', '.join(REASONS)})")
+    report_path = report_path or rejected_path(clean_path)
+    values, aliases = load_vocabulary(vocabulary_path)
+    index = cp.load_change_predicate_index()
+    rejecting = np.array([reason not in allow for reason in REASONS])
+    reasons = np.array(REASONS, dtype=object)
+    stats = Counter({key: 0 for key in ["rows", "kept", "rejected", "corrected_values", "swapped_changes", *REASONS]})
+
+    for path in (clean_path, report_path):
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+    with open(clean_path + ".tmp", "w", encoding="utf-8", newline="") as clean, \
+         open(report_path + ".tmp", "w", encoding="utf-8", newline="") as report:
+        first_line = 2
+        for chunk in fm.read_csv_in_chunks(raw_path, separator=separator, chunksize=chunksize):
+            missing = [column for column in edg.EventData._fields if column not in chunk.columns]
+            if missing:
+                raise ValueError(f"Colonnes manquantes dans {raw_path} : {', '.join(missing)}")
+            rows = normalise_rows(chunk, aliases, index, stats)
+            flags = check_rows(rows, values, index)
+            rejected = (flags & rejecting).any(axis=1)
+            flagged = flags.any(axis=1)
+
+            # Colonnes de EventData, dans l'ordre du fichier brut
+            columns = [column for column in chunk.columns if column in edg.EventData._fields]
+            rows.loc[~rejected, columns].to_csv(clean, sep=separator, index=False, header=clean.tell() == 0)
+            if flagged.any():
+                lines = chunk.loc[flagged].copy()
+                lines.insert(0, "line", np.arange(first_line, first_line + len(chunk))[flagged])
+                lines.insert(1, "status", np.where(rejected[flagged], "rejected", "kept"))
+                lines.insert(2, "reasons", [";".join(reasons[row]) for row in flags[flagged]])
+                lines.to_csv(report, sep=separator, index=False, header=report.tell() == 0)
+
+            stats["rows"] += len(chunk)
+            stats["rejected"] += int(rejected.sum())
+            for reason, count in zip(REASONS, flags.sum(axis=0)):
+                stats[reason] += int(count)
+            first_line += len(chunk)
+    stats["kept"] = stats["rows"] - stats["rejected"]
+    os.replace(clean_path + ".tmp", clean_path)
+    os.replace(report_path + ".tmp", report_path)
+    return stats
+
+def format_stats(stats: Counter) -> str:
+    rows = max(stats["rows"], 1)
+    lines = [f"{stats['rows']} lignes : {stats['kept']} conservées, {stats['rejected']} rejetées "
+             f"({stats['corrected_values']} valeurs corrigées, {stats['swapped_changes']} changements inversés)"]
+    for reason in REASONS:
+        if stats[reason]:
+            lines.append(f"{reason:<24}{stats[reason]:>10}{100 * stats[reason] / rows:>8.1f} %")
+    return "\n".join(lines)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Valide et normalise la vérité terrain brute, et liste les lignes rejetées.")
+    parser.add_argument("--input", dest="raw_path", default=os.path.join(DATA_DIR, "ground_truth_raw.csv"), help="Vérité terrain brute")
+    parser.add_argument("--output", dest="clean_path", default=os.path.join(DATA_DIR, "ground_truth_clean.csv"),
+                        help="Vérité terrain nettoyée (ground_truth.csv n'est pas remplacé par défaut)")
+    parser.add_argument("--report", dest="report_path", default=None, help="Lignes rejetées (par défaut : <sortie>_rejected.csv)")
+    parser.add_argument("--separator", default="\t", help="Séparateur des fichiers CSV")
+    parser.add_argument("--chunk-size", dest="chunksize", type=int, default=100_000, help="Lignes lues à la fois")
+    parser.add_argument("--allow", nargs="*", default=list(DEFAULT_ALLOW), choices=REASONS,
+                        help=f"Motifs signalés sans rejeter la ligne (par défaut : {' '.join(DEFAULT_ALLOW)} ; sans motif : validation stricte)")
+    parser.add_argument("--vocabulary", dest="vocabulary_path", default=DEFAULT_VOCABULARY_PATH, help="Table des valeurs admises")
+    args = vars(parser.parse_args())
+
+    start = time.perf_counter()
+    stats = validate_file(**args)
+    seconds = time.perf_counter() - start
+    print(f"{args['raw_path']} -> {args['clean_path']} ({stats['rows'] / max(seconds, 1e-9):.0f} lignes/s)")
+    print(format_stats(stats))
@@ -0,0 +1,39 @@
+import os
+import sys
+import pytest
+
+# Les modules de utils/ s'importent par leur nom (import file_management as fm), comme lorsqu'ils sont lancés depuis ce dossier
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "utils"))
+
+GROUND_TRUTH_PATH = os.path.join(ROOT, "data", "ground_truth.csv")
+
+def memory_files(in_path, out_dir):
+    """
+    Fichiers JSONL de référence des trois versions, générés en mémoire (identifiants uuid5).
+    """
+    import event_description_generator as edg
+    import id_allocators as ia
+    import triple_file as tf
+    paths = [str(out_dir / f"memory_{variant}.jsonl") for variant in edg.VARIANTS]
+    tables = edg.iter_event_tables(edg.read_ground_truth(in_path), batch_size=500, id_allocator=ia.get_id_allocator("uuid5"))
+    tf.write_event_tables(tables, paths)
+    return paths
+
+def read_bytes(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+@pytest.fixture(scope="session")
+def ground_truth_path():
+    return GROUND_TRUTH_PATH
+
+@pytest.fixture(scope="session")
+def synthetic_path(tmp_path_factory):
+    """
+    Vérité terrain synthétique (identifiants numériques, lignes non triées par event_id).
+    """
+    import synthetic_ground_truth as sgen
+    path = str(tmp_path_factory.mktemp("synthetic") / "ground_truth.csv")
+    sgen.write_synthetic_ground_truth(path, 3000, seed=1)
+    return path
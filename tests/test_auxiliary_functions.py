@@ -0,0 +1,46 @@
+import math
+import numpy as np
+import pandas as pd
+import pytest
+import auxiliary_functions as af
+
+CASES = [
+    ("1909-01-03", "3 janvier 1909"),
+    ("1909-01-01", "1 janvier 1909"),  # « 1er » est ajouté par les appelants
+    ("2024-02-29", "29 février 2024"),
+    ("1900-08-15", "15 août 1900"),
+    ("2023-09", "septembre 2023"),
+    ("1850-12", "décembre 1850"),
+    ("2021", "2021"),
+    # Jour ou mois invalide : la date est renvoyée telle quelle
+    ("1900-02-29", "1900-02-29"),
+    ("1909-04-31", "1909-04-31"),
+    ("1909-01-00", "1909-01-00"),
+    ("1909-13", "1909-13"),
+    ("1909-00-10", "1909-00-10"),
+    ("0000-05", "0000-05"),
+    ("1909-01-03\n", "1909-01-03\n"),
+    ("vers 1900", "vers 1900"),
+    ("", ""),
+]
+
+@pytest.mark.parametrize("date, expected", CASES)
+def test_french_date(date, expected):
+    assert af._french_date(date) == expected
+    assert af.date_to_french_natural(date) == expected
+
+def test_dates_to_french_natural_matches_scalar():
+    dates = [date for date, _ in CASES]
+    expected = [natural for _, natural in CASES]
+    assert list(af.dates_to_french_natural(dates)) == expected
+
+    series = pd.Series(dates, index=range(10, 10 + len(dates)))
+    result = af.dates_to_french_natural(series)
+    assert isinstance(result, pd.Series) and list(result.index) == list(series.index)
+    assert list(result) == expected
+
+def test_missing_dates_are_kept():
+    assert af.date_to_french_natural(None) is None
+    assert math.isnan(af.date_to_french_natural(np.nan))
+    result = af.dates_to_french_natural(pd.Series([None, np.nan, "1909-01-03"]))
+    assert result[0] is None and math.isnan(result[1]) and result[2] == "3 janvier 1909"
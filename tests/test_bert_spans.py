@@ -0,0 +1,51 @@
+import re
+import bert_spans as bs
+
+EVENT = {
+    "id": 7,
+    "sent": "L’avenue  Victor-Hugo est ouverte le 1er janvier 1900, la Rue de  l'Église disparaît.",
+    "triples": [
+        {"sub": "avenue Victor‑Hugo", "rel": "isLandmarkType", "obj": "avenue"},
+        {"sub": "avenue Victor‑Hugo", "rel": "appearsOn", "obj": "1900-01-01"},
+        {"sub": "rue de l’Eglise", "rel": "disappearsOn", "obj": "noTime"},
+        {"sub": "boulevard Haussmann", "rel": "isLandmarkType", "obj": "boulevard"},
+    ],
+}
+
+def test_multi_pattern_matcher_finds_every_occurrence():
+    patterns = ["he", "she", "his", "hers"]
+    matcher = bs.MultiPatternMatcher(patterns)
+    text = "ushers and his heir"
+    found = sorted(matcher.find(text))
+    expected = sorted((m.start(), m.start() + len(p), i) for i, p in enumerate(patterns) for m in re.finditer(f"(?={p})", text))
+    assert found == expected
+
+def test_normalize_with_offsets_maps_back_to_original():
+    text = "L’Église  Saint-Éloi"
+    normalized, offsets = bs.normalize_with_offsets(text)
+    assert normalized == "l'eglise saint-eloi"
+    assert text[offsets[normalized.index("eglise")]] == "É"
+    assert text[offsets[normalized.index("saint")]] == "S"
+
+def test_convert_events_spans():
+    report = bs.new_report()
+    converted = next(bs.convert_events([EVENT], report=report))
+    entities = {(entity["value"], entity["type"]): entity for entity in converted["entities"]}
+    for entity in converted["entities"]:
+        assert EVENT["sent"][entity["start"]:entity["end"]] == entity["text"]
+
+    # Mots entiers, sans tenir compte des accents, de la casse, des espaces ni des apostrophes et tirets typographiques
+    assert entities[("avenue Victor‑Hugo", "landmark")]["text"] == "avenue  Victor-Hugo"
+    assert entities[("rue de l’Eglise", "landmark")]["text"] == "Rue de  l'Église"
+    assert entities[("1900-01-01", "time")]["text"] == "1er janvier 1900"
+    # Le type imbriqué dans le nom du repère est placé dans ce nom, faute d'autre occurrence
+    assert entities[("avenue", "landmark_type")]["start"] == entities[("avenue Victor‑Hugo", "landmark")]["start"]
+
+    assert converted["unmatched"] == [{"value": "boulevard Haussmann", "type": "landmark"}, {"value": "boulevard", "type": "landmark_type"}]
+    assert [relation["type"] for relation in converted["relations"]] == ["isLandmarkType", "appearsOn"]
+    assert report["placeholders"]["time"] == 1
+    assert report["dropped_relations"] == {"disappearsOn": 1, "isLandmarkType": 1}
+
+def test_batches_do_not_change_results():
+    events = [dict(EVENT, id=i) for i in range(5)]
+    assert list(bs.convert_events(events, batch_size=2)) == list(bs.convert_events(events))
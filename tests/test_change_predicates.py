@@ -0,0 +1,52 @@
+import csv
+import numpy as np
+import change_predicates as cp
+
+# Règles et recherche d'origine (parcours de la liste dans l'ordre), référence de l'index
+BASELINE_RULES = [
+    ({"changeType": "appearance", "changeOn": "landmark"}, {"change_time": "appearsOn"}),
+    ({"changeType": "disappearance", "changeOn": "landmark"}, {"change_time": "disappearsOn"}),
+    ({"changeType": "disappearance", "changeOn": "classement"}, {"change_time": "isClassifiedOn"}),
+    ({"changeType": "disappearance", "changeOn": "numerotation"}, {"change_time": "isNumberedOn"}),
+    ({"changeType": "appearance", "changeOn": "relation"}, {"change_time": "hasAppearedRelationOn"}),
+    ({"changeType": "disappearance", "changeOn": "relation"}, {"change_time": "hasDisappearedRelationOn"}),
+    ({"changeType": "transition", "changeOn": "attribute", "attribute_type": "name"},
+     {"change_time": "hasNameChangeOn", "old_value": "hasOldName", "new_value": "hasNewName"}),
+    ({"changeType": "transition", "changeOn": "attribute", "attribute_type": "geometry"},
+     {"change_time": "hasGeometryChangeOn", "old_value": "hasOldGeometry", "new_value": "hasNewGeometry"}),
+]
+
+def _baseline(change_type, change_on, attribute_type=None):
+    for conditions, predicates in BASELINE_RULES:
+        if all(conditions.get(k) == v for k, v in {"changeType": change_type, "changeOn": change_on, "attribute_type": attribute_type}.items() if k in conditions):
+            return predicates
+    return None
+
+def _queries():
+    with open(cp.DEFAULT_RULES_PATH, encoding="utf-8", newline="") as f:
+        rows = list(csv.DictReader(f, delimiter="\t"))
+    assert len(rows) == len(BASELINE_RULES)
+    queries = []
+    for row in rows:
+        # Chaque règle, avec son type d'attribut, sans, et avec un autre type
+        for attribute_type in [row["attribute_type"] or None, None, "name", "unknown"]:
+            queries.append((row["change_type"], row["change_on"], attribute_type))
+    return queries + [("appearance", "unknown", None), ("transition", "landmark", "name")]
+
+def test_lookup_matches_baseline_rules():
+    index = cp.load_change_predicate_index()
+    for query in _queries():
+        assert index.lookup(*query) == _baseline(*query), query
+
+def test_lookup_columns_matches_baseline_rules():
+    queries = _queries()
+    columns = [np.array(column, dtype=object) for column in zip(*queries)]
+    found = cp.load_change_predicate_index().lookup_columns(*columns)
+    for row, query in enumerate(queries):
+        expected = _baseline(*query) or {}
+        assert {name: values[row] for name, values in found.items() if values[row] is not None} == expected, query
+
+def test_lookup_result_does_not_alias_index():
+    index = cp.load_change_predicate_index()
+    index.lookup("appearance", "landmark")["change_time"] = "corrupted"
+    assert index.lookup("appearance", "landmark") == {"change_time": "appearsOn"}
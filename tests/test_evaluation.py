@@ -0,0 +1,54 @@
+import pytest
+import evaluation as ev
+
+GOLD = [
+    {"id": 1, "triples": [
+        {"sub": "Rue de Rigny", "rel": "isLandmarkType", "obj": "rue"},
+        {"sub": "Rue de Rigny", "rel": "appearsOn", "obj": "1850"},
+    ]},
+    {"id": 2, "triples": [
+        {"sub": "Place de la Concorde", "rel": "isLandmarkType", "obj": "place"},
+        {"sub": "Rue Royale", "rel": "isLandmarkType", "obj": "rue"},
+    ]},
+]
+
+def test_exact_scores():
+    evaluator = ev.TripleEvaluator(GOLD)
+    result = evaluator.score_events([
+        # Casse et espaces ignorés
+        {"id": 1, "triples": [{"sub": "rue  de rigny", "rel": "isLandmarkType", "obj": "Rue"},
+                              {"sub": "Rue de Rigny", "rel": "appearsOn", "obj": "1851"}]},
+        {"id": 3, "triples": []},
+    ], modes=["exact"])
+    assert (result["events"], result["missing_events"], result["unknown_events"]) == (1, 1, 1)
+    micro = result["exact"]["micro"]
+    assert (micro["tp"], micro["fp"], micro["fn"]) == (1, 1, 3)
+    assert micro["precision"] == 0.5 and micro["recall"] == 0.25 and micro["f1"] == pytest.approx(1 / 3, abs=1e-6)
+
+def test_fuzzy_scores():
+    evaluator = ev.TripleEvaluator(GOLD)
+    result = evaluator.score_events({2: [["Place de la Concorde", "isLandmarkType", "place"],
+                                         ["Rue Royal", "isLandmarkType", "rue"]],
+                                     1: [["Rue de Rigni", "appearsOn", "1850"]]})
+    assert result["exact"]["micro"]["tp"] == 1
+    assert result["fuzzy"]["micro"]["tp"] == 3
+    assert result["fuzzy"]["relations"]["appearsOn"]["f1"] == 1.0
+
+def test_fuzzy_matches_most_similar_gold_triple():
+    gold = [{"id": 1, "triples": [{"sub": "Rue Saint-Marti", "rel": "isLandmarkType", "obj": "rue"},
+                                  {"sub": "Rue Saint-Martin", "rel": "isLandmarkType", "obj": "rue"}]}]
+    evaluator = ev.TripleEvaluator(gold)
+    predicted = evaluator.encode_triples([["Rue Saint-Martin.", "isLandmarkType", "rue"]])
+    # Les deux libellés de référence sont similaires : le plus proche est apparié, pas le premier rencontré
+    matches = evaluator._fuzzy_matches(set(predicted), set(evaluator.gold["1"]))
+    assert [evaluator.labels[sub] for sub, _, _ in matches] == ["rue saint-martin"]
+
+def test_macro_scores():
+    evaluator = ev.TripleEvaluator(GOLD)
+    result = evaluator.score_events({1: [["Rue de Rigny", "isLandmarkType", "rue"]],
+                                     2: [["Rue Royale", "isLandmarkType", "rue"], ["Place de la Concorde", "isLandmarkType", "place"]]},
+                                    modes=["exact"])["exact"]
+    relations = result["relations"]
+    assert relations["isLandmarkType"]["f1"] == 1.0 and relations["appearsOn"]["f1"] == 0.0
+    assert result["macro"] == {"precision": 0.5, "recall": 0.5, "f1": 0.5}
+    assert result["micro"]["recall"] == 0.75
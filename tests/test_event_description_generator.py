@@ -0,0 +1,20 @@
+import pytest
+import event_description_generator as edg
+import id_allocators as ia
+
+@pytest.fixture(scope="module")
+def df(ground_truth_path):
+    return edg.read_ground_truth(ground_truth_path)
+
+def test_columnar_engine_matches_rows_engine(df):
+    rows = edg.create_event_descriptions(df, engine="rows", id_allocator=ia.get_id_allocator("uuid5"))
+    columnar = edg.create_event_descriptions(df, engine="columnar", id_allocator=ia.get_id_allocator("uuid5"))
+    for variant, expected, actual in zip(edg.VARIANTS, rows, columnar):
+        assert actual == expected, variant
+
+def test_batches_match_single_pass(df):
+    whole = [table.to_json_lines() for table in next(edg.iter_event_tables(df, batch_size=len(df), id_allocator=ia.get_id_allocator("uuid5")))]
+    batches = list(edg.iter_event_tables(df, batch_size=50, id_allocator=ia.get_id_allocator("uuid5")))
+    assert len(batches) > 1
+    for i, variant in enumerate(edg.VARIANTS):
+        assert [line for batch in batches for line in batch[i].to_json_lines()] == whole[i], variant
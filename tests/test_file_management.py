@@ -0,0 +1,11 @@
+import json
+import file_management as fm
+
+RECORDS = [{"id": 1, "text": "Rue de Chartres, élargie", "triples": [["a", "b", None]]}, {"id": 2, "text": ""}]
+
+def test_write_jsonl_default_format(tmp_path):
+    path = str(tmp_path / "records.jsonl")
+    fm.write_jsonl(RECORDS, path)
+    with open(path, encoding="utf-8") as f:
+        assert f.read() == "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in RECORDS)
+    assert fm.read_jsonl(path) == RECORDS
@@ -0,0 +1,46 @@
+import pytest
+import graph_evaluation as ge
+
+GOLD = {"id": 1, "triples": [
+    {"sub": "EV_1", "rel": "hasTime", "obj": "1850"},
+    {"sub": "EV_1", "rel": "hasChange", "obj": "CG_1"},
+    {"sub": "CG_1", "rel": "appliedOn", "obj": "LM_1"},
+    {"sub": "LM_1", "rel": "label", "obj": "Rue de Rigny"},
+    {"sub": "LM_1", "rel": "isLandmarkType", "obj": "rue"},
+    {"sub": "EV_1", "rel": "hasChange", "obj": "CG_2"},
+    {"sub": "CG_2", "rel": "appliedOn", "obj": "LM_2"},
+    {"sub": "LM_2", "rel": "label", "obj": "Rue Royale"},
+    {"sub": "LM_2", "rel": "isLandmarkType", "obj": "rue"},
+]}
+
+def _renamed(event, names):
+    return {"id": event["id"], "triples": [{key: names.get(value, value) for key, value in triple.items()} for triple in event["triples"]]}
+
+def test_node_type():
+    assert ge.node_type("LM_4f2a") == "LM"
+    assert ge.node_type("Rue de Rigny") is None
+    assert ge.node_type(1850) is None
+
+def test_renamed_nodes_score_perfectly():
+    predicted = _renamed(GOLD, {"EV_1": "EV_a", "CG_1": "CG_b", "CG_2": "CG_c", "LM_1": "LM_x", "LM_2": "LM_y"})
+    predicted["triples"].reverse()
+    result = ge.GraphEvaluator([GOLD]).score_events([predicted])
+    assert result["events"] == 1
+    assert result["graph"]["micro"]["f1"] == 1.0
+
+def test_wrong_literal_only_costs_its_triples():
+    predicted = _renamed(GOLD, {"LM_1": "LM_x", "LM_2": "LM_y"})
+    predicted["triples"][3] = {"sub": "LM_x", "rel": "label", "obj": "Rue de Rivoli"}
+    micro = ge.GraphEvaluator([GOLD]).score_events([predicted])["graph"]["micro"]
+    # Le repère mal nommé reste aligné grâce à son changement : seul son libellé est faux
+    assert (micro["tp"], micro["fp"], micro["fn"]) == (8, 1, 1)
+
+def test_missing_and_unknown_events():
+    result = ge.GraphEvaluator([GOLD]).score_events({2: GOLD["triples"]})
+    assert (result["events"], result["missing_events"], result["unknown_events"]) == (0, 1, 1)
+    assert result["graph"]["micro"]["fn"] == len(GOLD["triples"])
+
+@pytest.mark.parametrize("n_rows", [10, 200])
+def test_synthetic_pair_matches_true_alignment(n_rows):
+    predicted, gold, _ = ge.synthetic_graph_pair(n_rows, seed=0, noise=0.0)
+    assert ge.GraphEvaluator([gold]).score_events([predicted])["graph"]["micro"]["f1"] == 1.0
@@ -0,0 +1,26 @@
+import pandas as pd
+import pytest
+import event_description_generator as edg
+import id_allocators as ia
+
+def test_schema_types(ground_truth_path):
+    df = edg.read_ground_truth(ground_truth_path)
+    assert set(df.columns) <= set(edg.EventData._fields)
+    for column, dtype in edg.GROUND_TRUTH_DTYPES.items():
+        if column in df.columns:
+            assert (df[column].dtype == "category") == (dtype == "category"), column
+    # Les dates restent des chaînes (sans schéma, une colonne d'années serait lue comme des nombres)
+    assert all(isinstance(value, str) for value in df["time"].dropna())
+
+def test_numeric_event_ids_stay_integers(synthetic_path):
+    assert pd.api.types.is_integer_dtype(edg.read_ground_truth(synthetic_path)["event_id"])
+
+@pytest.mark.parametrize("path_fixture, engine", [("ground_truth_path", "rows"), ("ground_truth_path", "columnar"),
+                                                  ("synthetic_path", "columnar")])
+def test_typed_frame_gives_same_descriptions(request, path_fixture, engine):
+    path = request.getfixturevalue(path_fixture)
+    typed = edg.read_ground_truth(path)
+    # Référence : toutes les colonnes lues comme des chaînes, sans catégories
+    untyped = pd.read_csv(path, sep="\t", dtype={column: str for column in edg.GROUND_TRUTH_DTYPES})
+    results = [edg.create_event_descriptions(df, engine=engine, id_allocator=ia.get_id_allocator("uuid5")) for df in (typed, untyped)]
+    assert results[0] == results[1]
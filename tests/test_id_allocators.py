@@ -0,0 +1,39 @@
+import uuid
+import pytest
+import event_description_generator as edg
+import id_allocators as ia
+
+EVENT_IDS = [1, 1, 2, "a"]
+ROLES = ["Rue de Chartres", "0", "Rue de Chartres", "1"]
+
+def test_uuid5_matches_uuid_module():
+    ids = ia.Uuid5IdAllocator().new_ids("LM", EVENT_IDS, ROLES)
+    expected = [f"LM_{uuid.uuid5(ia.PEGAZUS_NAMESPACE, f'{event_id}/LM/{role}')}" for event_id, role in zip(EVENT_IDS, ROLES)]
+    assert list(ids) == expected
+    assert ia.Uuid5IdAllocator().new_id("LM", 1, "0") == expected[1]
+
+def test_uuid5_short_ids_are_prefixes():
+    full = ia.Uuid5IdAllocator().new_ids("EV", EVENT_IDS, ROLES)
+    short = ia.Uuid5IdAllocator(hex_digits=16).new_ids("EV", EVENT_IDS, ROLES)
+    assert [len(value) for value in short] == [len("EV_") + 16] * len(EVENT_IDS)
+    assert all(long_id.replace("-", "").startswith(short_id) for long_id, short_id in zip(full, short))
+
+def test_random_ids_are_valid_uuid4():
+    ids = ia.RandomIdAllocator().new_ids("CG", EVENT_IDS, ROLES)
+    assert len(set(ids)) == len(EVENT_IDS)
+    assert all(uuid.UUID(value[len("CG_"):]).version == 4 for value in ids)
+
+def test_counter_is_sequential_per_prefix():
+    allocator = ia.get_id_allocator("counter")
+    assert list(allocator.new_ids("LM", [1, 2], ["a", "b"])) == ["LM_1", "LM_2"]
+    assert list(allocator.new_ids("EV", [1], ["a"])) == ["EV_1"]
+    assert allocator.new_id("LM", 3, "c") == "LM_3"
+
+def test_unknown_mode():
+    with pytest.raises(ValueError):
+        ia.get_id_allocator("sequential")
+
+def test_uuid5_descriptions_are_stable(ground_truth_path):
+    df = edg.read_ground_truth(ground_truth_path)
+    runs = [edg.create_event_descriptions(df, id_allocator=ia.get_id_allocator("uuid5"))[2] for _ in range(2)]
+    assert runs[0] == runs[1]
@@ -0,0 +1,26 @@
+import pandas as pd
+import event_description_generator as edg
+import incremental_build as ib
+from conftest import memory_files, read_bytes
+
+def test_incremental_build_matches_full_build(synthetic_path, tmp_path):
+    in_path = str(tmp_path / "ground_truth.csv")
+    df = pd.read_csv(synthetic_path, sep="\t", dtype=str, keep_default_na=False)
+    # Dates réduites à l'année : sans schéma, la colonne serait lue comme des nombres (1789.0)
+    df["time"] = df["time"].str[:4]
+    df.to_csv(in_path, sep="\t", index=False)
+    out_paths = [str(tmp_path / f"{variant}.jsonl") for variant in edg.VARIANTS]
+    manifest_path = str(tmp_path / "manifest.json")
+
+    stats = ib.build_incremental(in_path, out_paths, manifest_path)
+    assert stats["reused"] == 0
+    for built, memory in zip(out_paths, memory_files(in_path, tmp_path)):
+        assert read_bytes(built) == read_bytes(memory)
+
+    # Une seule ligne modifiée : seul son événement est régénéré
+    df.loc[0, "event_label"] += " (modifié)"
+    df.to_csv(in_path, sep="\t", index=False)
+    stats = ib.build_incremental(in_path, out_paths, manifest_path)
+    assert stats["regenerated"] == 1 and stats["removed"] == 0
+    for built, memory in zip(out_paths, memory_files(in_path, tmp_path)):
+        assert read_bytes(built) == read_bytes(memory)
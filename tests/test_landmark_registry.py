@@ -0,0 +1,31 @@
+import event_description_generator as edg
+import id_allocators as ia
+import landmark_registry as lr
+
+COLUMNS = ["event_id", "event_label", "time", "landmark_label", "landmark_type", "change_type", "change_on"]
+ROWS = [
+    ["1", "Ouverture de la rue de Chartres", "1790", "Rue de Chartres", "rue", "appearance", "landmark"],
+    ["1", "Ouverture d'une rue", "1790", "", "rue", "appearance", "landmark"],
+    ["2", "Suppression de la rue de Chartres", "1850", "rue de chartres", "rue", "disappearance", "landmark"],
+    ["2", "Suppression d'une rue", "1850", "", "rue", "disappearance", "landmark"],
+]
+
+def _landmark_ids(descriptions):
+    return [{t["sub"] for t in description["triples"] if t["rel"] == "isLandmarkType"} for description in descriptions]
+
+def test_unlabeled_landmarks_stay_per_event(tmp_path):
+    path = tmp_path / "ground_truth.csv"
+    path.write_text("\n".join("\t".join(row) for row in [COLUMNS] + ROWS) + "\n", encoding="utf-8")
+    df = edg.read_ground_truth(str(path))
+
+    results = []
+    for engine in ["rows", "columnar"]:
+        registry = lr.LandmarkRegistry()
+        results.append(edg.create_event_descriptions(df, engine=engine, id_allocator=ia.get_id_allocator("uuid5"),
+                                                     landmark_registry=registry)[2])
+        assert len(registry) == 1
+    assert results[0] == results[1]
+
+    # Le repère nommé est partagé (ses triplets ne sont produits qu'une fois), chaque repère sans libellé reste propre à son événement
+    first, second = _landmark_ids(results[0])
+    assert len(first) == 2 and len(second) == 1 and not first & second
@@ -0,0 +1,75 @@
+import asyncio
+import file_management as fm
+import llm_runner as llm
+
+RECORDS = [{"id": i, "prompt": f"Exemple {i}\nphrase {i}"} for i in range(30)]
+
+def _run(server, batches, cache=None, **kwargs):
+    """
+    Lance le serveur de test puis le runner sur chaque (prompts, fichier de sortie) de `batches`, dans une même boucle.
+    """
+    async def main():
+        await server.start()
+        try:
+            return [await llm.LLMRunner(server.url, "stub", api_key="", cache=cache, **kwargs).run(records, path)
+                    for records, path in batches]
+        finally:
+            await server.close()
+    return asyncio.run(main())
+
+def _ids(path):
+    return sorted(record["id"] for record in fm.iter_jsonl(path))
+
+def test_transient_errors_are_retried(tmp_path, monkeypatch):
+    monkeypatch.setattr(llm, "BACKOFF_BASE", 0.001)
+    server = llm.StubServer(delay=0, failure_rate=0.3, seed=1)
+    output = str(tmp_path / "responses.jsonl")
+    [stats] = _run(server, [(RECORDS, output)], concurrency=4, max_retries=20)
+    assert stats["completed"] == len(RECORDS) and stats["failed"] == 0
+    assert stats["retries"] > 0 and server.requests == stats["completed"] + stats["retries"]
+    assert _ids(output) == [record["id"] for record in RECORDS]
+
+def test_backoff_is_exponential(tmp_path, monkeypatch):
+    monkeypatch.setattr(llm, "BACKOFF_BASE", 0.001)
+    monkeypatch.setattr(llm.random, "uniform", lambda low, high: high)
+    delays, sleep = [], asyncio.sleep
+    async def recording_sleep(delay, *args):
+        if delay:
+            delays.append(delay)
+        await sleep(delay, *args)
+    monkeypatch.setattr(llm.asyncio, "sleep", recording_sleep)
+
+    server = llm.StubServer(delay=0, failure_rate=1.0)
+    output = str(tmp_path / "responses.jsonl")
+    [stats] = _run(server, [(RECORDS[:1], output)], max_retries=3)
+    assert stats["failed"] == 1 and stats["retries"] == 3 and server.requests == 4
+    assert delays == [0.001, 0.002, 0.004]
+    # L'événement en échec n'est pas écrit : une relance le retentera
+    assert _ids(output) == []
+
+def test_resume_skips_answered_events(tmp_path):
+    server = llm.StubServer(delay=0)
+    output = str(tmp_path / "responses.jsonl")
+    first, second = _run(server, [(RECORDS[:12], output), (RECORDS, output)], concurrency=4)
+    assert first["completed"] == 12
+    assert second["skipped"] == 12 and second["completed"] == len(RECORDS) - 12
+    assert server.requests == len(RECORDS)
+    assert _ids(output) == [record["id"] for record in RECORDS]
+
+def test_cached_responses_send_no_request(tmp_path):
+    cache = llm.ResponseCache(str(tmp_path / "cache.jsonl"))
+    server = llm.StubServer(delay=0)
+    try:
+        first, second = _run(server, [(RECORDS, str(tmp_path / "first.jsonl")), (RECORDS, str(tmp_path / "second.jsonl"))],
+                             cache=cache, concurrency=4)
+    finally:
+        cache.close()
+    assert first["cached"] == 0 and second["cached"] == len(RECORDS)
+    assert server.requests == len(RECORDS)
+    responses = [{record["id"]: record["response"] for record in fm.iter_jsonl(str(tmp_path / name))} for name in ["first.jsonl", "second.jsonl"]]
+    assert len(responses[0]) == len(RECORDS) and responses[1] == responses[0]
+
+    # Le cache enregistré sert aussi à une nouvelle exécution
+    reopened = llm.ResponseCache(str(tmp_path / "cache.jsonl"))
+    reopened.close()
+    assert len(reopened) == len(RECORDS)
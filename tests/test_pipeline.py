@@ -0,0 +1,66 @@
+import os
+import pytest
+import file_management as fm
+import pipeline as pl
+
+def _split_ids(split_dir, variants):
+    return {split: [[record["id"] for record in fm.iter_jsonl(path)] for path in
+                    (os.path.join(split_dir, f"{variant}_ground_truth_{split}.jsonl") for variant in variants)]
+            for split in pl.SPLITS}
+
+def test_splits_are_aligned_across_variants(ground_truth_path, tmp_path):
+    pl.run_pipeline(ground_truth_path, output_dir=str(tmp_path), jobs=2)
+    for split, ids in _split_ids(str(tmp_path), pl.VARIANTS).items():
+        assert ids[0], split
+        assert all(variant_ids == ids[0] for variant_ids in ids[1:]), split
+
+def test_split_only_realigns_reordered_variant(ground_truth_path, tmp_path):
+    pl.run_pipeline(ground_truth_path, output_dir=str(tmp_path), jobs=2)
+    complex_path = pl.output_paths(str(tmp_path), "complex")[0]
+    with open(complex_path, "rb") as f:
+        lines = f.readlines()
+    with open(complex_path, "wb") as f:
+        f.writelines(lines[::-1])
+    pl.run_pipeline(ground_truth_path, output_dir=str(tmp_path), stages=["split"], only=True)
+    for split, ids in _split_ids(str(tmp_path), pl.VARIANTS).items():
+        assert all(variant_ids == ids[0] for variant_ids in ids[1:]), split
+
+def test_split_only_rejects_stale_variant(ground_truth_path, tmp_path):
+    pl.run_pipeline(ground_truth_path, output_dir=str(tmp_path), jobs=2)
+    simple_path = pl.output_paths(str(tmp_path), "simple")[0]
+    with open(simple_path, "rb") as f:
+        lines = f.readlines()
+    with open(simple_path, "wb") as f:
+        f.writelines(lines[1:])
+    with pytest.raises(ValueError):
+        pl.run_pipeline(ground_truth_path, output_dir=str(tmp_path), stages=["split"], only=True)
+
+def test_validate_allow_keeps_flagged_rows(ground_truth_path, tmp_path):
+    raw_path = os.path.join(os.path.dirname(ground_truth_path), "ground_truth_raw.csv")
+    rejected = {}
+    for allow in [(), ("unknown_change",)]:
+        report = pl.run_pipeline(ground_truth_path, output_dir=str(tmp_path), stages=["validate"], raw_path=raw_path, allow=allow)
+        rejected[allow] = report.stages[0]["rejected"]
+    assert 0 < rejected[("unknown_change",)] < rejected[()]
+
+def test_variant_stages_are_independent(ground_truth_path, tmp_path):
+    stages = {stage.name: stage for stage in pl.build_stages(ground_truth_path, str(tmp_path))}
+    for variant in pl.VARIANTS:
+        assert stages[f"write_{variant}"].dependencies == ["load"]
+        assert sorted(stages[f"split_{variant}"].dependencies) == ["split_assign", f"write_{variant}"]
+    assert stages["split_assign"].dependencies == [f"write_{pl.VARIANTS[0]}"]
+
+@pytest.mark.parametrize("processes", [0, 2])
+def test_generation_is_timed_apart_from_writing(ground_truth_path, tmp_path, processes):
+    report = pl.run_pipeline(ground_truth_path, output_dir=str(tmp_path), stages=["write"], processes=processes)
+    entries = {entry["name"]: entry for entry in report.stages}
+    for variant in pl.VARIANTS:
+        generate, write = entries[f"generate_{variant}"], entries[f"write_{variant}"]
+        assert generate["events"] == write["events"] > 0
+        assert write["seconds"] <= write["wall_seconds"] - generate["seconds"] + 1e-3
+
+def test_allow_default_is_shared():
+    import prepare_dataset
+    import validate_ground_truth as vgt
+    assert pl.make_parser().parse_args([]).allow == list(vgt.DEFAULT_ALLOW) == prepare_dataset.validation_allow
+    assert pl.make_parser().parse_args(["--allow"]).allow == []
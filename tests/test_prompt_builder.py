@@ -0,0 +1,79 @@
+import os
+import random
+import numpy as np
+import pytest
+import prompt_builder as pb
+
+STREETS = ["Rigny", "Royale", "Saint-Martin", "Saint-Denis", "de Rivoli", "des Martyrs", "Lafayette", "de Chartres",
+           "du Temple", "de la Paix", "Montmartre", "Vivienne", "de Provence", "du Bac", "de Sèvres"]
+TYPES = ["rue", "avenue", "boulevard", "place", "impasse"]
+
+def _events(count, seed):
+    rng = random.Random(seed)
+    events = []
+    for i in range(count):
+        street, type_ = f"{rng.choice(TYPES)} {rng.choice(STREETS)}", rng.choice(TYPES)
+        year = rng.randrange(1780, 1950)
+        events.append({"id": i, "sent": f"La {street} est renommée {type_} {rng.choice(STREETS)} en {year}.",
+                       "triples": [{"sub": street, "rel": "hasNameChangeOn", "obj": str(year)}] * rng.randrange(1, 4)})
+    return events
+
+@pytest.fixture(scope="module")
+def examples():
+    return _events(400, seed=0)
+
+def _brute_force(index, sentence):
+    # Similarité cosinus TF-IDF calculée directement, exemple par exemple
+    query = {index.vocabulary[gram] for gram in pb._sentence_ngrams(sentence, index.n) if gram in index.vocabulary}
+    scores = []
+    for doc in range(len(index)):
+        terms = index.doc_terms[index.doc_indptr[doc]:index.doc_indptr[doc + 1]]
+        weights = index.doc_weights[index.doc_indptr[doc]:index.doc_indptr[doc + 1]]
+        scores.append(sum(float(index.idf[term]) * float(weight) for term, weight in zip(terms, weights) if term in query))
+    return np.array(scores)
+
+@pytest.mark.parametrize("max_postings", [pb.MAX_POSTINGS, 50])
+def test_search_matches_brute_force(examples, max_postings):
+    index = pb.FewShotIndex(examples)
+    index.max_postings = max_postings
+    queries = [event["sent"] for event in _events(20, seed=1)]
+    indices, scores = index.search_batch(queries, k=5)
+    for sentence, row, row_scores in zip(queries, indices, scores):
+        expected = _brute_force(index, sentence)
+        assert np.allclose(row_scores, expected[row], atol=1e-5)
+        if max_postings == pb.MAX_POSTINGS:
+            assert np.allclose(row_scores, np.sort(expected)[::-1][:5], atol=1e-5)
+
+def test_select_respects_token_budget(examples):
+    index = pb.FewShotIndex(examples)
+    sentence = examples[0]["sent"]
+    assert index.select(sentence, k=3, token_budget=None)[0]["sent"] == sentence
+    budget = int(index.tokens.min()) * 2
+    selected = index.select(sentence, k=5, token_budget=budget)
+    assert selected and sum(pb.estimate_tokens(pb.format_example(example)) for example in selected) <= budget
+
+def test_save_load_round_trip(examples, tmp_path):
+    index = pb.FewShotIndex(examples)
+    path = str(tmp_path / "index.npz")
+    index.save(path)
+    loaded = pb.FewShotIndex.load(path)
+    queries = [event["sent"] for event in _events(10, seed=2)]
+    assert np.array_equal(loaded.search_batch(queries)[0], index.search_batch(queries)[0])
+    assert loaded.example(3) == index.example(3)
+
+def test_index_is_rebuilt_when_training_file_changes(examples, tmp_path):
+    import file_management as fm
+    train_path = str(tmp_path / "train.jsonl")
+    fm.write_jsonl(examples[:50], train_path)
+    assert len(pb.load_or_build_index(train_path)) == 50
+    assert os.path.exists(pb.index_path(train_path))
+    fm.write_jsonl(examples[:60], train_path)
+    assert len(pb.load_or_build_index(train_path)) == 60
+
+def test_prompts_put_closest_example_last(examples):
+    prompts = list(pb.iter_prompts(examples[:3], pb.FewShotIndex(examples), k=2, batch_size=2))
+    assert [prompt["id"] for prompt in prompts] == [0, 1, 2]
+    for event, prompt in zip(examples, prompts):
+        lines = prompt["prompt"].split("\n")
+        assert prompt["examples"][0] == str(event["id"])
+        assert lines[-3] == pb.format_example(event)
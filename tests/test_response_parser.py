@@ -0,0 +1,31 @@
+import response_parser as rp
+
+def _triples(result):
+    return [(t["sub"], t["rel"], t["obj"]) for t in result["triples"]]
+
+def test_trailing_comma_and_prose():
+    stats = rp.new_stats()
+    result = rp.parse_response('Voici les triplets :\n```json\n[["a", "b", "c"], ["d", "e", "f"],]\n```', stats)
+    assert _triples(result) == [("a", "b", "c"), ("d", "e", "f")]
+    assert stats["prose"] == 1
+
+def test_truncated_list_keeps_complete_triples():
+    stats = rp.new_stats()
+    result = rp.parse_response('[["a", "b", "c"], ["d", "e"', stats)
+    assert _triples(result) == [("a", "b", "c")]
+    assert stats["truncated"] == 1 and stats["invalid_items"] == 1
+
+def test_truncated_dicts_inside_string():
+    result = rp.parse_response('{"sentence": "x", "triples": [{"sub": "a", "rel": "b", "obj": "c"}, {"sub": "d", "rel": "e", "obj": "f')
+    assert _triples(result) == [("a", "b", "c")]
+    assert result["sentence"] == "x"
+
+def test_stream_chunks_match_whole_text():
+    text = '[{"subject": "a", "predicate": "b", "object": "c"}, ["d", "e", "f"], ["g", "h", "i"]]'
+    parser = rp.TripleStreamParser()
+    triples = []
+    for start in range(0, len(text), 3):
+        triples += parser.feed(text[start:start + 3])
+    triples += parser.close()
+    assert [(t["sub"], t["rel"], t["obj"]) for t in triples] == _triples(rp.parse_response(text))
+    assert len(triples) == 3
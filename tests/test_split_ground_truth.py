@@ -0,0 +1,57 @@
+import os
+import pytest
+import split_ground_truth as sgt
+
+# Lignes vides, retours chariot et dernière ligne sans retour à la ligne
+CONTENT = b"".join(b'{"id": %d, "text": "\\u00e9v\\u00e9nement %d"}\n' % (i, i) for i in range(40)).replace(b"\n", b"\n\n", 3)
+CONTENT = CONTENT.replace(b"\n", b"\r\n", 5) + b"\r\n" + b'{"id": 40, "text": "fin"}'
+
+def _read_splits(output_dir, base_name="events"):
+    outputs = []
+    for split in ["train", "val", "test"]:
+        with open(os.path.join(output_dir, f"{base_name}_{split}.jsonl"), "rb") as f:
+            outputs.append(f.read())
+    return outputs
+
+@pytest.fixture
+def jsonl_path(tmp_path):
+    path = tmp_path / "events.jsonl"
+    path.write_bytes(CONTENT)
+    return str(path)
+
+def test_index_does_not_depend_on_block_size(jsonl_path):
+    starts, ends = sgt.index_jsonl_lines(jsonl_path)
+    assert len(starts) == 41
+    assert (starts, ends) == sgt.index_jsonl_lines(jsonl_path, block_size=7)
+
+@pytest.mark.parametrize("split", [sgt.split_jsonl_streaming, lambda path, output_dir, **kwargs: sgt.split_jsonl_files([path], output_dir, **kwargs)])
+def test_split_variants_match_split_jsonl(jsonl_path, tmp_path, split):
+    os.makedirs(tmp_path / "reference")
+    os.makedirs(tmp_path / "other")
+    sgt.split_jsonl(jsonl_path, str(tmp_path / "reference"), seed=3)
+    split(jsonl_path, str(tmp_path / "other"), seed=3)
+    reference = _read_splits(str(tmp_path / "reference"))
+    assert sum(output.count(b"\n") for output in reference) == 41
+    assert _read_splits(str(tmp_path / "other")) == reference
+
+def _baseline_splits(lines, seed):
+    # Découpage d'origine : lignes lues avec readlines() puis mélangées par random.seed(seed)
+    import random
+    random.seed(seed)
+    random.shuffle(lines)
+    train_end = int(0.8 * len(lines))
+    val_end = train_end + int(0.1 * len(lines))
+    return [b"".join(part) for part in (lines[:train_end], lines[train_end:val_end], lines[val_end:])]
+
+def test_split_jsonl_matches_baseline_on_clean_file(tmp_path):
+    path = tmp_path / "events.jsonl"
+    path.write_bytes(b"".join(b'{"id": %d}\n' % i for i in range(57)))
+    sgt.split_jsonl(str(path), str(tmp_path), seed=3)
+    with open(path, "rb") as f:
+        assert _read_splits(str(tmp_path)) == _baseline_splits(f.readlines(), seed=3)
+
+def test_split_jsonl_skips_blank_lines(jsonl_path, tmp_path):
+    # Les lignes vides ne sont pas mélangées avec les enregistrements et les fins de ligne sont normalisées
+    records = [line.rstrip(b"\r") + b"\n" for line in CONTENT.split(b"\n") if line.strip(b"\r")]
+    sgt.split_jsonl(jsonl_path, str(tmp_path), seed=3)
+    assert _read_splits(str(tmp_path)) == _baseline_splits(records, seed=3)
@@ -0,0 +1,28 @@
+import pytest
+import event_description_generator as edg
+import id_allocators as ia
+import streaming_dataset as sd
+from conftest import memory_files, read_bytes
+
+def _streaming_files(in_path, out_dir, assume_sorted):
+    paths = [str(out_dir / f"streaming_{variant}.jsonl") for variant in edg.VARIANTS]
+    sd.convert_csv_to_jsonl_streaming(in_path, paths, chunksize=200, assume_sorted=assume_sorted, tmp_dir=str(out_dir),
+                                      id_allocator=ia.get_id_allocator("uuid5"))
+    return paths
+
+def test_streaming_matches_memory(ground_truth_path, tmp_path):
+    for memory, streaming in zip(memory_files(ground_truth_path, tmp_path), _streaming_files(ground_truth_path, tmp_path, False)):
+        assert read_bytes(streaming) == read_bytes(memory)
+
+def test_streaming_matches_memory_with_numeric_ids(synthetic_path, tmp_path):
+    memory_paths = memory_files(synthetic_path, tmp_path)
+    assert not read_bytes(memory_paths[0]).startswith(b'{"id": "')
+    for memory, streaming in zip(memory_paths, _streaming_files(synthetic_path, tmp_path, False)):
+        assert read_bytes(streaming) == read_bytes(memory)
+
+def test_sorted_streaming_matches_memory_with_numeric_ids(synthetic_path, tmp_path):
+    df = edg.read_ground_truth(synthetic_path).sort_values("event_id", kind="stable")
+    sorted_path = str(tmp_path / "sorted.csv")
+    df.to_csv(sorted_path, sep="\t", index=False)
+    for memory, streaming in zip(memory_files(sorted_path, tmp_path), _streaming_files(sorted_path, tmp_path, True)):
+        assert read_bytes(streaming) == read_bytes(memory)
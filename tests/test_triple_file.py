@@ -0,0 +1,25 @@
+import event_description_generator as edg
+import file_management as fm
+import id_allocators as ia
+import triple_file as tf
+
+def test_triple_file_round_trip(ground_truth_path, tmp_path):
+    df = edg.read_ground_truth(ground_truth_path)
+    simple = edg.create_simple_event_table(df)
+    complex_ = edg.create_complex_event_table(df, ia.get_id_allocator("uuid5"))
+    for name, table in [("simple", simple), ("complex", complex_)]:
+        path = str(tmp_path / f"{name}.triples")
+        tf.write_triple_file([table], path)
+        with tf.TripleFile(path) as triples:
+            assert len(triples) == table.n_events
+            assert list(triples) == table.to_descriptions()
+            events = table.to_descriptions()
+            assert triples[triples.find(events[-1]["id"])] == events[-1]
+
+def test_jsonl_conversion_round_trip(ground_truth_path, tmp_path):
+    events = edg.create_simple_event_table(edg.read_ground_truth(ground_truth_path)).to_descriptions()
+    jsonl_path, path = str(tmp_path / "simple.jsonl"), str(tmp_path / "simple.triples")
+    fm.write_jsonl(events, jsonl_path)
+    tf.convert_jsonl_to_triple_file(jsonl_path, path, batch_size=100)
+    with tf.TripleFile(path) as triples:
+        assert list(triples) == list(fm.iter_jsonl(jsonl_path))
@@ -0,0 +1,68 @@
+import pandas as pd
+import auxiliary_functions as af
+import validate_ground_truth as vgt
+
+def test_invalid_dates_agree_with_date_rendering():
+    times = pd.Series(["1909", "1909-01-03", "2000-02-29", "1900-02-29", "1909-04-31", "1909-13", "1909-00", "1909-01-00",
+                      "C13", "1909-01-03\n", "19090", None])
+    invalid = vgt._invalid_dates(times)
+    assert not invalid[times.isna()].any()
+    for time, flagged in zip(times[times.notna()], invalid[times.notna()]):
+        # Une date valide est mise en forme, sauf l'année seule, renvoyée telle quelle
+        rendered = af._french_date(time) != time or time.isdigit() and len(time) == 4
+        assert flagged != rendered, time
+
+HEADER = ["validated", "event_id", "event_label", "time", "line_id", "landmark_label", "landmark_type", "relatum_label", "relatum_type",
+          "relation_type", "change_type", "change_on", "attribute_type", "outdates", "makes_effective"]
+
+def _row(**values):
+    row = {"validated": "A", "event_id": "1", "event_label": "Ouverture", "time": "1850", "line_id": "1_ouverture",
+           "landmark_label": "Rue de Rigny", "landmark_type": "rue", "change_type": "appearance", "change_on": "landmark"}
+    row.update(values)
+    return [row.get(column, "") for column in HEADER]
+
+ROWS = {
+    "valid": _row(),
+    "normalised": _row(event_id="2", landmark_label="  Rue   Royale ", landmark_type=" Rue", change_type="landmark", change_on="APPEARANCE"),
+    "alias": _row(event_id="3", change_type="apprearance"),
+    "not_validated": _row(event_id="4", validated=""),
+    "missing_landmark_label": _row(event_id="5", landmark_label=""),
+    "invalid_event_id": _row(event_id="x6"),
+    "invalid_time": _row(event_id="7", time="1877-02-30"),
+    "invalid_landmark_type": _row(event_id="8", landmark_type="ruelle de traverse"),
+    "incomplete_relation": _row(event_id="9", relatum_label="Rue Royale"),
+    "unknown_change": _row(event_id="10", change_type="appearance", change_on="classement"),
+    "missing_values": _row(event_id="11", change_type="transition", change_on="attribute", attribute_type="name"),
+    "unexpected_values": _row(event_id="12", outdates="Rue de Rigny"),
+}
+
+def _validate(tmp_path, **kwargs):
+    raw_path = tmp_path / "raw.csv"
+    raw_path.write_text("\n".join("\t".join(row) for row in [HEADER] + list(ROWS.values())) + "\n", encoding="utf-8")
+    clean_path = str(tmp_path / "clean.csv")
+    stats = vgt.validate_file(str(raw_path), clean_path, chunksize=5, **kwargs)
+    clean = pd.read_csv(clean_path, sep="\t", dtype=str)
+    rejected = pd.read_csv(vgt.rejected_path(clean_path), sep="\t", dtype=str)
+    return stats, clean, rejected
+
+def test_reasons_and_normalisation(tmp_path):
+    stats, clean, rejected = _validate(tmp_path, allow=())
+    assert list(clean["event_id"]) == ["1", "2", "3"]
+    normalised = clean.iloc[1]
+    assert (normalised["landmark_label"], normalised["landmark_type"]) == ("Rue Royale", "rue")
+    assert (normalised["change_type"], normalised["change_on"]) == ("appearance", "landmark")
+    assert clean.iloc[2]["change_type"] == "appearance"
+    assert stats["swapped_changes"] == 1 and stats["corrected_values"] == 1
+
+    expected = [name for name in ROWS if name in vgt.REASONS]
+    assert [reasons.split(";")[0] for reasons in rejected["reasons"]] == expected
+    assert list(rejected["line"]) == [str(list(ROWS).index(name) + 2) for name in expected]
+    assert (rejected["status"] == "rejected").all()
+    assert (stats["rows"], stats["kept"], stats["rejected"]) == (len(ROWS), 3, len(expected))
+
+def test_default_allow_keeps_unknown_changes(tmp_path):
+    stats, clean, rejected = _validate(tmp_path)
+    assert "10" in set(clean["event_id"])
+    kept = rejected[rejected["status"] == "kept"]
+    assert list(kept["reasons"]) == ["unknown_change"]
+    assert stats["unknown_change"] == 1 and stats["kept"] == 4
@@ -1,6 +1,42 @@
 from typing import Dict, List
-from datetime import datetime
+from functools import lru_cache
 import re
+import numpy as np
+import pandas as pd
+
+# Noms des mois en français, indépendants de la locale du processus
+FRENCH_MONTHS = ["janvier", "février", "mars", "avril", "mai", "juin",
+                 "juillet", "août", "septembre", "octobre", "novembre", "décembre"]
+
+ISO_PARTIAL_DATE_PATTERN = r"^(\d{4})(?:-(\d{2})(?:-(\d{2}))?)?\Z"  # yyyy or yyyy-mm or yyyy-mm-dd
+_iso_partial_date = re.compile(ISO_PARTIAL_DATE_PATTERN)
+
+def _days_in_month(year, month):
+    """
+    Nombre de jours du mois (fonctionne sur des scalaires comme sur des tableaux NumPy).
+    """
+    leap = ((year % 4 == 0) & (year % 100 != 0)) | (year % 400 == 0)
+    return np.array([31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])[month - 1] + ((month == 2) & leap)
+
+@lru_cache(maxsize=65536)
+def _french_date(date_str: str) -> str:
+    match = _iso_partial_date.match(date_str)
+    if not match or match.group(2) is None:
+        # Format année seule ou autre, on renvoie tel quel
+        return date_str
+
+    year, month = int(match.group(1)), int(match.group(2))
+    if year < 1 or not 1 <= month <= 12:
+        return date_str
+    if match.group(3) is None:
+        # Format année-mois
+        return f"{FRENCH_MONTHS[month - 1]} {year}"
+
+    # Format complet avec jour
+    day = int(match.group(3))
+    if not 1 <= day <= _days_in_month(year, month):
+        return date_str
+    return f"{day} {FRENCH_MONTHS[month - 1]} {year}"
 
 def date_to_french_natural(date_str):
     """
@@ -9,24 +45,49 @@ def date_to_french_natural(date_str):
     - '1909-01-03' -> '3 janvier 1909'
     - '2023-09' -> 'septembre 2023'
     - '2021' -> '2021'
-    """
 
-    date_pattern = r"^\d{4}(-\d{2}(-\d{2})?)?$"  # yyyy or yyyy-mm or yyyy-mm-dd
-    if not isinstance(date_str, str) or not re.match(date_pattern, date_str):
+    Les noms de mois proviennent d'une table fixe (le résultat ne dépend pas de la locale) et les conversions sont mémorisées.
+    """
+    if not isinstance(date_str, str):
         return date_str
+    return _french_date(date_str)
+
+def dates_to_french_natural(dates):
+    """
+    Version vectorisée de date_to_french_natural() pour toute une colonne de dates ISO partielles.
+
+    Args:
+        dates (pd.Series, np.ndarray ou list): Dates à convertir ; les valeurs invalides ou non textuelles sont renvoyées telles quelles.
+
+    Returns:
+        pd.Series ou np.ndarray: Dates converties (une Series si l'entrée en est une, sinon un tableau d'objets).
+    """
+    values = pd.Series(dates, dtype=object)
+    result = values.copy()
+
+    is_str = values.map(type).eq(str).to_numpy()
+    parts = values[is_str].str.extract(ISO_PARTIAL_DATE_PATTERN)
+    has_month = parts[1].notna().to_numpy()
+    parts = parts[has_month]
+
+    year = parts[0].astype(int).to_numpy()
+    month = parts[1].astype(int).to_numpy()
+    has_day = parts[2].notna().to_numpy()
+    day = parts[2].fillna("1").astype(int).to_numpy()
+
+    valid = (year >= 1) & (month >= 1) & (month <= 12)
+    valid &= ~has_day | ((day >= 1) & (day <= _days_in_month(year, np.clip(month, 1, 12))))
+
+    month_names = np.array(FRENCH_MONTHS, dtype=object)[np.clip(month, 1, 12) - 1]
+    natural = np.where(has_day, day.astype(str).astype(object) + " ", "") + month_names + " " + year.astype(str).astype(object)
+
+    targets = parts.index[valid]
+    result.loc[targets] = natural[valid]
 
-    try:
-        # Format complet avec jour
-        dt = datetime.strptime(date_str, "%Y-%m-%d")
-        return dt.strftime("%-d %B %Y")
-    except ValueError:
-        try:
-            # Format année-mois
-            dt = datetime.strptime(date_str, "%Y-%m")
-            return dt.strftime("%B %Y")
-        except ValueError:
-            # Format année seule ou autre, on renvoie tel quel
-            return date_str
+    if isinstance(dates, pd.Series):
+        result.index = dates.index
+        return result
+    return result.to_numpy(dtype=object)
 
 def create_dict_triple(*values: str, keys: List[str] = ["sub", "rel", "obj"]) -> Dict[str, str]:
     """
@@ -0,0 +1,89 @@
+import os
+import csv
+from functools import lru_cache
+from typing import Optional, Dict, List
+import numpy as np
+import pandas as pd
+
+# Table déclarative des règles : une ligne par type de changement.
+# Une cellule attribute_type vide signifie « quel que soit le type d'attribut ».
+DEFAULT_RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", "change_predicates.tsv")
+
+CONDITION_COLUMNS = ["change_type", "change_on", "attribute_type"]
+PREDICATE_COLUMNS = ["change_time", "old_value", "new_value"]
+
+class ChangePredicateIndex:
+    """
+    Index précompilé des règles (conditions -> prédicats) de changement.
+
+    Les règles sont indexées par (change_type, change_on, attribute_type) pour celles qui précisent le type d'attribut,
+    et par (change_type, change_on) pour les autres. Une recherche coûte deux accès à un dictionnaire ;
+    comme dans une liste de règles parcourue dans l'ordre, c'est la première règle applicable qui l'emporte.
+
+    Args:
+        rules (list): Liste de tuples (conditions, prédicats), dans l'ordre de priorité.
+    """
+    def __init__(self, rules: List[tuple]):
+        self.rules = [(dict(conditions), dict(predicates)) for conditions, predicates in rules]
+        self.exact = {}
+        self.any_attribute = {}
+        for position, (conditions, _) in enumerate(self.rules):
+            key = (conditions["change_type"], conditions["change_on"])
+            if "attribute_type" in conditions:
+                self.exact.setdefault(key + (conditions["attribute_type"],), position)
+            else:
+                self.any_attribute.setdefault(key, position)
+
+        # Une règle sans type d'attribut placée avant une règle plus précise l'emporte sur celle-ci
+        for key, position in self.exact.items():
+            self.exact[key] = min(position, self.any_attribute.get(key[:2], position))
+
+    @classmethod
+    def from_table(cls, file_path: str, separator: str = "\t") -> "ChangePredicateIndex":
+        """
+        Charge les règles depuis une table (ex. data/change_predicates.tsv) dont les colonnes sont
+        change_type, change_on, attribute_type, change_time, old_value et new_value.
+        """
+        rules = []
+        with open(file_path, "r", encoding="utf-8", newline="") as f:
+            for row in csv.DictReader(f, delimiter=separator):
+                conditions = {col: row[col] for col in CONDITION_COLUMNS if row.get(col)}
+                predicates = {col: row[col] for col in PREDICATE_COLUMNS if row.get(col)}
+                rules.append((conditions, predicates))
+        return cls(rules)
+
+    def lookup(self, change_type: str, change_on: str, attribute_type: Optional[str] = None) -> Optional[Dict[str, str]]:
+        """
+        Retourne une copie des prédicats de la première règle applicable (l'index, mis en cache, n'est pas modifiable), ou None.
+        """
+        position = self.exact.get((change_type, change_on, attribute_type))
+        if position is None:
+            position = self.any_attribute.get((change_type, change_on))
+        return None if position is None else dict(self.rules[position][1])
+
+    def lookup_columns(self, change_types: np.ndarray, change_ons: np.ndarray, attribute_types: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Version colonnaire de lookup() : la recherche est faite une seule fois par combinaison distincte
+        puis diffusée sur toutes les lignes.
+
+        Returns:
+            dict: Pour chaque prédicat (change_time, old_value, new_value), un tableau aligné sur les lignes (None si absent).
+        """
+        keys = pd.DataFrame({"change_type": change_types, "change_on": change_ons, "attribute_type": attribute_types})
+        combination = keys.groupby(CONDITION_COLUMNS, dropna=False, sort=False).ngroup().to_numpy()
+        first_rows = pd.Series(np.arange(len(keys))).groupby(combination).first().to_numpy()
+
+        predicates = {name: np.full(len(first_rows), None, dtype=object) for name in PREDICATE_COLUMNS}
+        for code, row in enumerate(first_rows):
+            found = self.lookup(change_types[row], change_ons[row], attribute_types[row])
+            for name, predicate in (found or {}).items():
+                predicates[name][code] = predicate
+
+        return {name: values[combination] for name, values in predicates.items()}
+
+@lru_cache(maxsize=None)
+def load_change_predicate_index(file_path: str = DEFAULT_RULES_PATH) -> ChangePredicateIndex:
+    """
+    Charge (une seule fois par fichier) l'index des règles de changement.
+    """
+    return ChangePredicateIndex.from_table(file_path)
@@ -0,0 +1,311 @@
+import os
+import re
+import json
+import argparse
+import unicodedata
+from collections import defaultdict
+from typing import Dict, List
+import file_management as fm
+
+DEFAULT_GOLD_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", "simple_ground_truth_test.jsonl")
+DEFAULT_THRESHOLD = 0.7
+NGRAM_SIZE = 3
+MODES = ["exact", "fuzzy"]
+
+_spaces = re.compile(r"\s+")
+
+def normalize_label(label, strip_accents: bool = False) -> str:
+    """
+    Forme normalisée d'un libellé pour la comparaison : Unicode NFKC, casse ignorée, espaces fusionnés
+    (ex. "Rue  de Rigny" et "rue de rigny" donnent la même forme). Les valeurs non textuelles sont converties en texte.
+    """
+    if label is None:
+        return ""
+    label = unicodedata.normalize("NFKC", str(label)).casefold()
+    if strip_accents:
+        label = "".join(c for c in unicodedata.normalize("NFKD", label) if not unicodedata.combining(c))
+    return _spaces.sub(" ", label).strip()
+
+def ngrams(label: str, n: int = NGRAM_SIZE) -> set:
+    """
+    N-grammes de caractères d'un libellé normalisé, bordé d'espaces pour que les débuts et fins de mots comptent.
+    """
+    padded = f" {label} "
+    return {padded[i:i + n] for i in range(max(1, len(padded) - n + 1))}
+
+def _triple_fields(triple):
+    """
+    (sujet, relation, objet) d'un triplet au format {"sub", "rel", "obj"} ou [sub, rel, obj].
+    """
+    if isinstance(triple, dict):
+        return triple.get("sub"), triple.get("rel"), triple.get("obj")
+    return tuple(triple[:3]) if len(triple) >= 3 else (None, None, None)
+
+def f1_scores(tp: int, fp: int, fn: int) -> Dict[str, float]:
+    """
+    Précision, rappel et F1 à partir des vrais positifs, faux positifs et faux négatifs (0 si indéfini).
+    """
+    precision = tp / (tp + fp) if tp + fp else 0.0
+    recall = tp / (tp + fn) if tp + fn else 0.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return {"precision": round(precision, 6), "recall": round(recall, 6), "f1": round(f1, 6), "tp": tp, "fp": fp, "fn": fn}
+
+def relation_scores(counts) -> Dict[str, any]:
+    """
+    Scores micro (sur tous les triplets), macro (moyenne des relations) et par relation.
+
+    Args:
+        counts (dict): Pour chaque relation, [triplets appariés, triplets prédits, triplets de référence].
+    """
+    relations = {str(rel): f1_scores(tp, n_pred - tp, n_gold - tp)
+                 for rel, (tp, n_pred, n_gold) in sorted(counts.items(), key=lambda item: str(item[0]))}
+    tp, n_pred, n_gold = (sum(values) for values in zip(*counts.values())) if counts else (0, 0, 0)
+    macro = {key: round(sum(r[key] for r in relations.values()) / len(relations), 6) if relations else 0.0
+             for key in ["precision", "recall", "f1"]}
+    return {"micro": f1_scores(tp, n_pred - tp, n_gold - tp), "macro": macro, "relations": relations}
+
+class LabelSimilarity:
+    """
+    Similarité de Jaccard des n-grammes de caractères entre libellés normalisés, désignés par leur identifiant.
+    La signature (ensemble des n-grammes) de chaque libellé est calculée une seule fois, et la similarité
+    de chaque paire de libellés est mémorisée : un même couple prédit / référence rencontré dans plusieurs
+    fichiers de prédictions n'est comparé qu'une fois.
+
+    Args:
+        labels (list): Libellés normalisés, liste partagée avec l'évaluateur (de nouveaux libellés peuvent y être ajoutés).
+        threshold (float): Similarité minimale pour que deux libellés soient considérés comme équivalents.
+        n (int): Taille des n-grammes.
+    """
+    def __init__(self, labels: List[str], threshold: float = DEFAULT_THRESHOLD, n: int = NGRAM_SIZE):
+        self.labels = labels
+        self.threshold = threshold
+        self.n = n
+        self.signatures = []
+        self._pairs = {}
+
+    def signature(self, label_id: int) -> frozenset:
+        signatures = self.signatures
+        while len(signatures) <= label_id:
+            signatures.append(frozenset(ngrams(self.labels[len(signatures)], self.n)))
+        return signatures[label_id]
+
+    def score(self, a: int, b: int) -> float:
+        """
+        Similarité des libellés `a` et `b` (1 s'ils sont identiques), ou 0 si elle n'atteint pas le seuil.
+        """
+        if a == b:
+            return 1.0
+        key = (a, b)
+        found = self._pairs.get(key)
+        if found is None:
+            grams_a, grams_b = self.signature(a), self.signature(b)
+            # Filtre sur la taille : Jaccard(A, B) <= min(|A|, |B|) / max(|A|, |B|)
+            small, large = sorted((len(grams_a), len(grams_b)))
+            found = 0.0
+            if small >= self.threshold * large:
+                shared = len(grams_a & grams_b)
+                similarity = shared / (len(grams_a) + len(grams_b) - shared)
+                if similarity >= self.threshold:
+                    found = similarity
+            self._pairs[key] = found
+        return found
+
+    def similar(self, a: int, b: int) -> bool:
+        """
+        True si les libellés `a` et `b` sont identiques ou si leur similarité atteint le seuil.
+        """
+        return self.score(a, b) > 0.0
+
+class TripleEvaluator:
+    """
+    Évalue des triplets prédits par rapport à une vérité terrain au format {"id", "triples": [{"sub", "rel", "obj"}]}
+    (ex. simple_ground_truth_test.jsonl).
+
+    Les libellés sont normalisés (voir normalize_label) puis remplacés par des entiers : chaque événement de référence
+    est un ensemble de triplets d'entiers, et la correspondance exacte est une intersection d'ensembles.
+    En mode tolérant (« fuzzy »), un triplet prédit non apparié correspond à un triplet de référence non apparié
+    du même événement et de même relation dont le sujet et l'objet sont identiques ou similaires (voir LabelSimilarity) :
+    les paires les plus similaires sont appariées d'abord, chaque triplet ne pouvant être apparié qu'une fois.
+    Les libellés ne sont donc jamais comparés à l'ensemble des libellés de référence, seulement aux quelques candidats
+    de leur événement : ce regroupement par événement et par relation tient lieu d'index des n-grammes.
+
+    La référence, le dictionnaire des libellés et les similarités déjà calculées sont conservés d'un fichier à l'autre :
+    l'évaluateur est fait pour comparer de nombreux fichiers de prédictions (plusieurs modèles, plusieurs exécutions)
+    dans le même processus.
+
+    Args:
+        gold: Chemin du fichier JSONL de référence, ou liste d'événements.
+        threshold (float): Similarité de Jaccard minimale des n-grammes pour le mode tolérant.
+        strip_accents (bool): Si True, les accents sont ignorés dans les libellés.
+        n (int): Taille des n-grammes.
+    """
+    def __init__(self, gold, threshold: float = DEFAULT_THRESHOLD, strip_accents: bool = False, n: int = NGRAM_SIZE):
+        self.strip_accents = strip_accents
+        self.label_ids = {}
+        self.labels = []
+        self.relation_ids = {}
+        self.relations = []
+        self._normalized = {}
+        events = fm.iter_jsonl(gold) if isinstance(gold, str) else gold
+
+        self.gold = {}
+        for event in events:
+            triples = self.encode_triples(event.get("triples", []))
+            self.gold[str(event.get("id"))] = triples
+        self.similarity = LabelSimilarity(self.labels, threshold, n)
+
+    def label_id(self, label) -> int:
+        """
+        Identifiant entier de la forme normalisée d'un libellé (ajouté au dictionnaire s'il est nouveau).
+        """
+        normalized = self._normalized.get(label)
+        if normalized is None:
+            normalized = self._normalized[label] = normalize_label(label, self.strip_accents)
+        label_id = self.label_ids.get(normalized)
+        if label_id is None:
+            label_id = self.label_ids[normalized] = len(self.labels)
+            self.labels.append(normalized)
+        return label_id
+
+    def relation_id(self, relation) -> int:
+        """
+        Identifiant entier d'une relation ; les noms de relations sont comparés tels quels (sans normalisation).
+        """
+        relation_id = self.relation_ids.get(relation)
+        if relation_id is None:
+            relation_id = self.relation_ids[relation] = len(self.relations)
+            self.relations.append(relation)
+        return relation_id
+
+    def encode_triples(self, triples) -> frozenset:
+        """
+        Ensemble des triplets (sujet, relation, objet) d'un événement, encodés en entiers.
+        """
+        label_id, relation_id = self.label_id, self.relation_id
+        encoded = set()
+        for triple in triples:
+            sub, rel, obj = _triple_fields(triple)
+            encoded.add((label_id(sub), relation_id(rel), label_id(obj)))
+        return frozenset(encoded)
+
+    def _fuzzy_matches(self, predicted: set, gold: set) -> list:
+        """
+        Appariement glouton, un pour un, des triplets prédits et de référence restants (même relation,
+        sujets et objets similaires) : toutes les paires candidates sont notées (moyenne des similarités du sujet
+        et de l'objet) et appariées de la plus similaire à la moins similaire, dans un ordre déterministe.
+        """
+        by_relation = defaultdict(list)
+        for triple in gold:
+            by_relation[triple[1]].append(triple)
+        score = self.similarity.score
+        pairs = []
+        for triple in predicted:
+            sub, rel, obj = triple
+            for gold_triple in by_relation.get(rel, ()):
+                sub_score = score(sub, gold_triple[0])
+                obj_score = sub_score and score(obj, gold_triple[2])
+                if obj_score:
+                    pairs.append((-(sub_score + obj_score), triple, gold_triple))
+
+        matches, used_predicted, used_gold = [], set(), set()
+        for _, triple, gold_triple in sorted(pairs):
+            if triple not in used_predicted and gold_triple not in used_gold:
+                used_predicted.add(triple)
+                used_gold.add(gold_triple)
+                matches.append(gold_triple)
+        return matches
+
+    def score_events(self, predictions, modes=MODES) -> Dict[str, any]:
+        """
+        Évalue un ensemble de prédictions.
+
+        Args:
+            predictions: Itérable d'événements {"id", "triples"} ou dict {identifiant: triplets}.
+            modes (list): "exact" et/ou "fuzzy".
+
+        Returns:
+            dict: Pour chaque mode, scores micro (sur tous les triplets), macro (moyenne des relations)
+            et par relation ; nombre d'événements évalués, absents des prédictions et inconnus de la référence.
+        """
+        if isinstance(predictions, dict):
+            predictions = ({"id": event_id, "triples": triples} for event_id, triples in predictions.items())
+
+        counts = {mode: defaultdict(lambda: [0, 0, 0]) for mode in modes}
+        seen, unknown = set(), 0
+        for event in predictions:
+            event_id = str(event.get("id"))
+            gold = self.gold.get(event_id)
+            if gold is None:
+                unknown += 1
+                continue
+            seen.add(event_id)
+            predicted = self.encode_triples(event.get("triples") or [])
+            exact = predicted & gold
+            for mode in modes:
+                matched = list(exact)
+                if mode == "fuzzy":
+                    matched += self._fuzzy_matches(predicted - exact, gold - exact)
+                self._count(counts[mode], matched, predicted, gold)
+
+        # Événements de référence sans prédiction : tous leurs triplets sont des faux négatifs
+        for event_id, gold in self.gold.items():
+            if event_id not in seen:
+                for mode in modes:
+                    self._count(counts[mode], [], (), gold)
+
+        result = {"events": len(seen), "missing_events": len(self.gold) - len(seen), "unknown_events": unknown}
+        for mode in modes:
+            result[mode] = relation_scores(counts[mode])
+        return result
+
+    def _count(self, counts, matched, predicted, gold) -> None:
+        relations = self.relations
+        for _, rel, _ in matched:
+            counts[relations[rel]][0] += 1
+        for _, rel, _ in predicted:
+            counts[relations[rel]][1] += 1
+        for _, rel, _ in gold:
+            counts[relations[rel]][2] += 1
+
+    def score_file(self, path: str, modes=MODES) -> Dict[str, any]:
+        """
+        Évalue un fichier JSONL de prédictions (même format que la référence).
+        """
+        return self.score_events(fm.iter_jsonl(path), modes)
+
+    def score_files(self, paths, modes=MODES) -> Dict[str, Dict[str, any]]:
+        """
+        Évalue plusieurs fichiers de prédictions avec la même référence et le même index des libellés.
+
+        Returns:
+            dict: Résultat de score_file() pour chaque chemin.
+        """
+        return {path: self.score_file(path, modes) for path in paths}
+
+def format_scores(results: Dict[str, Dict[str, any]], mode: str = "exact") -> str:
+    """
+    Tableau lisible des scores micro et macro de chaque fichier pour un mode.
+    """
+    lines = [f"{'fichier':<40}{'P micro':>9}{'R micro':>9}{'F1 micro':>9}{'F1 macro':>9}"]
+    for path, result in results.items():
+        micro, macro = result[mode]["micro"], result[mode]["macro"]
+        lines.append(f"{os.path.basename(path)[:39]:<40}{micro['precision']:>9.3f}{micro['recall']:>9.3f}{micro['f1']:>9.3f}{macro['f1']:>9.3f}")
+    return "\n".join(lines)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Évalue des fichiers de triplets prédits par rapport à la vérité terrain.")
+    parser.add_argument("predictions", nargs="+", help="Fichiers JSONL de prédictions ({\"id\", \"triples\"})")
+    parser.add_argument("--gold", default=DEFAULT_GOLD_PATH, help="Fichier JSONL de référence (ex. simple_ground_truth_test.jsonl)")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Similarité minimale du mode tolérant")
+    parser.add_argument("--strip-accents", action="store_true", help="Ignorer les accents")
+    parser.add_argument("--modes", nargs="+", default=MODES, choices=MODES)
+    parser.add_argument("--output", default=None, help="Fichier JSON des scores détaillés")
+    args = parser.parse_args()
+
+    evaluator = TripleEvaluator(args.gold, threshold=args.threshold, strip_accents=args.strip_accents)
+    results = evaluator.score_files(args.predictions, args.modes)
+    for mode in args.modes:
+        print(f"== {mode} ==\n{format_scores(results, mode)}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(json.dumps(results, ensure_ascii=False, indent=2))
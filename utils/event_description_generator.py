@@ -1,8 +1,15 @@
+import os
+import json
+import numpy as np
 import pandas as pd
-from collections import namedtuple
+from collections import namedtuple, deque
+from concurrent.futures import ProcessPoolExecutor
 from typing import Optional, Dict, List
-from uuid import uuid4
 import auxiliary_functions as af
+import file_management as fm
+import change_predicates as cp
+import id_allocators as ia
+from triple_table import TripleTable
 
 # Structure de données représentant une ligne d'événement
 EventData = namedtuple("EventData", [
@@ -13,33 +20,41 @@ EventData = namedtuple("EventData", [
     "outdates", "makes_effective"
 ])
 
+# Schéma de la vérité terrain : seules les colonnes de EventData sont lues. Les colonnes à peu de valeurs distinctes
+# sont des catégories (un code entier par ligne), les textes libres des chaînes ; event_id garde le type déduit par Pandas
+# (entier si tous les identifiants sont numériques), dont dépend l'ordre des événements.
+GROUND_TRUTH_DTYPES = {
+    "event_label": str, "time": str, "line_id": str,
+    "landmark_label": str, "landmark_type": "category",
+    "relatum_label": str, "relatum_type": "category", "relation_type": "category",
+    "change_on": "category", "change_type": "category", "attribute_type": "category",
+    "outdates": str, "makes_effective": str,
+}
+
+# Versions des descriptions, dans l'ordre des tuples produits par iter_event_descriptions et iter_event_tables
+VARIANTS = ("simple", "bert_simple", "complex")
+
+def read_ground_truth(file_path: str, separator: str = "\t") -> pd.DataFrame:
+    """
+    Lit la vérité terrain avec son schéma (voir GROUND_TRUTH_DTYPES) : colonnes inutiles ignorées, catégories
+    pour les colonnes énumérées. Les valeurs manquantes restent NaN ; elles sont traitées colonne par colonne
+    par le moteur colonnaire et valeur par valeur par extract_event_data().
+    """
+    return fm.read_csv_as_dataframe(file_path, separator=separator, dtype=GROUND_TRUTH_DTYPES,
+                                    usecols=lambda column: column in EventData._fields)
+
 def extract_event_data(row: pd.Series) -> EventData:
     """
-    Convertit une ligne de DataFrame en EventData.
+    Convertit une ligne de DataFrame en EventData, les valeurs manquantes (NaN) devenant None.
     """
-    return EventData(*(row.get(col) for col in EventData._fields))
+    return EventData(*(None if pd.isna(value) else value for value in (row.get(col) for col in EventData._fields)))
 
 def get_change_predicates(change_type: str, change_on: str, attribute_type: Optional[str] = None) -> Optional[Dict[str, str]]:
     """
     Retourne les prédicats à utiliser pour un changement donné.
+    Les règles sont lues depuis la table data/change_predicates.tsv (voir change_predicates.py).
     """
-    rules = [
-        ({"changeType": "appearance", "changeOn": "landmark"}, {"change_time": "appearsOn"}),
-        ({"changeType": "disappearance", "changeOn": "landmark"}, {"change_time": "disappearsOn"}),
-        ({"changeType": "disappearance", "changeOn": "classement"}, {"change_time": "isClassifiedOn"}),
-        ({"changeType": "disappearance", "changeOn": "numerotation"}, {"change_time": "isNumberedOn"}),
-        ({"changeType": "appearance", "changeOn": "relation"}, {"change_time": "hasAppearedRelationOn"}),
-        ({"changeType": "disappearance", "changeOn": "relation"}, {"change_time": "hasDisappearedRelationOn"}),
-        ({"changeType": "transition", "changeOn": "attribute", "attribute_type": "name"},
-         {"change_time": "hasNameChangeOn", "old_value": "hasOldName", "new_value": "hasNewName"}),
-        ({"changeType": "transition", "changeOn": "attribute", "attribute_type": "geometry"},
-         {"change_time": "hasGeometryChangeOn", "old_value": "hasOldGeometry", "new_value": "hasNewGeometry"}),
-    ]
-
-    for conditions, predicates in rules:
-        if all(conditions.get(k) == v for k, v in {"changeType": change_type, "changeOn": change_on, "attribute_type": attribute_type}.items() if k in conditions):
-            return predicates
-    return None
+    return cp.load_change_predicate_index().lookup(change_type, change_on, attribute_type)
 
 def create_simple_event_description(event_data: pd.DataFrame) -> Dict[str, any]:
     """
@@ -79,36 +94,52 @@ def create_simple_event_description(event_data: pd.DataFrame) -> Dict[str, any]:
         "triples": af.deduplicate_triples(triples)
     }
 
-def create_complex_event_description(event_data: pd.DataFrame) -> Dict[str, any]:
+def _landmark_id(ids, landmark_registry, group_id, label, landmark_type) -> str:
+    # Un repère sans libellé n'est pas dans le registre : son identifiant reste propre à l'événement
+    landmark_id = None if landmark_registry is None else landmark_registry.landmark_id(label, landmark_type)
+    return landmark_id or ids.new_id("LM", group_id, label)
+
+def create_complex_event_description(event_data: pd.DataFrame, id_allocator=None, landmark_registry=None) -> Dict[str, any]:
     """
     Génère une description d'événement complexe avec UUIDs.
+    Les identifiants des nœuds sont fournis par `id_allocator` (voir id_allocators.py), aléatoires par défaut.
+    Avec `landmark_registry` (voir landmark_registry.py), les repères sont ceux du registre, et leurs triplets
+    isLandmarkType et label ne sont produits que s'ils n'ont encore été produits pour aucun événement.
     """
+    ids = id_allocator or ia.RandomIdAllocator()
     triples = []
     landmarks = {}
     event_id, event_label = None, None
-    event_uuid = f"EV_{uuid4()}"
+    group_id = event_data["event_id"].iloc[0] if len(event_data) else None
+    event_uuid = ids.new_id("EV", group_id, "")
 
-    for _, row in event_data.iterrows():
+    for k, (_, row) in enumerate(event_data.iterrows()):
         data = extract_event_data(row)
         event_id = event_id or data.event_id
         event_label = event_label or data.event_label
 
-        lm_uuid = landmarks.setdefault(data.landmark_label, f"LM_{uuid4()}")
-        triples.append(af.create_dict_triple(lm_uuid, "isLandmarkType", data.landmark_type))
-        triples.append(af.create_dict_triple(lm_uuid, "label", f'"{data.landmark_label}"@fr'))
+        if data.landmark_label not in landmarks:
+            landmarks[data.landmark_label] = _landmark_id(ids, landmark_registry, group_id, data.landmark_label, data.landmark_type)
+        lm_uuid = landmarks[data.landmark_label]
+        if landmark_registry is None or landmark_registry.mark_emitted(lm_uuid):
+            triples.append(af.create_dict_triple(lm_uuid, "isLandmarkType", data.landmark_type))
+            triples.append(af.create_dict_triple(lm_uuid, "label", f'"{data.landmark_label}"@fr'))
 
         if data.relatum_label:
-            rel_uuid = landmarks.setdefault(data.relatum_label, f"LM_{uuid4()}")
-            triples.append(af.create_dict_triple(rel_uuid, "isLandmarkType", data.relatum_type))
-            triples.append(af.create_dict_triple(rel_uuid, "label", f'"{data.relatum_label}"@fr'))
-
-            lr_uuid = f"LR_{uuid4()}"
+            if data.relatum_label not in landmarks:
+                landmarks[data.relatum_label] = _landmark_id(ids, landmark_registry, group_id, data.relatum_label, data.relatum_type)
+            rel_uuid = landmarks[data.relatum_label]
+            if landmark_registry is None or landmark_registry.mark_emitted(rel_uuid):
+                triples.append(af.create_dict_triple(rel_uuid, "isLandmarkType", data.relatum_type))
+                triples.append(af.create_dict_triple(rel_uuid, "label", f'"{data.relatum_label}"@fr'))
+
+            lr_uuid = ids.new_id("LR", group_id, k)
             triples.append(af.create_dict_triple(lr_uuid, "isLandmarkRelationType", data.relation_type))
             triples.append(af.create_dict_triple(lr_uuid, "locatum", lm_uuid))
             triples.append(af.create_dict_triple(lr_uuid, "relatum", rel_uuid))
 
         if data.change_type and data.change_on:
-            cg_uuid = f"CG_{uuid4()}"
+            cg_uuid = ids.new_id("CG", group_id, k)
             triples.append(af.create_dict_triple(cg_uuid, "isChangeType", data.change_type))
             triples.append(af.create_dict_triple(cg_uuid, "dependsOn", event_uuid))
 
@@ -117,17 +148,17 @@ def create_complex_event_description(event_data: pd.DataFrame) -> Dict[str, any]
             elif data.change_on == "relation":
                 triples.append(af.create_dict_triple(cg_uuid, "appliedOn", lr_uuid))
             elif data.change_on == "attribute":
-                attr_uuid = f"ATTR_{uuid4()}"
+                attr_uuid = ids.new_id("ATTR", group_id, k)
                 triples.append(af.create_dict_triple(attr_uuid, "isAttributeType", data.attribute_type))
                 triples.append(af.create_dict_triple(cg_uuid, "appliedOn", attr_uuid))
                 triples.append(af.create_dict_triple(lm_uuid, "hasAttribute", attr_uuid))
                 if data.makes_effective:
-                    av_uuid = f"AV_{uuid4()}"
+                    av_uuid = ids.new_id("AV", group_id, f"{k}/makes_effective")
                     triples.append(af.create_dict_triple(attr_uuid, "hasAttributeVersion", av_uuid))
                     triples.append(af.create_dict_triple(av_uuid, "versionValue", data.makes_effective))
                     triples.append(af.create_dict_triple(cg_uuid, "makes_effective", av_uuid))
                 if data.outdates:
-                    av_uuid = f"AV_{uuid4()}"
+                    av_uuid = ids.new_id("AV", group_id, f"{k}/outdates")
                     triples.append(af.create_dict_triple(attr_uuid, "hasAttributeVersion", av_uuid))
                     triples.append(af.create_dict_triple(av_uuid, "versionValue", data.outdates))
                     triples.append(af.create_dict_triple(cg_uuid, "outdates", av_uuid))
@@ -138,13 +169,14 @@ def create_complex_event_description(event_data: pd.DataFrame) -> Dict[str, any]
         "triples": triples
     }
 
-def create_bert_simple_event_description(simple_event):
+def create_bert_simple_event_description(simple_event, natural_dates: Optional[Dict[str, str]] = None):
     """
     Prend la liste des triplets issus de create_simple_event_description() pour s'adapter à l'architecture des données pour BERT et retourne
     une nouvelle liste filtrée et modifiée selon les règles spécifiées.
     
     Args:
         simple_events (list): liste de dict {sub, rel, obj, ...}
+        natural_dates (dict): dates déjà converties en langage naturel (voir create_bert_simple_event_descriptions)
     
     Returns:
         list: nouvelle liste traitée.
@@ -181,7 +213,7 @@ def create_bert_simple_event_description(simple_event):
                 # On ignore ce triplet
                 continue
             else:
-                natural_date = af.date_to_french_natural(obj)
+                natural_date = natural_dates[obj] if natural_dates is not None else af.date_to_french_natural(obj)
                 new_triple = triple.copy()
                 new_triple["obj"] = natural_date
                 triples.append(new_triple)
@@ -194,21 +226,506 @@ def create_bert_simple_event_description(simple_event):
 
     return bert_simple_event_desc
 
-def create_event_descriptions(df: pd.DataFrame) -> List[Dict[str, any]]:
+def create_bert_simple_event_descriptions(simple_events: List[Dict[str, any]]) -> List[Dict[str, any]]:
+    """
+    Applique create_bert_simple_event_description() à une liste de descriptions simples,
+    en convertissant toutes les dates en un seul appel vectorisé au lieu de triplet par triplet.
+    """
+    dates = {
+        triple.get("obj")
+        for event in simple_events for triple in event.get("triples", [])
+        if triple.get("rel") == "hasTime" and isinstance(triple.get("obj"), str)
+    }
+    dates = list(dates)
+    natural_dates = dict(zip(dates, af.dates_to_french_natural(dates)))
+    return [create_bert_simple_event_description(event, natural_dates) for event in simple_events]
+
+# === Moteur colonnaire ===
+# Les fonctions ci-dessous produisent exactement les mêmes triplets que create_simple_event_description()
+# et create_complex_event_description(), mais en travaillant sur des colonnes entières (masques booléens)
+# au lieu de parcourir le DataFrame ligne par ligne avec iterrows().
+
+def _column_values(df: pd.DataFrame, column: str) -> np.ndarray:
+    """
+    Retourne les valeurs d'une colonne sous forme de tableau d'objets, les valeurs manquantes étant remplacées par None.
+    Une colonne absente est traitée comme une colonne entièrement vide (comme row.get(col)).
+    """
+    if column not in df.columns:
+        return np.full(len(df), None, dtype=object)
+    if isinstance(df[column].dtype, pd.CategoricalDtype):
+        # Le code -1 (valeur manquante) désigne la dernière case ajoutée, qui vaut None
+        categories = df[column].cat.categories.to_numpy(dtype=object)
+        return np.append(categories, None)[df[column].cat.codes.to_numpy()]
+    values = df[column].to_numpy(dtype=object, copy=True)
+    values[pd.isna(values)] = None
+    return values
+
+def _truthy(values: np.ndarray) -> np.ndarray:
+    """
+    Masque booléen équivalent au test `if valeur:` appliqué à chaque élément.
+    """
+    return values.astype(bool)
+
+def _sort_by_event(df: pd.DataFrame):
+    """
+    Regroupe les lignes par event_id (dans l'ordre de df.groupby("event_id")) tout en conservant
+    l'ordre d'origine des lignes à l'intérieur de chaque événement.
+
+    Returns
+    -------
+    tuple: (Dict[str, np.ndarray], np.ndarray, int)
+        Colonnes réordonnées, numéro d'événement de chaque ligne et nombre d'événements
+    """
+    columns = {col: _column_values(df, col) for col in EventData._fields}
+    order, event_codes, n_events = _event_order(columns["event_id"])
+
+    columns = {col: values[order] for col, values in columns.items()}
+    return columns, event_codes, n_events
+
+def _event_order(event_ids: np.ndarray):
+    """
+    Calcule la permutation qui regroupe les lignes par event_id trié, comme df.groupby("event_id").
+
+    Returns
+    -------
+    tuple: (np.ndarray, np.ndarray, int)
+        Permutation des lignes, numéro d'événement de chaque ligne permutée et nombre d'événements
+    """
+    # Comme groupby, on ignore les lignes sans event_id et on trie les identifiants
+    keep = np.flatnonzero(pd.notna(event_ids))
+    codes, uniques = pd.factorize(event_ids[keep])
+    rank = np.empty(len(uniques), dtype=np.intp)
+    rank[np.argsort(uniques, kind="stable")] = np.arange(len(uniques))
+    codes = rank[codes]
+    order = np.argsort(codes, kind="stable")
+
+    return keep[order], codes[order], len(uniques)
+
+def _event_header(columns: Dict[str, np.ndarray], event_codes: np.ndarray, n_events: int):
+    """
+    Calcule l'identifiant et le libellé de chaque événement, comme le fait `event_id or data.event_id` :
+    première valeur non vide du groupe, sinon la dernière valeur du groupe.
+
+    Returns
+    -------
+    list: [np.ndarray, np.ndarray]
+        Identifiant et libellé de chaque événement
+    """
+    starts = np.searchsorted(event_codes, np.arange(n_events), side="left")
+    ends = np.searchsorted(event_codes, np.arange(n_events), side="right")
+    positions = np.arange(len(event_codes))
+
+    headers = []
+    for column in ["event_id", "event_label"]:
+        values = columns[column]
+        candidates = np.where(_truthy(values), positions, len(positions))
+        first_truthy = np.minimum.reduceat(candidates, starts) if n_events else candidates[:0]
+        chosen = np.where(first_truthy < ends, first_truthy, ends - 1)
+        headers.append(values[chosen])
+
+    return headers
+
+def _change_predicates_by_row(columns: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """
+    Applique les règles de get_change_predicates() à toutes les lignes d'un coup.
+    """
+    index = cp.load_change_predicate_index()
+    return index.lookup_columns(columns["change_type"], columns["change_on"], columns["attribute_type"])
+
+def _assemble_triples(slots: List[tuple], n_rows: int):
+    """
+    Concatène les triplets produits par chaque « emplacement » en respectant l'ordre ligne par ligne :
+    pour une ligne donnée, les emplacements sont émis dans l'ordre de la liste.
+
+    Chaque emplacement est un tuple (masque, sujets, relation, objets) où la relation et les objets
+    peuvent être un scalaire ou un tableau aligné sur les lignes.
+
+    Returns
+    -------
+    tuple: (np.ndarray, np.ndarray, np.ndarray, np.ndarray)
+        Ligne d'origine, sujets, relations et objets de chaque triplet
+    """
+    rows, subs, rels, objs, order_keys = [], [], [], [], []
+    n_slots = len(slots)
+
+    for position, (mask, sub, rel, obj) in enumerate(slots):
+        idx = np.flatnonzero(mask)
+        rows.append(idx)
+        order_keys.append(idx * n_slots + position)
+        for target, values in [(subs, sub), (rels, rel), (objs, obj)]:
+            if isinstance(values, np.ndarray):
+                target.append(values[idx])
+            else:
+                target.append(np.full(len(idx), values, dtype=object))
+
+    order = np.argsort(np.concatenate(order_keys), kind="stable") if n_rows else np.array([], dtype=int)
+    return tuple(np.concatenate(parts)[order] for parts in [rows, subs, rels, objs])
+
+def create_simple_event_descriptions(df: pd.DataFrame) -> List[Dict[str, any]]:
+    """
+    Version colonnaire de create_simple_event_description() appliquée à tous les événements d'un DataFrame.
+    Le résultat est identique à [create_simple_event_description(group) for _, group in df.groupby("event_id")].
+    """
+    return create_simple_event_table(df).to_descriptions()
+
+def create_simple_event_table(df: pd.DataFrame) -> TripleTable:
+    """
+    Comme create_simple_event_descriptions(), mais retourne les triplets sous forme compacte (voir triple_table.py).
+    """
+    columns, event_codes, n_events = _sort_by_event(df)
+    event_ids, event_labels = _event_header(columns, event_codes, n_events)
+    predicates = _change_predicates_by_row(columns)
+
+    lm_label = columns["landmark_label"]
+    relatum = _truthy(columns["relatum_label"])
+    has_predicates = pd.notna(predicates["change_time"])
+    is_attribute_transition = (columns["change_type"] == "transition") & _truthy(columns["attribute_type"])
+    time_value = np.where(_truthy(columns["time"]), columns["time"], "noTime").astype(object)
+
+    slots = [
+        (_truthy(lm_label), lm_label, "isLandmarkType", columns["landmark_type"]),
+        (relatum, columns["relatum_label"], "isLandmarkType", columns["relatum_type"]),
+        (relatum & _truthy(columns["relation_type"]), lm_label, columns["relation_type"], columns["relatum_label"]),
+        (has_predicates, lm_label, predicates["change_time"], time_value),
+        (has_predicates & is_attribute_transition & _truthy(columns["outdates"]) & pd.notna(predicates["old_value"]),
+         lm_label, predicates["old_value"], columns["outdates"]),
+        (has_predicates & is_attribute_transition & _truthy(columns["makes_effective"]) & pd.notna(predicates["new_value"]),
+         lm_label, predicates["new_value"], columns["makes_effective"]),
+    ]
+    rows, subs, rels, objs = _assemble_triples(slots, len(event_codes))
+
+    # Équivalent de af.deduplicate_triples() appliqué événement par événement
+    return TripleTable.from_arrays(event_ids, event_labels, event_codes[rows], subs, rels, objs).deduplicate()
+
+def _row_ids(ids, prefix: str, mask: np.ndarray, row_event_ids: np.ndarray, row_numbers: np.ndarray) -> np.ndarray:
+    """
+    Attribue un identifiant aux lignes sélectionnées par `mask` (None pour les autres lignes),
+    le rôle du nœud étant son numéro de ligne dans l'événement.
+    """
+    values = np.full(len(mask), None, dtype=object)
+    rows = np.flatnonzero(mask)
+    values[rows] = ids.new_ids(prefix, row_event_ids[rows], row_numbers[rows])
+    return values
+
+def create_complex_event_descriptions(df: pd.DataFrame, id_allocator=None, landmark_registry=None) -> List[Dict[str, any]]:
+    """
+    Version colonnaire de create_complex_event_description() appliquée à tous les événements d'un DataFrame.
+    Les triplets sont identiques à ceux de la version ligne par ligne ; avec un allocateur déterministe
+    (compteur ou uuid5), les identifiants le sont aussi.
+    """
+    return create_complex_event_table(df, id_allocator, landmark_registry).to_descriptions()
+
+def create_complex_event_table(df: pd.DataFrame, id_allocator=None, landmark_registry=None) -> TripleTable:
+    """
+    Comme create_complex_event_descriptions(), mais retourne les triplets sous forme compacte (voir triple_table.py).
+    """
+    ids = id_allocator or ia.RandomIdAllocator()
+    columns, event_codes, n_events = _sort_by_event(df)
+    event_ids, event_labels = _event_header(columns, event_codes, n_events)
+    n_rows = len(event_codes)
+
+    # Identifiant de l'événement et numéro de chaque ligne dans son événement, qui servent de rôle aux nœuds
+    row_event_ids = columns["event_id"]
+    event_starts = np.searchsorted(event_codes, np.arange(n_events))
+    row_numbers = np.arange(n_rows) - event_starts[event_codes]
+
+    lm_label, rel_label = columns["landmark_label"], columns["relatum_label"]
+    relatum = _truthy(rel_label)
+    change_on = columns["change_on"]
+    change = _truthy(columns["change_type"]) & _truthy(change_on)
+    attribute = change & (change_on == "attribute")
+    makes_effective = attribute & _truthy(columns["makes_effective"])
+    outdates = attribute & _truthy(columns["outdates"])
+
+    # Un repère par (événement, libellé), partagé entre landmark_label et relatum_label comme le dictionnaire `landmarks`
+    label_rows = np.concatenate([np.arange(n_rows), np.flatnonzero(relatum)])
+    label_values = np.concatenate([lm_label, rel_label[relatum]])
+    first_seen = np.argsort(np.concatenate([np.arange(n_rows) * 2, np.flatnonzero(relatum) * 2 + 1]), kind="stable")
+    landmark_keys = pd.DataFrame({"event": event_codes[label_rows[first_seen]], "label": label_values[first_seen]})
+    landmark_codes = np.empty(len(label_rows), dtype=int)
+    landmark_codes[first_seen] = landmark_keys.groupby(["event", "label"], dropna=False, sort=False).ngroup().to_numpy()
+    first_keys = np.unique(landmark_codes[first_seen], return_index=True)[1]
+    first_rows, first_labels = label_rows[first_seen][first_keys], label_values[first_seen][first_keys]
+    if landmark_registry is None:
+        landmark_uuids = ids.new_ids("LM", row_event_ids[first_rows], first_labels)
+    else:
+        label_types = np.concatenate([columns["landmark_type"], columns["relatum_type"][relatum]])
+        landmark_uuids = landmark_registry.landmark_ids(first_labels, label_types[first_seen][first_keys])
+        # Les repères sans libellé ne sont pas dans le registre : leur identifiant reste propre à l'événement
+        unlabeled = np.flatnonzero(pd.isna(landmark_uuids))
+        if len(unlabeled):
+            landmark_uuids[unlabeled] = ids.new_ids("LM", row_event_ids[first_rows[unlabeled]], first_labels[unlabeled])
+
+    lm_uuid = landmark_uuids[landmark_codes[:n_rows]]
+    rel_uuid = np.full(n_rows, None, dtype=object)
+    rel_uuid[relatum] = landmark_uuids[landmark_codes[n_rows:]]
+
+    # Lignes qui produisent les triplets isLandmarkType et label : toutes, ou avec le registre la première mention de chaque repère
+    lm_mention, rel_mention = np.ones(n_rows, dtype=bool), relatum
+    if landmark_registry is not None:
+        mentions = np.empty(len(label_rows), dtype=bool)
+        mentions[first_seen] = landmark_registry.first_mentions(landmark_uuids[landmark_codes][first_seen])
+        lm_mention = mentions[:n_rows]
+        rel_mention = np.zeros(n_rows, dtype=bool)
+        rel_mention[relatum] = mentions[n_rows:]
+
+    event_uuid = ids.new_ids("EV", row_event_ids[event_starts], np.full(n_events, ""))[event_codes]
+    lr_uuid = _row_ids(ids, "LR", relatum, row_event_ids, row_numbers)
+    cg_uuid = _row_ids(ids, "CG", change, row_event_ids, row_numbers)
+    attr_uuid = _row_ids(ids, "ATTR", attribute, row_event_ids, row_numbers)
+
+    # Les versions d'attribut sont attribuées ligne par ligne (nouvelle valeur puis ancienne), comme dans la version ligne par ligne
+    av_rows = np.concatenate([np.flatnonzero(makes_effective), np.flatnonzero(outdates)])
+    av_roles = np.concatenate([np.full(makes_effective.sum(), "/makes_effective"), np.full(outdates.sum(), "/outdates")])
+    av_order = np.argsort(np.concatenate([np.flatnonzero(makes_effective) * 2, np.flatnonzero(outdates) * 2 + 1]), kind="stable")
+    av_rows, av_roles = av_rows[av_order], av_roles[av_order]
+    av_uuids = ids.new_ids("AV", row_event_ids[av_rows], np.char.add(row_numbers[av_rows].astype(str), av_roles.astype(str)))
+    new_av_uuid = np.full(n_rows, None, dtype=object)
+    old_av_uuid = np.full(n_rows, None, dtype=object)
+    is_new_value = av_roles == "/makes_effective"
+    new_av_uuid[av_rows[is_new_value]] = av_uuids[is_new_value]
+    old_av_uuid[av_rows[~is_new_value]] = av_uuids[~is_new_value]
+
+    # Un changement sur une relation s'applique à la dernière relation rencontrée dans l'événement
+    last_lr_uuid = pd.Series(lr_uuid).groupby(event_codes).ffill().to_numpy(dtype=object)
+    last_lr_uuid[pd.isna(last_lr_uuid)] = None
+    applied_on = np.where(change_on == "landmark", lm_uuid, last_lr_uuid).astype(object)
+
+    label_literal = ('"' + pd.Series(lm_label, dtype=object).astype(str) + '"@fr').to_numpy(dtype=object)
+    relatum_literal = ('"' + pd.Series(rel_label, dtype=object).astype(str) + '"@fr').to_numpy(dtype=object)
+
+    slots = [
+        (lm_mention, lm_uuid, "isLandmarkType", columns["landmark_type"]),
+        (lm_mention, lm_uuid, "label", label_literal),
+        (rel_mention, rel_uuid, "isLandmarkType", columns["relatum_type"]),
+        (rel_mention, rel_uuid, "label", relatum_literal),
+        (relatum, lr_uuid, "isLandmarkRelationType", columns["relation_type"]),
+        (relatum, lr_uuid, "locatum", lm_uuid),
+        (relatum, lr_uuid, "relatum", rel_uuid),
+        (change, cg_uuid, "isChangeType", columns["change_type"]),
+        (change, cg_uuid, "dependsOn", event_uuid),
+        (change & ((change_on == "landmark") | (change_on == "relation")), cg_uuid, "appliedOn", applied_on),
+        (attribute, attr_uuid, "isAttributeType", columns["attribute_type"]),
+        (attribute, cg_uuid, "appliedOn", attr_uuid),
+        (attribute, lm_uuid, "hasAttribute", attr_uuid),
+        (makes_effective, attr_uuid, "hasAttributeVersion", new_av_uuid),
+        (makes_effective, new_av_uuid, "versionValue", columns["makes_effective"]),
+        (makes_effective, cg_uuid, "makes_effective", new_av_uuid),
+        (outdates, attr_uuid, "hasAttributeVersion", old_av_uuid),
+        (outdates, old_av_uuid, "versionValue", columns["outdates"]),
+        (outdates, cg_uuid, "outdates", old_av_uuid),
+    ]
+    rows, subs, rels, objs = _assemble_triples(slots, n_rows)
+
+    return TripleTable.from_arrays(event_ids, event_labels, event_codes[rows], subs, rels, objs)
+
+def _describe_batch_tables(batch: pd.DataFrame, id_allocator=None, variants=VARIANTS, landmark_registry=None) -> tuple:
+    """
+    Génère les tables de triplets des événements complets d'un lot, pour les versions demandées
+    (par défaut : simple, simple pour BERT, complexe). Seules les tables nécessaires sont calculées.
+    """
+    tables = {}
+    if "simple" in variants or "bert_simple" in variants:
+        tables["simple"] = create_simple_event_table(batch)
+        if "bert_simple" in variants:
+            tables["bert_simple"] = tables["simple"].to_bert_simple()
+    if "complex" in variants:
+        tables["complex"] = create_complex_event_table(batch, id_allocator, landmark_registry)
+    return tuple(tables[variant] for variant in variants)
+
+def _describe_batch(batch: pd.DataFrame, engine: str, as_json: bool = False, id_allocator=None, landmark_registry=None) -> List[tuple]:
+    """
+    Génère les trois descriptions (simple, simple pour BERT, complexe) des événements complets d'un lot.
+    Avec `as_json`, chaque description est renvoyée déjà encodée en JSON (une ligne JSONL sans le retour à la ligne).
+    """
+    if engine == "columnar":
+        # Les triplets restent sous forme compacte jusqu'à la sérialisation
+        tables = _describe_batch_tables(batch, id_allocator, landmark_registry=landmark_registry)
+        if as_json:
+            return list(zip(*(table.to_json_lines() for table in tables)))
+        return list(zip(*(table.to_descriptions() for table in tables)))
+
+    descriptions = []
+    for _, group in batch.groupby("event_id"):
+        simple_event = create_simple_event_description(group)
+        complex_event = create_complex_event_description(group, id_allocator, landmark_registry)
+        descriptions.append((simple_event, create_bert_simple_event_description(simple_event), complex_event))
+
+    if as_json:
+        return [tuple(json.dumps(desc, ensure_ascii=False) for desc in event) for event in descriptions]
+    return descriptions
+
+def _iter_event_batches(df: pd.DataFrame, batch_size: int):
+    """
+    Découpe un DataFrame en lots d'environ `batch_size` lignes, triés par event_id.
+    Les lots sont découpés aux frontières d'événements pour qu'aucun événement ne soit coupé en deux.
+    """
+    order, event_codes, _ = _event_order(_column_values(df, "event_id"))
+
+    start = 0
+    while start < len(order):
+        end = min(start + batch_size, len(order))
+        end = int(np.searchsorted(event_codes, event_codes[end - 1], side="right"))
+        yield df.iloc[order[start:end]]
+        start = end
+
+def _encode_shard(batch: pd.DataFrame) -> Dict[str, tuple]:
+    """
+    Encode un lot sous forme de colonnes compactes à envoyer à un processus de travail :
+    pour chaque colonne, un tableau de codes entiers et le tableau des valeurs distinctes.
+    """
+    shard = {}
+    for col in EventData._fields:
+        if col in batch.columns:
+            codes, uniques = pd.factorize(batch[col].to_numpy(dtype=object))
+            shard[col] = (codes.astype(np.int32), np.asarray(uniques, dtype=object))
+    return shard
+
+def _decode_shard(shard: Dict[str, tuple]) -> pd.DataFrame:
+    """
+    Reconstruit un lot à partir de ses colonnes compactes.
+    Le code -1 (valeur manquante) désigne la dernière case ajoutée, qui vaut None.
+    """
+    return pd.DataFrame({
+        col: np.append(uniques, None)[codes] for col, (codes, uniques) in shard.items()
+    })
+
+def _describe_shard(shard: Dict[str, tuple], engine: str, as_json: bool, id_allocator) -> List[tuple]:
+    """
+    Point d'entrée des processus de travail : reconstruit le lot à partir de ses colonnes compactes et le décrit.
+    """
+    return _describe_batch(_decode_shard(shard), engine, as_json, id_allocator)
+
+def _describe_shard_tables(shard: Dict[str, tuple], id_allocator, variants=VARIANTS) -> tuple:
+    """
+    Comme _describe_shard(), mais renvoie les tables de triplets du lot.
+    """
+    return _describe_batch_tables(_decode_shard(shard), id_allocator, variants)
+
+def _ordered_pool_map(function, items, workers: int, *args):
+    """
+    Applique `function(item, *args)` sur un pool de processus en conservant l'ordre des éléments.
+    Le nombre de tâches en attente est borné pour que les lots ne soient pas tous encodés d'avance.
+    """
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for item in items:
+            pending.append(executor.submit(function, item, *args))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def _check_workers(workers: int, id_allocator, landmark_registry) -> None:
+    if workers > 1 and isinstance(id_allocator, ia.CounterIdAllocator):
+        raise ValueError("Les identifiants séquentiels ne peuvent pas être attribués par plusieurs processus : utilisez le mode uuid5")
+    if workers > 1 and landmark_registry is not None:
+        raise ValueError("Le registre des repères ne peut pas être partagé par plusieurs processus : utilisez workers = 1")
+
+def iter_frames_event_descriptions(frames, engine: str = "columnar", batch_size: int = 100_000, workers: int = 1, as_json: bool = False,
+                                   id_allocator=None, landmark_registry=None):
+    """
+    Comme iter_event_descriptions(), pour une suite de DataFrames contenant chacun des événements complets
+    (ex: morceaux produits par la lecture en streaming). Un seul pool de processus est utilisé pour toute la suite.
+    """
+    if engine not in ("columnar", "rows"):
+        raise ValueError(f"Moteur inconnu : {engine}")
+    _check_workers(workers, id_allocator, landmark_registry)
+
+    batches = (batch for frame in frames for batch in _iter_event_batches(frame, batch_size))
+    if workers > 1:
+        results = _ordered_pool_map(_describe_shard, (_encode_shard(batch) for batch in batches), workers, engine, as_json, id_allocator)
+    else:
+        results = (_describe_batch(batch, engine, as_json, id_allocator, landmark_registry) for batch in batches)
+
+    for descriptions in results:
+        yield from descriptions
+
+def iter_frames_event_tables(frames, batch_size: int = 100_000, workers: int = 1, id_allocator=None, variants=VARIANTS,
+                             landmark_registry=None):
+    """
+    Comme iter_frames_event_descriptions() avec le moteur colonnaire, mais produit pour chaque lot
+    ses tables de triplets (par défaut simple, simple pour BERT, complexe) au lieu des descriptions de chaque événement.
+    `variants` restreint et ordonne les versions produites (ex. ("bert_simple",)).
+
+    Yields:
+        tuple: (TripleTable, ...) tables d'un lot, une par version, dans l'ordre des event_id
+    """
+    _check_workers(workers, id_allocator, landmark_registry)
+
+    batches = (batch for frame in frames for batch in _iter_event_batches(frame, batch_size))
+    if workers > 1:
+        yield from _ordered_pool_map(_describe_shard_tables, (_encode_shard(batch) for batch in batches), workers, id_allocator, variants)
+    else:
+        yield from (_describe_batch_tables(batch, id_allocator, variants, landmark_registry) for batch in batches)
+
+def iter_event_tables(df: pd.DataFrame, batch_size: int = 100_000, workers: int = 1, id_allocator=None, variants=VARIANTS,
+                      landmark_registry=None):
+    """
+    Produit, lot par lot, les tables de triplets (simple, simple pour BERT, complexe) des événements d'un DataFrame
+    (voir iter_event_descriptions et triple_table.py), ou celles des seules versions `variants`.
+    """
+    yield from iter_frames_event_tables([df], batch_size=batch_size, workers=workers, id_allocator=id_allocator, variants=variants,
+                                        landmark_registry=landmark_registry)
+
+def iter_event_descriptions(df: pd.DataFrame, engine: str = "columnar", batch_size: int = 100_000, workers: int = 1, as_json: bool = False,
+                            id_allocator=None, landmark_registry=None):
+    """
+    Parcourt une seule fois les événements d'un DataFrame et produit, pour chacun,
+    ses trois descriptions (simple, simple pour BERT, complexe).
+
+    Les événements sont traités par lots d'environ `batch_size` lignes, si bien que seules les descriptions
+    des lots en cours sont gardées en mémoire. Avec `workers` > 1, les lots sont répartis sur un pool de processus
+    (envoyés sous forme de colonnes compactes) et les descriptions sont produites dans l'ordre des event_id.
+    Avec `as_json`, les descriptions sont encodées en JSON dans les processus de travail, ce qui évite
+    de renvoyer des millions de petits dicts au processus principal.
+
+    Args:
+        df (pd.DataFrame): DataFrame de la vérité terrain.
+        engine (str): "columnar" (par défaut) pour le moteur colonnaire, "rows" pour le parcours ligne par ligne.
+        batch_size (int): Nombre de lignes approximatif par lot.
+        workers (int): Nombre de processus de travail (1 : tout est fait dans le processus courant).
+        as_json (bool): Si True, produit des lignes JSON (str) au lieu de dicts.
+        id_allocator: Allocateur des identifiants des descriptions complexes (voir id_allocators.py), aléatoires par défaut.
+        landmark_registry: Registre des repères partagé par tous les événements (voir landmark_registry.py), aucun par défaut.
+
+    Yields:
+        tuple: (Dict, Dict, Dict) description simple, description simple pour BERT, description complexe
+    """
+    yield from iter_frames_event_descriptions([df], engine=engine, batch_size=batch_size, workers=workers, as_json=as_json,
+                                              id_allocator=id_allocator, landmark_registry=landmark_registry)
+
+def create_event_descriptions(df: pd.DataFrame, engine: str = "columnar", workers: int = 1, id_allocator=None,
+                              landmark_registry=None) -> List[Dict[str, any]]:
     """
     Génère les descriptions simples et complexes de tous les événements dans un DataFrame.
 
+    Args:
+        df (pd.DataFrame): DataFrame de la vérité terrain.
+        engine (str): "columnar" (par défaut) pour le moteur colonnaire, "rows" pour le parcours ligne par ligne.
+        workers (int): Nombre de processus de travail (voir iter_event_descriptions).
+        id_allocator: Allocateur des identifiants des descriptions complexes (voir id_allocators.py).
+        landmark_registry: Registre des repères partagé par tous les événements (voir landmark_registry.py).
+
     Returns
     -------
     tuple: (List[Dict], List[Dict])
         Liste de descriptions simples, Liste de descriptions complexes
     """
-    df = df.where(pd.notna(df), None)
-    grouped = df.groupby("event_id")
-
-    simple_event_desc = [create_simple_event_description(group) for _, group in grouped]
-    bert_simple_event_desc = [create_bert_simple_event_description(desc) for desc in simple_event_desc]
-    complex_event_desc = [create_complex_event_description(group) for _, group in grouped]
+    _check_workers(workers, id_allocator, landmark_registry)
+    if engine == "columnar" and workers <= 1:
+        simple_table = create_simple_event_table(df)
+        simple_event_desc = simple_table.to_descriptions()
+        bert_simple_event_desc = simple_table.to_bert_simple().to_descriptions()
+        complex_event_desc = create_complex_event_table(df, id_allocator, landmark_registry).to_descriptions()
+        return simple_event_desc, bert_simple_event_desc, complex_event_desc
+
+    # Un seul parcours des groupes pour les trois versions
+    descriptions = list(iter_event_descriptions(df, engine=engine, workers=workers, id_allocator=id_allocator,
+                                                landmark_registry=landmark_registry))
+    simple_event_desc = [simple for simple, _, _ in descriptions]
+    bert_simple_event_desc = [bert_simple for _, bert_simple, _ in descriptions]
+    complex_event_desc = [complex_ for _, _, complex_ in descriptions]
 
     # On retourne les descriptions simples, les descriptions adaptées pour BERT et les descriptions complexes
     # pour une utilisation ultérieure dans le pipeline de traitement.
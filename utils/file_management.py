@@ -1,29 +1,63 @@
 import os
+import gc
 import json
 import csv
+from itertools import islice
 from uuid import uuid4
 import pandas as pd
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Taille des tampons de lecture / écriture des fichiers JSONL et nombre d'enregistrements encodés à la fois
+JSONL_BUFFER_SIZE = 1 << 20
+JSONL_BATCH_SIZE = 1_000
+
+def _stdlib_encoder():
+    # Un seul encodeur pour tous les enregistrements (json.dumps en crée un à chaque appel)
+    encode = json.JSONEncoder(ensure_ascii=False).encode
+    return lambda records: [encode(record) for record in records]
+
+def _orjson_encoder():
+    return lambda records: [orjson.dumps(record).decode("utf-8") for record in records]
+
+# Encodeurs JSON disponibles : chacun transforme une liste d'enregistrements en une liste de lignes JSON.
+# orjson (optionnel, backend="orjson") est bien plus rapide mais produit un JSON compact (sans espaces après ':' et ',') :
+# json reste le backend par défaut pour que les fichiers écrits ne dépendent pas des paquets installés.
+JSON_BACKENDS = {"json": (_stdlib_encoder, json.loads)}
+if orjson is not None:
+    JSON_BACKENDS["orjson"] = (_orjson_encoder, orjson.loads)
+DEFAULT_JSON_BACKEND = "json"
+
+def get_json_backend(name: str = None):
+    """
+    Retourne le couple (fonction d'encodage par lots, fonction de décodage) du backend JSON demandé,
+    ou de DEFAULT_JSON_BACKEND si `name` est None.
+    """
+    name = name or DEFAULT_JSON_BACKEND
+    if name not in JSON_BACKENDS:
+        raise ValueError(f"Backend JSON indisponible : {name}")
+    encoder, loads = JSON_BACKENDS[name]
+    return encoder(), loads
+
 def read_file(filename:str, split_lines=False):
-    file = open(filename, "r")
-    file_content = file.read()
+    with open(filename, "r") as file:
+        file_content = file.read()
     if split_lines:
         file_content = file_content.split("\n")
-    file.close()
     return file_content
 
 def read_json_file(filename:str):
-    file = open(filename)
-    data = json.load(file)
-    file.close()
-    return data
+    with open(filename, "rb") as file:
+        return get_json_backend()[1](file.read())
 
 def write_file(content:str,filename:str):
-    file = open(filename, "w")
-    file.write(content)
-    file.close()
+    with open(filename, "w") as file:
+        file.write(content)
 
-def read_csv_as_dataframe(file_path, separator=','):
+def read_csv_as_dataframe(file_path, separator=',', dtype=None, usecols=None):
     """
     Lit un fichier CSV et retourne un DataFrame Pandas.
 
@@ -33,6 +67,10 @@ def read_csv_as_dataframe(file_path, separator=','):
         Le chemin complet ou relatif vers le fichier CSV à lire.
     separator : str, optionnel (par défaut = ',')
         Le séparateur utilisé dans le fichier CSV (ex. ',' pour les fichiers CSV classiques, ';' pour les fichiers Excel exportés en CSV).
+    dtype : dict, optionnel
+        Type de certaines colonnes (ex. "category"), les autres étant déduits par Pandas.
+    usecols : list ou callable, optionnel
+        Colonnes lues (toutes par défaut).
 
     Retourne :
     -------
@@ -42,25 +80,143 @@ def read_csv_as_dataframe(file_path, separator=','):
 
     try:
         # Lecture du fichier CSV avec le séparateur spécifié et l'encodage UTF-8
-        df = pd.read_csv(file_path, sep=separator, encoding='utf-8')
+        df = pd.read_csv(file_path, sep=separator, encoding='utf-8', dtype=dtype, usecols=usecols)
         return df
     except Exception as e:
         # Affiche un message d'erreur si la lecture échoue
         print(f"Erreur lors de la lecture du fichier CSV : {e}")
         return None
     
-def write_jsonl(data, filename):
+def read_csv_in_chunks(file_path, separator=',', chunksize=100_000, usecols=None):
     """
-    Écrit une liste de dictionnaires dans un fichier JSONL.
+    Lit un fichier CSV par morceaux de `chunksize` lignes (seulement les colonnes `usecols` si elles sont données).
+
+    Toutes les colonnes sont lues comme des chaînes de caractères (les cellules vides restent manquantes),
+    afin que le type d'une colonne ne dépende pas du morceau dans lequel elle est lue.
+
+    Retourne :
+    -------
+    Iterator[pd.DataFrame]
+        Itérateur sur les morceaux du fichier.
+    """
+    return iter(pd.read_csv(file_path, sep=separator, encoding='utf-8', dtype=str, chunksize=chunksize, usecols=usecols))
+
+def iter_jsonl_lines(filename, buffer_size=JSONL_BUFFER_SIZE):
+    """
+    Parcourt les lignes d'un fichier JSONL (sans le retour à la ligne), sans les décoder.
+    Les lignes vides sont ignorées.
+    """
+    with open(filename, "r", encoding="utf-8", buffering=buffer_size) as f:
+        for line in f:
+            line = line.rstrip("\r\n")
+            if line:
+                yield line
+
+def _decode_jsonl_block(lines, loads, filename, first_line):
+    """
+    Décode un bloc de lignes JSONL (bytes). Avec le backend standard, le bloc est décodé en un seul appel
+    en regroupant les lignes dans un tableau JSON ; en cas d'erreur, il est redécodé ligne par ligne
+    pour signaler la ligne fautive.
+    """
+    try:
+        if loads is json.loads:
+            records = loads(b"[" + b",".join(lines) + b"]")
+            if len(records) != len(lines):
+                raise ValueError("plusieurs valeurs JSON sur une même ligne")
+            return records
+        return [loads(line) for line in lines]
+    except ValueError:
+        records = []
+        for i, line in enumerate(lines, start=first_line):
+            try:
+                records.append(loads(line))
+            except ValueError as e:
+                raise ValueError(f"{filename}, enregistrement {i} : JSON invalide ({e})") from e
+        return records
+
+def iter_jsonl(filename, backend=None, buffer_size=JSONL_BUFFER_SIZE):
+    """
+    Lit un fichier JSONL de façon paresseuse : les enregistrements sont produits bloc par bloc (environ
+    `buffer_size` octets) au fur et à mesure du décodage, sans charger le fichier en mémoire.
+    Les lignes vides sont ignorées.
+
+    Args:
+        filename (str): Chemin du fichier JSONL.
+        backend (str): Backend JSON ("json" par défaut, ou "orjson" s'il est installé).
+        buffer_size (int): Taille approximative des blocs lus (en octets).
+
+    Yields:
+        dict: Enregistrements du fichier, dans l'ordre.
+    """
+    loads = get_json_backend(backend)[1]
+    line_number = 1
+    with open(filename, "rb") as f:
+        while True:
+            block = f.readlines(buffer_size)
+            if not block:
+                return
+            lines = [line for line in block if line.strip()]
+            # La création de nombreux petits dicts déclenche inutilement le ramasse-miettes cyclique
+            gc_enabled = gc.isenabled()
+            gc.disable()
+            try:
+                records = _decode_jsonl_block(lines, loads, filename, line_number)
+            finally:
+                if gc_enabled:
+                    gc.enable()
+            line_number += len(lines)
+            yield from records
+
+def read_jsonl(filename, backend=None):
+    """
+    Lit un fichier JSONL entier et retourne la liste de ses enregistrements.
+    """
+    return list(iter_jsonl(filename, backend))
+
+def write_jsonl(data, filename, encoded=False, backend=None, batch_size=JSONL_BATCH_SIZE, buffer_size=JSONL_BUFFER_SIZE):
+    """
+    Écrit une liste (ou un itérable) de dictionnaires dans un fichier JSONL.
+    Les enregistrements sont encodés par lots de `batch_size` et chaque lot est écrit en une seule fois
+    dans un tampon de `buffer_size` octets.
 
     Args:
-        data (list): Liste de dictionnaires à écrire.
+        data (iterable): Dictionnaires à écrire.
         filename (str): Chemin du fichier de sortie (ex: 'output.jsonl').
+        encoded (bool): Si True, les éléments sont des lignes JSON déjà encodées (str, sans retour à la ligne).
+        backend (str): Backend JSON ("json" par défaut, ou "orjson" s'il est installé).
+        batch_size (int): Nombre d'enregistrements encodés à la fois.
+        buffer_size (int): Taille du tampon d'écriture (en octets).
+    """
+    write_jsonl_files(((item,) for item in data), [filename], encoded=encoded, backend=backend, batch_size=batch_size,
+                      buffer_size=buffer_size)
+
+def write_jsonl_files(records, filenames, encoded=False, backend=None, batch_size=JSONL_BATCH_SIZE, buffer_size=JSONL_BUFFER_SIZE):
     """
-    with open(filename, 'w', encoding='utf-8') as f:
-        for item in data:
-            json.dump(item, f, ensure_ascii=False)
-            f.write('\n')
+    Écrit en parallèle plusieurs fichiers JSONL à partir d'un itérable de tuples,
+    le i-ème élément de chaque tuple étant écrit dans le i-ème fichier.
+    Les enregistrements sont écrits au fur et à mesure, par lots, sans construire de liste intermédiaire.
+
+    Args:
+        records (iterable): Itérable de tuples de dictionnaires (ex: sortie de iter_event_descriptions).
+        filenames (list): Chemins des fichiers de sortie, dans l'ordre des éléments des tuples.
+        encoded (bool): Si True, les éléments sont des lignes JSON déjà encodées (str).
+        backend (str): Backend JSON utilisé si `encoded` est False.
+        batch_size (int): Nombre d'enregistrements encodés et écrits à la fois.
+        buffer_size (int): Taille des tampons d'écriture (en octets).
+    """
+    encode = None if encoded else get_json_backend(backend)[0]
+    records = iter(records)
+    files = [open(filename, 'w', encoding='utf-8', buffering=buffer_size) for filename in filenames]
+    try:
+        while True:
+            batch = list(islice(records, batch_size))
+            if not batch:
+                break
+            for items, f in zip(zip(*batch), files):
+                f.write("\n".join(items if encoded else encode(items)) + "\n")
+    finally:
+        for f in files:
+            f.close()
 
 def create_folder_if_not_exists(folder:str):
     if not os.path.exists(folder):
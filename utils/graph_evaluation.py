@@ -0,0 +1,381 @@
+import os
+import re
+import json
+import time
+import argparse
+from collections import Counter, defaultdict
+from typing import Dict, List
+import numpy as np
+import file_management as fm
+import evaluation as ev
+
+DEFAULT_GOLD_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", "complex_ground_truth_test.jsonl")
+
+# Nœuds anonymes des descriptions complexes : identifiant préfixé par le type du nœud (LM_<uuid>, CG_12...)
+NODE_PREFIXES = ("EV", "LM", "LR", "CG", "ATTR", "AV")
+_node_pattern = re.compile(rf"^({'|'.join(NODE_PREFIXES)})_\S+$")
+
+def node_type(value):
+    """
+    Type (préfixe) d'un nœud anonyme, ou None si la valeur est un littéral.
+    """
+    if isinstance(value, str):
+        match = _node_pattern.match(value)
+        if match:
+            return match.group(1)
+    return None
+
+class _Graph:
+    """
+    Graphe d'un événement : nœuds anonymes numérotés, arêtes vers d'autres nœuds ou vers des littéraux normalisés.
+    """
+    def __init__(self, triples, normalize: bool = True):
+        self.node_ids = {}
+        self.types = []
+        self.triples = []
+        for triple in triples:
+            sub, rel, obj = ev._triple_fields(triple)
+            self.triples.append((self._term(sub, normalize), rel, self._term(obj, normalize)))
+
+    def _term(self, value, normalize: bool):
+        # Nœud anonyme : entier (indice du nœud) ; littéral : chaîne normalisée
+        prefix = node_type(value)
+        if prefix is None:
+            return ev.normalize_label(value) if normalize else ("" if value is None else str(value))
+        node = self.node_ids.get(value)
+        if node is None:
+            node = self.node_ids[value] = len(self.types)
+            self.types.append(prefix)
+        return node
+
+def refine_colors(graphs: List[_Graph], fixed_types=()) -> List[List[List[int]]]:
+    """
+    Raffinement des couleurs (Weisfeiler-Lehman) sur l'union disjointe des graphes : la couleur initiale d'un nœud
+    est son type, puis chaque tour lui associe sa couleur et le multiensemble de ses arêtes
+    (relation, sens, couleur du voisin ou valeur du littéral), jusqu'à ce que la partition des nœuds ne s'affine plus.
+    Deux nœuds de graphes différents ayant la même couleur au tour k ont le même voisinage jusqu'à la distance k.
+
+    Args:
+        graphs (list): Graphes à colorer ensemble (les couleurs sont comparables d'un graphe à l'autre).
+        fixed_types: Types dont les nœuds gardent leur couleur initiale. Pour le nœud de l'événement, relié à tous
+            les changements, cela évite qu'une seule différence entre les graphes ne modifie la couleur de tous les nœuds.
+
+    Returns:
+        list: Pour chaque tour (du type seul à la partition stable), la couleur (entier) des nœuds de chaque graphe.
+    """
+    offsets = np.cumsum([0] + [len(graph.types) for graph in graphs]).tolist()
+    n_nodes = offsets[-1]
+    edges = [[] for _ in range(n_nodes)]
+    for graph, offset in zip(graphs, offsets):
+        for sub, rel, obj in graph.triples:
+            sub_node, obj_node = isinstance(sub, int), isinstance(obj, int)
+            if sub_node:
+                edges[offset + sub].append((rel, 1, offset + obj if obj_node else None, obj))
+            if obj_node:
+                edges[offset + obj].append((rel, 0, offset + sub if sub_node else None, sub))
+
+    palette = {}
+    colors = [palette.setdefault(prefix, len(palette)) for graph in graphs for prefix in graph.types]
+    fixed = {palette[prefix] for prefix in fixed_types if prefix in palette}
+    rounds = [colors]
+    while True:
+        n_colors = len(palette)
+        palette = {}
+        colors = [
+            palette.setdefault((colors[i], () if colors[i] in fixed else tuple(sorted(
+                (rel, direction, colors[j] if j is not None else -1, "" if j is not None else value)
+                for rel, direction, j, value in edges[i]
+            ))), len(palette))
+            for i in range(n_nodes)
+        ]
+        fixed = {colors[i] for i, color in enumerate(rounds[-1]) if color in fixed}
+        if len(palette) == n_colors:
+            break
+        rounds.append(colors)
+    return [[round_colors[start:end] for start, end in zip(offsets[:-1], offsets[1:])] for round_colors in rounds]
+
+def _edge_keys(graph: _Graph):
+    """
+    Arêtes de chaque nœud sous forme (relation, sens, autre extrémité) : nœud (entier) ou littéral.
+    """
+    keys = defaultdict(set)
+    for sub, rel, obj in graph.triples:
+        if isinstance(sub, int):
+            keys[sub].add((rel, 1, obj))
+        if isinstance(obj, int):
+            keys[obj].add((rel, 0, sub))
+    return keys
+
+def align_graphs(predicted: _Graph, gold: _Graph) -> Dict[int, int]:
+    """
+    Associe les nœuds anonymes prédits aux nœuds de référence (un pour un, de même type).
+
+    Les nœuds sont regroupés par couleur (voir refine_colors), du dernier tour au premier : un nœud prédit
+    est d'abord associé à un nœud de référence de même voisinage à toute distance, puis, à défaut (graphes différents),
+    à un nœud de même voisinage proche, et en dernier lieu à un nœud de même type.
+    Dans un groupe, une paire n'est retenue que si chacun des deux nœuds est, pour l'autre, le candidat qui partage
+    strictement le plus d'arêtes (voisins déjà associés ou littéraux identiques) ; ces passes sont répétées tant
+    qu'elles associent de nouveaux nœuds. Les nœuds encore indiscernables ne sont associés arbitrairement
+    qu'au dernier tour (voisinages identiques : le choix n'a pas d'influence sur le score) et, type par type, au premier.
+
+    Returns:
+        dict: Nœud prédit -> nœud de référence.
+    """
+    predicted_edges, gold_edges = _edge_keys(predicted), _edge_keys(gold)
+    # Type présent une seule fois dans chaque graphe (le nœud de l'événement) : association immédiate
+    predicted_types, gold_types = Counter(predicted.types), Counter(gold.types)
+    unique = {prefix for prefix, count in predicted_types.items() if count == 1 and gold_types.get(prefix) == 1}
+    mapping = {node: gold.types.index(prefix) for node, prefix in enumerate(predicted.types) if prefix in unique}
+    used = set(mapping.values())
+
+    neighbours = {node: [other for _, _, other in edges if isinstance(other, int)] for node, edges in predicted_edges.items()}
+
+    def classes(predicted_colors, gold_colors, dirty=None):
+        groups = defaultdict(lambda: ([], []))
+        for node, color in enumerate(predicted_colors):
+            if node not in mapping and (dirty is None or color in dirty):
+                groups[color][0].append(node)
+        for node, color in enumerate(gold_colors):
+            if node not in used and (dirty is None or color in dirty):
+                groups[color][1].append(node)
+        # Petits groupes d'abord : leurs associations, presque certaines, guident celles des groupes plus grands
+        return sorted((nodes for nodes in groups.values() if nodes[0] and nodes[1]), key=lambda nodes: max(map(len, nodes)))
+
+    def pair(colors, groups, forced: bool) -> None:
+        # Après une passe, seuls les groupes dont un nœud ou un voisin vient d'être associé peuvent évoluer
+        while groups:
+            added = []
+            for predicted_nodes, gold_nodes in groups:
+                pairs = _pair_nodes(predicted_nodes, gold_nodes, predicted_edges, gold_edges, mapping, forced)
+                mapping.update(pairs)
+                used.update(pairs.values())
+                added.extend(pairs)
+            forced = False
+            dirty = {colors[0][node] for node in added} | {colors[0][other] for node in added for other in neighbours.get(node, ())}
+            groups = classes(*colors, dirty) if added else []
+
+    rounds = refine_colors([predicted, gold], unique)
+    for level, colors in enumerate(reversed(rounds)):
+        pair(colors, classes(*colors), forced=level == 0)
+    while len(mapping) < len(predicted.types):
+        groups = classes(*rounds[0])
+        if not groups:
+            break
+        pair(rounds[0], groups[:1], forced=True)
+    return mapping
+
+def _pair_nodes(predicted_nodes, gold_nodes, predicted_edges, gold_edges, mapping: Dict[int, int], forced: bool) -> Dict[int, int]:
+    """
+    Associe les nœuds d'un groupe selon le nombre d'arêtes communes compte tenu des associations déjà faites.
+
+    Args:
+        forced (bool): Si True, les paires sont choisies de façon gloutonne (les plus d'arêtes communes d'abord),
+            puis les nœuds restants sont associés dans l'ordre ; sinon, seules les paires de meilleurs candidats
+            mutuels et sans ex aequo sont retenues.
+    """
+    if len(predicted_nodes) == 1 and len(gold_nodes) == 1:
+        return {predicted_nodes[0]: gold_nodes[0]}
+
+    index = defaultdict(list)
+    for node in gold_nodes:
+        for key in gold_edges[node]:
+            index[key].append(node)
+    # Une arête commune à tous les candidats (ex. dependsOn vers l'événement) ne départage aucune paire
+    index = {key: nodes for key, nodes in index.items() if len(nodes) < len(gold_nodes)}
+    pairs = []
+    for node in predicted_nodes:
+        shared = defaultdict(int)
+        literals = []
+        for rel, direction, other in predicted_edges[node]:
+            if isinstance(other, int):
+                for candidate in index.get((rel, direction, mapping.get(other, -1)), ()):
+                    shared[candidate] += 1
+            else:
+                literals.append((rel, direction, other))
+        if forced:
+            for key in literals:
+                for candidate in index.get(key, ()):
+                    shared[candidate] += 1
+        else:
+            # Les littéraux, communs à de nombreux candidats, ne font que départager ceux qui ont un voisin en commun
+            for candidate in shared:
+                shared[candidate] += sum(key in gold_edges[candidate] for key in literals)
+        pairs.extend((-score, node, candidate) for candidate, score in shared.items())
+    pairs.sort()
+
+    result = {}
+    if forced:
+        free = set(gold_nodes)
+        for _, node, candidate in pairs:
+            if node not in result and candidate in free:
+                result[node] = candidate
+                free.discard(candidate)
+        remaining = [node for node in gold_nodes if node in free]
+        result.update(zip([node for node in predicted_nodes if node not in result], remaining))
+        return result
+
+    # Meilleur candidat de chaque nœud (None en cas d'ex aequo), dans les deux sens
+    best_candidate, best_node = {}, {}
+    for best, first, second in ((best_candidate, 1, 2), (best_node, 2, 1)):
+        top = {}
+        for pair in pairs:
+            node, score = pair[first], -pair[0]
+            if node not in top:
+                top[node] = score
+                best[node] = pair[second]
+            elif score == top[node]:
+                best[node] = None
+    for node, candidate in best_candidate.items():
+        if candidate is not None and best_node.get(candidate) == node:
+            result[node] = candidate
+    return result
+
+def _count_matches(predicted: _Graph, gold: _Graph, mapping: Dict[int, int], counts) -> None:
+    """
+    Ajoute aux compteurs par relation les triplets appariés, prédits et de référence d'un événement.
+    Un nœud prédit sans correspondant ne peut égaler aucun nœud de référence.
+    """
+    def translate(term):
+        return mapping.get(term, -1 - term) if isinstance(term, int) else term
+
+    predicted_triples = {(translate(sub), rel, translate(obj)) for sub, rel, obj in predicted.triples}
+    gold_triples = set(gold.triples)
+    for _, rel, _ in predicted_triples & gold_triples:
+        counts[rel][0] += 1
+    for _, rel, _ in predicted_triples:
+        counts[rel][1] += 1
+    for _, rel, _ in gold_triples:
+        counts[rel][2] += 1
+
+class GraphEvaluator:
+    """
+    Évalue des descriptions complexes prédites (graphes dont les nœuds sont des identifiants arbitraires LM_, CG_,
+    ATTR_, AV_, LR_, EV_) par rapport à la vérité terrain : les nœuds prédits sont d'abord alignés sur les nœuds
+    de référence de chaque événement (voir align_graphs), puis les triplets sont comparés comme des ensembles.
+    Les scores ont le même format que ceux de evaluation.TripleEvaluator (micro, macro et par relation).
+
+    Args:
+        gold: Chemin du fichier JSONL de référence (ex. complex_ground_truth_test.jsonl), ou liste d'événements.
+        normalize (bool): Si True, les littéraux sont normalisés (voir evaluation.normalize_label).
+    """
+    def __init__(self, gold, normalize: bool = True):
+        self.normalize = normalize
+        events = fm.iter_jsonl(gold) if isinstance(gold, str) else gold
+        self.gold = {str(event.get("id")): _Graph(event.get("triples", []), normalize) for event in events}
+
+    def score_events(self, predictions) -> Dict[str, any]:
+        """
+        Évalue un ensemble de prédictions (itérable d'événements {"id", "triples"} ou dict {identifiant: triplets}).
+        """
+        if isinstance(predictions, dict):
+            predictions = ({"id": event_id, "triples": triples} for event_id, triples in predictions.items())
+
+        counts = defaultdict(lambda: [0, 0, 0])
+        seen, unknown = set(), 0
+        for event in predictions:
+            event_id = str(event.get("id"))
+            gold = self.gold.get(event_id)
+            if gold is None:
+                unknown += 1
+                continue
+            seen.add(event_id)
+            predicted = _Graph(event.get("triples") or [], self.normalize)
+            _count_matches(predicted, gold, align_graphs(predicted, gold), counts)
+
+        for event_id, gold in self.gold.items():
+            if event_id not in seen:
+                _count_matches(_Graph([]), gold, {}, counts)
+
+        return {"events": len(seen), "missing_events": len(self.gold) - len(seen), "unknown_events": unknown,
+                "graph": ev.relation_scores(counts)}
+
+    def score_file(self, path: str) -> Dict[str, any]:
+        return self.score_events(fm.iter_jsonl(path))
+
+    def score_files(self, paths) -> Dict[str, Dict[str, any]]:
+        return {path: self.score_file(path) for path in paths}
+
+def synthetic_graph_pair(n_rows: int, seed: int = 0, noise: float = 0.05):
+    """
+    Paire (prédiction, référence) de descriptions complexes d'un même événement synthétique de `n_rows` lignes :
+    la prédiction est la référence dont les nœuds ont reçu d'autres identifiants (aléatoires) et les triplets
+    un autre ordre, et dont une part `noise` des triplets est supprimée ou voit son littéral modifié.
+
+    Returns:
+        tuple: Prédiction, référence et correspondance réelle des nœuds (identifiant prédit -> identifiant de référence).
+    """
+    import synthetic_ground_truth as sgen
+    import event_description_generator as edg
+    import id_allocators as ia
+
+    rng = np.random.default_rng(seed)
+    skeleton = sgen.fit_profile(fm.read_csv_as_dataframe(sgen.DEFAULT_REFERENCE_PATH, separator="\t"))
+    rows = sgen.generate_events(skeleton, n_rows, rng).iloc[:n_rows].copy()
+    rows["event_id"], rows["event_label"] = "1", rows["event_label"].iloc[0]
+    gold = edg.create_complex_event_table(rows, ia.RandomIdAllocator()).to_descriptions()[0]
+
+    renamed = {}
+    def rename(value):
+        prefix = node_type(value)
+        if prefix is None:
+            return value
+        if value not in renamed:
+            renamed[value] = f"{prefix}_{rng.integers(1 << 62):x}"
+        return renamed[value]
+
+    triples = []
+    for triple in gold["triples"]:
+        draw = rng.random()
+        if draw < noise / 2:
+            continue
+        obj = rename(triple["obj"])
+        if draw < noise and obj == triple["obj"]:
+            obj = f"{obj} bis"
+        triples.append({"sub": rename(triple["sub"]), "rel": triple["rel"], "obj": obj})
+    order = rng.permutation(len(triples))
+    predicted = {"id": gold["id"], "triples": [triples[i] for i in order]}
+    return predicted, gold, {new: old for old, new in renamed.items()}
+
+def benchmark(sizes=(10, 100, 1_000, 5_000), noise: float = 0.05, seed: int = 0) -> List[Dict[str, any]]:
+    """
+    Mesure le temps d'alignement et d'évaluation d'un événement synthétique de taille croissante.
+    Le F1 obtenu est comparé au F1 calculé avec la correspondance réelle des nœuds (`best_f1`) :
+    sans bruit, les deux graphes ne diffèrent que par leurs identifiants et le score doit être parfait.
+    """
+    results = []
+    for n_rows in sizes:
+        for level in (0.0, noise):
+            predicted, gold, truth = synthetic_graph_pair(n_rows, seed, level)
+            start = time.perf_counter()
+            scores = GraphEvaluator([gold]).score_events([predicted])["graph"]["micro"]
+            seconds = time.perf_counter() - start
+
+            predicted_graph, gold_graph = _Graph(predicted["triples"]), _Graph(gold["triples"])
+            best = defaultdict(lambda: [0, 0, 0])
+            _count_matches(predicted_graph, gold_graph, {
+                node: gold_graph.node_ids[truth[value]] for value, node in predicted_graph.node_ids.items()
+            }, best)
+            results.append({"rows": n_rows, "triples": len(gold["triples"]), "noise": level, "seconds": round(seconds, 4),
+                            "f1": scores["f1"], "best_f1": ev.relation_scores(best)["micro"]["f1"]})
+            print(results[-1])
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Évalue des descriptions complexes prédites par alignement des graphes.")
+    parser.add_argument("predictions", nargs="*", help="Fichiers JSONL de prédictions ({\"id\", \"triples\"})")
+    parser.add_argument("--gold", default=DEFAULT_GOLD_PATH, help="Fichier JSONL de référence (ex. complex_ground_truth_test.jsonl)")
+    parser.add_argument("--raw-literals", action="store_true", help="Comparer les littéraux sans normalisation")
+    parser.add_argument("--output", default=None, help="Fichier JSON des scores détaillés")
+    parser.add_argument("--benchmark", type=int, nargs="*", default=None, metavar="LIGNES",
+                        help="Mesurer l'évaluation sur des événements synthétiques de ces tailles (ex. 10 100 1000 5000)")
+    args = parser.parse_args()
+
+    if args.benchmark is not None:
+        benchmark(args.benchmark or (10, 100, 1_000, 5_000))
+    else:
+        evaluator = GraphEvaluator(args.gold, normalize=not args.raw_literals)
+        results = evaluator.score_files(args.predictions)
+        print(ev.format_scores(results, "graph"))
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                f.write(json.dumps(results, ensure_ascii=False, indent=2))
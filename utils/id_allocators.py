@@ -0,0 +1,106 @@
+import os
+from hashlib import sha1
+from uuid import UUID, NAMESPACE_URL, uuid5
+import numpy as np
+
+# Espace de noms des identifiants déterministes (uuid5)
+PEGAZUS_NAMESPACE = uuid5(NAMESPACE_URL, "pegazus-event-extraction")
+
+_HEX_DIGITS = np.frombuffer(b"0123456789abcdef", dtype=np.uint8)
+
+def format_uuids(prefix: str, raw: np.ndarray, version: int, hex_digits: int = None) -> np.ndarray:
+    """
+    Met en forme des UUIDs bruts (tableau de n x 16 octets) en chaînes préfixées (ex. LM_<uuid>),
+    en fixant les bits de version et de variante comme le module uuid.
+    Si `hex_digits` est donné, l'identifiant est raccourci à ses `hex_digits` premiers chiffres hexadécimaux, sans tirets.
+    """
+    count = len(raw)
+    raw = raw.copy()
+    raw[:, 6] = (raw[:, 6] & 0x0F) | (version << 4)
+    raw[:, 8] = (raw[:, 8] & 0x3F) | 0x80
+
+    # Conversion hexadécimale vectorisée puis insertion des tirets (format 8-4-4-4-12)
+    digits = _HEX_DIGITS[np.stack([raw >> 4, raw & 0x0F], axis=2).reshape(count, 32)]
+    head = np.tile(np.frombuffer(f"{prefix}_".encode("ascii"), dtype=np.uint8), (count, 1))
+    if hex_digits:
+        chars = np.hstack([head, digits[:, :hex_digits]])
+    else:
+        dash = np.full((count, 1), ord("-"), dtype=np.uint8)
+        chars = np.hstack([head, digits[:, :8], dash, digits[:, 8:12], dash, digits[:, 12:16],
+                           dash, digits[:, 16:20], dash, digits[:, 20:]])
+
+    width = chars.shape[1]
+    text = chars.tobytes().decode("ascii")
+    return np.array([text[i:i + width] for i in range(0, len(text), width)], dtype=object)
+
+class RandomIdAllocator:
+    """
+    Identifiants aléatoires (uuid4), différents à chaque exécution. C'est le comportement historique.
+    """
+    def new_ids(self, prefix: str, event_ids, roles) -> np.ndarray:
+        """
+        Retourne un identifiant préfixé pour chaque couple (event_id, rôle).
+
+        Args:
+            prefix (str): Préfixe du type de nœud (EV, LM, LR, CG, ATTR, AV).
+            event_ids (array-like): Identifiant de l'événement de chaque nœud.
+            roles (array-like): Rôle du nœud dans son événement (libellé du repère, numéro de ligne...).
+        """
+        count = len(event_ids)
+        raw = np.frombuffer(os.urandom(16 * count), dtype=np.uint8).reshape(count, 16)
+        return format_uuids(prefix, raw, version=4)
+
+    def new_id(self, prefix: str, event_id, role) -> str:
+        """
+        Version scalaire de new_ids().
+        """
+        return self.new_ids(prefix, [event_id], [role])[0]
+
+class CounterIdAllocator(RandomIdAllocator):
+    """
+    Identifiants courts et séquentiels (LM_1, LM_2...), un compteur par préfixe pour toute l'exécution.
+    Les identifiants dépendent de l'ordre de traitement : ils ne peuvent pas être attribués par plusieurs processus.
+    """
+    def __init__(self):
+        self.counters = {}
+
+    def new_ids(self, prefix: str, event_ids, roles) -> np.ndarray:
+        start = self.counters.get(prefix, 0)
+        self.counters[prefix] = start + len(event_ids)
+        return np.array([f"{prefix}_{n}" for n in range(start + 1, start + len(event_ids) + 1)], dtype=object)
+
+class Uuid5IdAllocator(RandomIdAllocator):
+    """
+    Identifiants déterministes : uuid5 de l'espace de noms sur "<event_id>/<préfixe>/<rôle>".
+    Un même nœud reçoit le même identifiant à chaque exécution, quel que soit l'ordre de traitement.
+
+    Args:
+        namespace (UUID): Espace de noms des uuid5.
+        hex_digits (int): Si donné, longueur des identifiants raccourcis (ex. 16 chiffres hexadécimaux).
+    """
+    def __init__(self, namespace: UUID = PEGAZUS_NAMESPACE, hex_digits: int = None):
+        self.namespace = namespace
+        self.hex_digits = hex_digits
+
+    def new_ids(self, prefix: str, event_ids, roles) -> np.ndarray:
+        namespace = self.namespace.bytes
+        digests = b"".join(
+            sha1(namespace + f"{event_id}/{prefix}/{role}".encode("utf-8")).digest()[:16]
+            for event_id, role in zip(event_ids, roles)
+        )
+        raw = np.frombuffer(digests, dtype=np.uint8).reshape(len(event_ids), 16)
+        return format_uuids(prefix, raw, version=5, hex_digits=self.hex_digits)
+
+ID_ALLOCATORS = {
+    "random": RandomIdAllocator,
+    "counter": CounterIdAllocator,
+    "uuid5": Uuid5IdAllocator,
+}
+
+def get_id_allocator(mode: str = "random", **kwargs):
+    """
+    Retourne un allocateur d'identifiants à partir de son nom ("random", "counter" ou "uuid5").
+    """
+    if mode not in ID_ALLOCATORS:
+        raise ValueError(f"Mode d'identifiants inconnu : {mode}")
+    return ID_ALLOCATORS[mode](**kwargs)
@@ -0,0 +1,183 @@
+import os
+import json
+from hashlib import sha1
+from itertools import islice
+import numpy as np
+import pandas as pd
+import event_description_generator as edg
+import change_predicates as cp
+import id_allocators as ia
+import file_management as fm
+
+# À incrémenter dès que la génération des descriptions change : le cache est alors entièrement reconstruit
+MANIFEST_VERSION = 2
+
+def hash_events(df: pd.DataFrame):
+    """
+    Calcule une empreinte du contenu de chaque événement (groupe d'event_id), dans l'ordre de df.groupby("event_id").
+    L'empreinte dépend de toutes les colonnes lues (voir edg.read_ground_truth) et de l'ordre des lignes dans l'événement.
+
+    Returns
+    -------
+    tuple: (list, list)
+        Identifiants des événements et empreintes correspondantes (chaînes hexadécimales)
+    """
+    order, event_codes, n_events = edg._event_order(edg._column_values(df, "event_id"))
+    rows = df.iloc[order].reset_index(drop=True)
+    starts = np.searchsorted(event_codes, np.arange(n_events))
+    rows["__position__"] = np.arange(len(rows)) - starts[event_codes]
+
+    # Somme (modulo 2^64) des empreintes des lignes, la position de chaque ligne faisant partie de son empreinte
+    row_hashes = pd.util.hash_pandas_object(rows, index=False).to_numpy(dtype=np.uint64)
+    sums = np.add.reduceat(row_hashes, starts) if n_events else row_hashes[:0]
+    counts = np.diff(np.append(starts, len(rows)))
+
+    event_ids = rows["event_id"].to_numpy(dtype=object)[starts].tolist()
+    return event_ids, [f"{s:016x}{c:x}" for s, c in zip(sums.tolist(), counts.tolist())]
+
+def file_digest(file_path: str, block_size: int = 1 << 20) -> str:
+    """
+    Empreinte sha1 du contenu d'un fichier, lu par blocs.
+    """
+    digest = sha1()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def build_config(columns: dict, id_allocator, separator: str) -> dict:
+    """
+    Paramètres dont dépendent toutes les descriptions : s'ils changent, le cache n'est plus utilisable.
+    """
+    with open(cp.DEFAULT_RULES_PATH, "rb") as f:
+        rules_hash = sha1(f.read()).hexdigest()
+    return {
+        "version": MANIFEST_VERSION,
+        "separator": separator,
+        "columns": columns,
+        "change_predicates": rules_hash,
+        "id_namespace": str(id_allocator.namespace),
+        "id_hex_digits": id_allocator.hex_digits,
+    }
+
+def manifest_is_valid(manifest: dict, config: dict, out_paths) -> bool:
+    """
+    Vérifie qu'un manifeste a été produit avec les mêmes paramètres et que les fichiers de sortie
+    n'ont pas été modifiés depuis (même taille).
+    """
+    if manifest.get("config") != config or manifest.get("outputs") != [os.path.basename(path) for path in out_paths]:
+        return False
+    sizes = [os.path.getsize(path) if os.path.exists(path) else None for path in out_paths]
+    return sizes == manifest.get("output_sizes")
+
+def _merge_operations(event_ids, dirty, cached_ids):
+    """
+    Décrit la construction des nouveaux fichiers comme une suite d'opérations groupées, communes aux trois fichiers :
+    ("copy", n) recopie n lignes du fichier précédent, ("skip", n) en saute n (événements supprimés ou modifiés)
+    et ("insert", n) insère n descriptions régénérées. Les événements conservés sont dans le même ordre
+    dans les deux fichiers, ce qui permet une fusion en un seul passage.
+    """
+    operations = []
+
+    def push(kind):
+        if operations and operations[-1][0] == kind:
+            operations[-1][1] += 1
+        else:
+            operations.append([kind, 1])
+
+    position = 0
+    for event_id in event_ids:
+        if event_id in dirty:
+            push("insert")
+            continue
+        while cached_ids[position] != event_id:
+            push("skip")
+            position += 1
+        push("copy")
+        position += 1
+    return operations
+
+def _rewrite_output(path: str, tmp_path: str, operations, generated_lines, buffer_size: int = 1 << 20):
+    """
+    Écrit le nouveau fichier `tmp_path` à partir du fichier précédent et des lignes régénérées.
+    Les lignes recopiées ne sont ni décodées ni analysées.
+    """
+    generated_lines = iter(generated_lines)
+    with open(path, "rb") as old, open(tmp_path, "wb", buffering=buffer_size) as out:
+        for kind, count in operations:
+            if kind == "copy":
+                out.writelines(islice(old, count))
+            elif kind == "skip":
+                next(islice(old, count, count), None)
+            else:
+                out.write("".join(line + "\n" for line in islice(generated_lines, count)).encode("utf-8"))
+
+def build_incremental(in_path: str, out_paths, manifest_path: str, separator: str = "\t", workers: int = 1, id_allocator=None) -> dict:
+    """
+    Construit les fichiers JSONL (simple, simple pour BERT, complexe) en ne régénérant que les événements
+    ajoutés ou modifiés depuis la construction précédente ; les autres sont recopiés depuis les fichiers existants.
+
+    Le manifeste conserve, dans l'ordre des fichiers de sortie, l'empreinte du contenu de chaque événement.
+    Les identifiants des descriptions complexes doivent être déterministes (allocateur uuid5) pour qu'un événement
+    régénéré ou recopié donne le même résultat qu'une construction complète.
+
+    Args:
+        in_path (str): Chemin du fichier CSV de vérité terrain.
+        out_paths (list): Chemins des fichiers JSONL simple, simple pour BERT et complexe.
+        manifest_path (str): Chemin du manifeste (JSON).
+        separator (str): Séparateur du fichier CSV.
+        workers (int): Nombre de processus de travail pour la génération des descriptions.
+        id_allocator: Allocateur uuid5 des identifiants (voir id_allocators.py), celui par défaut si None.
+
+    Returns:
+        dict: Nombre d'événements régénérés, recopiés et supprimés.
+    """
+    id_allocator = id_allocator or ia.Uuid5IdAllocator()
+    if not isinstance(id_allocator, ia.Uuid5IdAllocator):
+        raise ValueError("La construction incrémentale nécessite des identifiants déterministes : utilisez le mode uuid5")
+
+    # Fichier d'entrée identique octet pour octet : rien à reconstruire, inutile de le lire
+    input_digest = file_digest(in_path)
+    manifest = fm.read_json_file(manifest_path) if os.path.exists(manifest_path) else None
+    if manifest and manifest.get("input_digest") == input_digest:
+        config = build_config(manifest["config"]["columns"], id_allocator, separator)
+        if manifest_is_valid(manifest, config, out_paths):
+            return {"regenerated": 0, "reused": len(manifest["events"]), "removed": 0}
+
+    df = edg.read_ground_truth(in_path, separator=separator)
+    event_ids, hashes = hash_events(df)
+    config = build_config({col: str(dtype) for col, dtype in df.dtypes.items()}, id_allocator, separator)
+    if manifest and not manifest_is_valid(manifest, config, out_paths):
+        manifest = None
+    previous = dict(manifest["events"]) if manifest else {}
+    cached_ids = [event_id for event_id, _ in manifest["events"]] if manifest else []
+
+    dirty = {event_id for event_id, h in zip(event_ids, hashes) if previous.get(event_id) != h}
+    removed = len(previous.keys() - set(event_ids))
+    stats = {"regenerated": len(dirty), "reused": len(event_ids) - len(dirty), "removed": removed}
+
+    dirty_rows = df[df["event_id"].isin(list(dirty))]
+    generated = edg.iter_event_descriptions(dirty_rows, workers=workers, as_json=True, id_allocator=id_allocator)
+    if not manifest:
+        fm.write_jsonl_files(generated, out_paths, encoded=True)
+    elif dirty or removed:
+        # Écriture dans des fichiers temporaires : les fichiers précédents sont relus pendant la construction
+        operations = _merge_operations(event_ids, dirty, cached_ids)
+        generated = list(generated)
+        tmp_paths = [path + ".tmp" for path in out_paths]
+        for i, (path, tmp_path) in enumerate(zip(out_paths, tmp_paths)):
+            _rewrite_output(path, tmp_path, operations, (lines[i] for lines in generated))
+        for tmp_path, path in zip(tmp_paths, out_paths):
+            os.replace(tmp_path, path)
+
+    manifest = {
+        "input_digest": input_digest,
+        "config": config,
+        "outputs": [os.path.basename(path) for path in out_paths],
+        "output_sizes": [os.path.getsize(path) for path in out_paths],
+        "events": [[event_id, h] for event_id, h in zip(event_ids, hashes)],
+    }
+    with open(manifest_path + ".tmp", "w", encoding="utf-8") as f:
+        f.write(json.dumps(manifest, ensure_ascii=False))
+    os.replace(manifest_path + ".tmp", manifest_path)
+    return stats
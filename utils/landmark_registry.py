@@ -0,0 +1,162 @@
+import os
+import re
+import json
+import unicodedata
+from contextlib import contextmanager
+from typing import Optional
+import numpy as np
+import pandas as pd
+import id_allocators as ia
+
+# À incrémenter si la forme des clés change : un registre d'une autre version n'est pas relu
+REGISTRY_VERSION = 1
+
+_spaces = re.compile(r"\s+")
+# Diacritiques retirés après décomposition (NFKD), apostrophes et tirets typographiques remplacés
+_combining = re.compile("[\u0300-\u036f]")
+_CHAR_REPLACEMENTS = str.maketrans({"’": "'", "‘": "'", "ʼ": "'", "‐": "-", "‑": "-", "–": "-", "—": "-"})
+
+def _fold(value) -> str:
+    if value is None or value != value:
+        return ""
+    value = str(value)
+    if not value.isascii():
+        value = _combining.sub("", unicodedata.normalize("NFKD", value.translate(_CHAR_REPLACEMENTS)))
+    return _spaces.sub(" ", value.casefold()).strip()
+
+def landmark_key(label, landmark_type) -> str:
+    """
+    Clé d'un repère dans le registre : type et libellé sans casse ni accents, le type étant retiré du début
+    (ou de la fin, entre parenthèses) du libellé. Ex. ("Rue de Chartres", "rue") et ("rue de chartres", "Rue") -> "rue|de chartres".
+    """
+    type_ = _fold(landmark_type)
+    label = _fold(label)
+    if type_ and label.startswith(type_ + " "):
+        label = label[len(type_) + 1:]
+    elif type_ and label.endswith(f" ({type_})"):
+        label = label[:-len(type_) - 3]
+    return f"{type_}|{label}"
+
+class LandmarkRegistry:
+    """
+    Registre des repères partagé par tous les événements d'une exécution : un repère reçoit un seul identifiant LM_
+    (quel que soit l'événement qui le mentionne) et ses triplets isLandmarkType et label ne sont produits
+    qu'à sa première mention. Les autres événements ne font que référencer son identifiant.
+
+    Les repères sont retrouvés par leur clé normalisée (voir landmark_key). Un repère sans libellé n'est pas enregistré :
+    rien ne permet de le reconnaître d'un événement à l'autre, il garde donc un identifiant propre à son événement.
+    Le registre s'enregistre (save)
+    pour qu'une exécution suivante réutilise les mêmes identifiants ; ce qui a été produit n'est pas enregistré,
+    si bien que chaque exécution produit une fois les triplets de chacun de ses repères.
+
+    Args:
+        id_allocator: Allocateur des nouveaux identifiants (voir id_allocators.py), uuid5 de la clé par défaut.
+    """
+    def __init__(self, id_allocator=None):
+        self.id_allocator = id_allocator or ia.Uuid5IdAllocator()
+        self.ids = {}
+        self.entries = {}
+        self.emitted = set()
+        self._keys = {}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _key(self, label, landmark_type) -> Optional[str]:
+        # Les mêmes libellés reviennent d'un événement à l'autre : leur clé n'est calculée qu'une fois
+        pair = (label, landmark_type)
+        if pair not in self._keys:
+            self._keys[pair] = landmark_key(label, landmark_type) if _fold(label) else None
+        return self._keys[pair]
+
+    def landmark_ids(self, labels, landmark_types) -> np.ndarray:
+        """
+        Identifiant de chaque repère (libellé, type), attribué à la première rencontre de sa clé ;
+        None pour les repères sans libellé, qui ne sont pas enregistrés.
+        """
+        keys = [self._key(label, landmark_type) for label, landmark_type in zip(labels, landmark_types)]
+        new = {}
+        for key, label, landmark_type in zip(keys, labels, landmark_types):
+            if key is not None and key not in self.ids and key not in new:
+                new[key] = (label, landmark_type)
+        if new:
+            new_keys = np.array(list(new), dtype=object)
+            for key, landmark_id in zip(new_keys, self.id_allocator.new_ids("LM", np.full(len(new_keys), "", dtype=object), new_keys)):
+                self.ids[key] = landmark_id
+                self.entries[landmark_id] = new[key]
+        return np.array([None if key is None else self.ids[key] for key in keys], dtype=object)
+
+    def landmark_id(self, label, landmark_type) -> Optional[str]:
+        """
+        Version scalaire de landmark_ids().
+        """
+        return self.landmark_ids([label], [landmark_type])[0]
+
+    def first_mentions(self, landmark_ids) -> np.ndarray:
+        """
+        Masque des premières mentions des repères dont les triplets n'ont pas encore été produits,
+        qui sont alors considérés comme produits.
+        """
+        landmark_ids = pd.Series(np.asarray(landmark_ids, dtype=object))
+        mask = (~landmark_ids.duplicated() & ~landmark_ids.isin(self.emitted)).to_numpy()
+        self.emitted.update(landmark_ids[mask])
+        return mask
+
+    def mark_emitted(self, landmark_id: str) -> bool:
+        """
+        Version scalaire de first_mentions() : True si les triplets du repère restent à produire.
+        """
+        if landmark_id in self.emitted:
+            return False
+        self.emitted.add(landmark_id)
+        return True
+
+    def save(self, path: str) -> None:
+        """
+        Enregistre les repères (clé, identifiant, libellé et type de la première mention) au format JSON.
+        """
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        landmarks = [{"key": key, "id": landmark_id, "label": self.entries[landmark_id][0], "type": self.entries[landmark_id][1]}
+                     for key, landmark_id in self.ids.items()]
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": REGISTRY_VERSION, "landmarks": landmarks}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str, id_allocator=None) -> "LandmarkRegistry":
+        """
+        Relit un registre enregistré, ou retourne un registre vide si le fichier n'existe pas.
+        """
+        registry = cls(id_allocator)
+        if not os.path.exists(path):
+            return registry
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != REGISTRY_VERSION:
+            raise ValueError(f"Version du registre des repères non prise en charge : {data.get('version')} ({path})")
+        for landmark in data["landmarks"]:
+            # Les repères sans libellé (clé "<type>|") ne sont plus enregistrés
+            if not _fold(landmark["label"]):
+                continue
+            registry.ids[landmark["key"]] = landmark["id"]
+            registry.entries[landmark["id"]] = (landmark["label"], landmark["type"])
+        if isinstance(registry.id_allocator, ia.CounterIdAllocator):
+            # Les nouveaux identifiants séquentiels continuent après ceux du registre
+            numbers = [int(landmark_id[3:]) for landmark_id in registry.entries if landmark_id[3:].isdigit()]
+            registry.id_allocator.counters["LM"] = max([registry.id_allocator.counters.get("LM", 0)] + numbers)
+        return registry
+
+@contextmanager
+def registry_file(path: Optional[str], id_allocator=None):
+    """
+    Registre relu depuis `path` puis enregistré à la fin du bloc (None si `path` est None).
+    """
+    if path is None:
+        yield None
+        return
+    registry = LandmarkRegistry.load(path, id_allocator)
+    yield registry
+    registry.save(path)
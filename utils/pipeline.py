@@ -0,0 +1,440 @@
+import os
+import argparse
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+import event_description_generator as edg
+import split_ground_truth as sgt
+import streaming_dataset as sd
+import id_allocators as ia
+import incremental_build as ib
+import landmark_registry as lr
+import validate_ground_truth as vgt
+import triple_file as tf
+import pipeline_report as pr
+
+DATA_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data"))
+VARIANTS = edg.VARIANTS
+MODES = ["memory", "streaming", "incremental"]
+SPLITS = ["train", "val", "test"]
+
+class Stage:
+    """
+    Étape du graphe du pipeline, exécutée par run_stages() dès que les étapes dont elle dépend sont terminées.
+    La fonction est appelée avec les résultats des étapes `inputs`, puis `args` et `kwargs`.
+
+    Args:
+        name (str): Nom de l'étape (ex. "write_complex").
+        function (callable): Fonction exécutée.
+        inputs (list): Étapes dont le résultat est passé en argument : un nom, ou (nom, clé) pour un élément du résultat.
+        after (list): Étapes qui doivent être terminées avant celle-ci (ex. fichier à relire) sans que leur résultat soit utilisé.
+        args (tuple), kwargs (dict): Arguments supplémentaires de la fonction.
+        outputs (list): Fichiers produits, dont la taille est ajoutée au rapport.
+        in_process (bool): Si True, l'étape peut être exécutée dans un processus séparé (fonction et arguments sérialisables).
+        stats (callable): Appelée avec le résultat puis les entrées, retourne des compteurs pour le rapport (ex. {"rows": ...}).
+        reported (bool): Si True, la fonction reçoit aussi le rapport (argument `report`) pour y mesurer ses sous-étapes
+            (ex. "generate_complex") ; dans un processus séparé, elle reçoit un rapport local dont les étapes sont
+            ensuite ajoutées au rapport du pipeline.
+    """
+    def __init__(self, name: str, function, inputs=(), after=(), args=(), kwargs=None, outputs=(), in_process: bool = False, stats=None,
+                 reported: bool = False):
+        self.name = name
+        self.function = function
+        self.inputs = list(inputs)
+        self.after = list(after)
+        self.args = tuple(args)
+        self.kwargs = kwargs or {}
+        self.outputs = list(outputs)
+        self.in_process = in_process
+        self.stats = stats
+        self.reported = reported
+
+    @property
+    def input_names(self):
+        return [name if isinstance(name, str) else name[0] for name in self.inputs]
+
+    @property
+    def dependencies(self):
+        return self.input_names + self.after
+
+    def __repr__(self) -> str:
+        return f"Stage({self.name!r}, dépend de {self.dependencies})"
+
+def _matching(names, targets) -> set:
+    """
+    Noms d'étapes désignés par `targets` (noms complets ou groupes).
+    """
+    selected = set()
+    for target in targets:
+        matches = [name for name in names if name == target or name.startswith(target + "_")]
+        if not matches:
+            raise ValueError(f"Étape inconnue : {target} (étapes disponibles : {', '.join(names)})")
+        selected.update(matches)
+    return selected
+
+def select_stages(stages, targets=None, only: bool = False):
+    """
+    Étapes à exécuter pour obtenir `targets` : les étapes demandées et, sauf avec `only`, toutes celles dont elles dépendent.
+    Un nom de groupe (ex. "write") désigne toutes les étapes de ce groupe (ex. "write_simple", "write_complex").
+
+    Raises:
+        ValueError: Si une cible est inconnue, ou si avec `only` une étape a besoin du résultat d'une étape non sélectionnée.
+    """
+    by_name = {stage.name: stage for stage in stages}
+    if targets is None:
+        return list(stages)
+
+    selected = _matching(by_name, targets)
+
+    if only:
+        for name in selected:
+            missing = [dependency for dependency in by_name[name].input_names if dependency not in selected]
+            if missing:
+                raise ValueError(f"L'étape {name} a besoin du résultat de {', '.join(missing)}")
+    else:
+        todo = list(selected)
+        while todo:
+            for dependency in by_name[todo.pop()].dependencies:
+                if dependency not in selected:
+                    selected.add(dependency)
+                    todo.append(dependency)
+    return [stage for stage in stages if stage.name in selected]
+
+def _call_with_report(profile_stages, profile_dir, function, *args, **kwargs):
+    """
+    Exécute une fonction dans un processus séparé avec un rapport local, et retourne son résultat et les étapes mesurées.
+    """
+    report = pr.PipelineReport(profile_stages=profile_stages, profile_dir=profile_dir)
+    return function(*args, report=report, **kwargs), report.stages
+
+def _run_stage(stage: Stage, values: list, processes, report):
+    """
+    Exécute une étape (dans un thread du pool), éventuellement dans un processus séparé, et la mesure dans le rapport.
+    """
+    with report.stage(stage.name, outputs=stage.outputs) if report else nullcontext({}) as entry:
+        if processes is not None and stage.in_process and stage.reported and report:
+            result, stages = processes.submit(_call_with_report, report.profile_stages, report.profile_dir, stage.function,
+                                              *values, *stage.args, **stage.kwargs).result()
+            report.add_stages(stages)
+        elif processes is not None and stage.in_process:
+            result = processes.submit(stage.function, *values, *stage.args, **stage.kwargs).result()
+        elif stage.reported:
+            result = stage.function(*values, *stage.args, report=report, **stage.kwargs)
+        else:
+            result = stage.function(*values, *stage.args, **stage.kwargs)
+        if stage.stats:
+            entry.update(stage.stats(result, *values))
+    return result
+
+def run_stages(stages, targets=None, only: bool = False, jobs: int = 4, processes: int = 0, report: pr.PipelineReport = None) -> dict:
+    """
+    Exécute un graphe d'étapes : chaque étape est lancée dès que ses dépendances sont terminées,
+    les étapes indépendantes (ex. génération et découpage des trois versions) s'exécutant en même temps
+    sur un pool de `jobs` threads. Les résultats intermédiaires sont libérés dès que plus aucune étape n'en a besoin.
+
+    Args:
+        stages (list): Étapes du pipeline, dans un ordre compatible avec leurs dépendances.
+        targets (list): Étapes ou groupes d'étapes à exécuter (toutes si None), avec leurs dépendances.
+        only (bool): Si True, seules les étapes `targets` sont exécutées : leurs dépendances sont supposées déjà faites
+            (ex. découper des fichiers JSONL existants).
+        jobs (int): Nombre d'étapes exécutées en même temps.
+        processes (int): Si > 0, les étapes `in_process` sont exécutées sur un pool de processus de cette taille
+            (le travail en Python pur n'est alors pas limité par le verrou global de l'interpréteur).
+        report (PipelineReport): Rapport où chaque étape est mesurée (optionnel).
+
+    Returns:
+        dict: Résultat des étapes demandées (celles de `targets`, ou toutes).
+    """
+    selected = select_stages(stages, targets, only)
+    names = {stage.name for stage in selected}
+    kept = names if targets is None else _matching(names, targets)
+    uses = {name: 0 for name in names}
+    for stage in selected:
+        for name in stage.input_names:
+            uses[name] += 1
+
+    results, done, running = {}, set(), {}
+    pending = list(selected)
+    with ThreadPoolExecutor(max_workers=jobs) as threads, (ProcessPoolExecutor(max_workers=processes) if processes else nullcontext()) as pool:
+        while pending or running:
+            for stage in list(pending):
+                if all(dependency in done for dependency in stage.dependencies if dependency in names):
+                    pending.remove(stage)
+                    values = [results[name] if isinstance(name, str) else results[name[0]][name[1]] for name in stage.inputs]
+                    running[threads.submit(_run_stage, stage, values, pool, report)] = stage
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                stage = running.pop(future)
+                results[stage.name] = future.result()
+                done.add(stage.name)
+                for name in stage.input_names:
+                    uses[name] -= 1
+                    if not uses[name] and name not in kept:
+                        del results[name]
+    return {name: result for name, result in results.items() if name in kept}
+
+def describe_and_write(df, jsonl_paths, triple_paths=None, variants=VARIANTS, workers: int = 1, id_allocator=None, batch_size: int = 100_000,
+                       registry_path: str = None, report: pr.PipelineReport = None) -> dict:
+    """
+    Génère, lot par lot, les tables de triplets des versions demandées et les écrit aussitôt dans leurs fichiers JSONL
+    et .triples (voir triple_file.write_event_tables) : seules les tables du lot en cours sont gardées en mémoire.
+    Le pipeline lance une étape par version (write_<version>), si bien que les versions sont produites en même temps.
+    Avec `registry_path`, les repères des descriptions complexes sont ceux du registre enregistré dans ce fichier,
+    qui est mis à jour (voir landmark_registry.py).
+    Avec `report`, la génération y est mesurée à part de l'écriture, dans l'étape "generate"
+    ("generate_<version>" pour une seule version, voir pipeline_report.PipelineReport.timed_iter).
+
+    Returns:
+        dict: Nombre d'événements écrits.
+    """
+    counts = {"events": 0}
+
+    def counted(batches):
+        for tables in batches:
+            counts["events"] += tables[0].n_events
+            yield tables
+
+    with lr.registry_file(registry_path, id_allocator) as registry:
+        batches = edg.iter_event_tables(df, batch_size=batch_size, workers=workers, id_allocator=id_allocator, variants=variants,
+                                        landmark_registry=registry)
+        if report:
+            name = f"generate_{variants[0]}" if len(variants) == 1 else "generate"
+            batches = report.timed_iter(name, batches, count=lambda tables: tables[0].n_events)
+        tf.write_event_tables(counted(batches), jsonl_paths, triple_paths or None)
+    return counts
+
+def build_streaming(in_path: str, jsonl_paths, registry_path: str = None, id_allocator=None, report: pr.PipelineReport = None, **kwargs) -> None:
+    """
+    Construction en streaming (voir streaming_dataset.convert_csv_to_jsonl_streaming), avec le registre des repères
+    enregistré dans `registry_path` s'il est donné. Avec `report`, la lecture et la génération y sont mesurées
+    dans l'étape "generate".
+    """
+    with lr.registry_file(registry_path, id_allocator) as registry:
+        sd.convert_csv_to_jsonl_streaming(in_path, jsonl_paths, id_allocator=id_allocator, landmark_registry=registry, report=report,
+                                          **kwargs)
+
+def convert_triples_if_changed(stats: dict, jsonl_path: str, triple_path: str) -> None:
+    """
+    Reconvertit un fichier JSONL en .triples après une construction incrémentale, s'il a changé ou si le .triples manque.
+    """
+    if stats["regenerated"] or stats["removed"] or not os.path.exists(triple_path):
+        tf.convert_jsonl_to_triple_file(jsonl_path, triple_path)
+
+def assign_splits(jsonl_path: str, ratios=(0.8, 0.1, 0.1), seed: int = 42) -> list:
+    """
+    Répartit les événements d'un fichier JSONL de référence entre entraînement, validation et test
+    (voir split_ground_truth.assign_splits). La même répartition est appliquée à toutes les versions par split_variant().
+    """
+    return sgt.assign_splits(sgt.index_jsonl_records(jsonl_path)[2], *ratios, seed=seed)
+
+def split_variant(subsets: list, jsonl_path: str, output_dir: str) -> None:
+    """
+    Découpe le fichier JSONL d'une version selon la répartition commune (voir split_ground_truth.write_split_files) :
+    un événement est placé dans le même sous-ensemble pour chaque version, d'après son identifiant et non sa position
+    dans le fichier. Un fichier qui ne décrit pas les mêmes événements (ex. version périmée découpée avec --only) est refusé.
+    """
+    sgt.write_split_files(jsonl_path, output_dir, subsets)
+
+def output_paths(output_dir: str, variant: str):
+    """
+    Chemins des fichiers JSONL et .triples d'une version.
+    """
+    base = os.path.join(output_dir, f"{variant}_ground_truth")
+    return base + ".jsonl", base + ".triples"
+
+def split_paths(split_dir: str, variant: str):
+    return [os.path.join(split_dir, f"{variant}_ground_truth_{split}.jsonl") for split in SPLITS]
+
+def build_stages(in_path: str, output_dir: str, split_dir: str = None, variants=VARIANTS, mode: str = "memory", separator: str = "\t",
+                 workers: int = 1, id_mode: str = "uuid5", write_triples: bool = True, batch_size: int = 100_000, chunk_size: int = 100_000,
+                 sorted_input: bool = False, manifest_path: str = None, ratios=(0.8, 0.1, 0.1), seed: int = 42, landmark_registry: str = None,
+                 raw_path: str = None, allow=vgt.DEFAULT_ALLOW):
+    """
+    Construit le graphe des étapes de préparation de la vérité terrain :
+
+        memory :       load → write_<version> (génération et écriture par lots, une étape par version)
+        streaming :    build (lecture par morceaux, génération et écriture des versions en un seul passage)
+        incremental :  build (voir incremental_build.py) → triples_<version>
+
+    puis, dans tous les modes :  split_assign (répartition des événements, d'après le fichier de la première version)
+                                 → split_<version> (une étape par version, dès que son fichier est écrit)
+
+    Les étapes d'une version ne dépendent pas de celles des autres : elles s'exécutent en même temps
+    (`jobs` threads, et `processes` processus pour les étapes qui le permettent, voir run_stages).
+
+    Seules les versions `variants` sont générées en mode memory et streaming ; la construction incrémentale
+    produit toujours les trois fichiers JSONL, dont le manifeste décrit le contenu.
+    `landmark_registry` est le fichier du registre des repères partagé par tous les événements des descriptions complexes
+    (voir landmark_registry.py), en mode memory ou streaming.
+    Avec `raw_path` (vérité terrain brute), une étape validate la valide et la normalise d'abord (voir validate_ground_truth.py) :
+    le fichier nettoyé, ground_truth_clean.csv dans `output_dir`, remplace alors `in_path`. Les lignes signalées pour
+    un motif de `allow` (par défaut validate_ground_truth.DEFAULT_ALLOW) sont conservées au lieu d'être rejetées.
+
+    Returns:
+        list: Les étapes, dans un ordre compatible avec leurs dépendances.
+    """
+    if mode not in MODES:
+        raise ValueError(f"Mode inconnu : {mode} (modes disponibles : {', '.join(MODES)})")
+    unknown = [variant for variant in variants if variant not in VARIANTS]
+    if unknown:
+        raise ValueError(f"Version inconnue : {', '.join(unknown)} (versions disponibles : {', '.join(VARIANTS)})")
+    variants = tuple(variant for variant in VARIANTS if variant in variants)
+    if landmark_registry and mode == "incremental":
+        raise ValueError("Le registre des repères n'est pas compatible avec la construction incrémentale")
+    if landmark_registry and workers > 1:
+        raise ValueError("Le registre des repères ne peut pas être partagé par plusieurs processus : utilisez workers = 1")
+    split_dir = split_dir or output_dir
+    id_allocator = ia.get_id_allocator(id_mode)
+    paths = {variant: output_paths(output_dir, variant) for variant in VARIANTS}
+    jsonl_paths = [paths[variant][0] for variant in variants]
+    triple_paths = [paths[variant][1] for variant in variants] if write_triples else []
+    stages = []
+
+    after = []
+    if raw_path:
+        in_path = os.path.join(output_dir, "ground_truth_clean.csv")
+        stages.append(Stage("validate", vgt.validate_file, args=(raw_path, in_path), kwargs={"separator": separator, "chunksize": chunk_size, "allow": list(allow)},
+                            outputs=[in_path, vgt.rejected_path(in_path)],
+                            stats=lambda stats: {"rows": stats["rows"], "rejected": stats["rejected"]}))
+        after = ["validate"]
+
+    if mode == "memory":
+        stages.append(Stage("load", edg.read_ground_truth, after=after, args=(in_path,), kwargs={"separator": separator},
+                            stats=lambda df: {"rows": len(df)}))
+        for variant in variants:
+            jsonl_path, triple_path = paths[variant]
+            triple_outputs = [triple_path] if write_triples else []
+            # Le registre des repères ne concerne que les descriptions complexes
+            stages.append(Stage(f"write_{variant}", describe_and_write, inputs=["load"], args=([jsonl_path], triple_outputs),
+                                kwargs={"variants": (variant,), "workers": workers, "id_allocator": id_allocator, "batch_size": batch_size,
+                                        "registry_path": landmark_registry if variant == "complex" else None},
+                                outputs=[jsonl_path] + triple_outputs, in_process=True, reported=True,
+                                stats=lambda counts, df: {"rows": len(df), **counts}))
+    elif mode == "streaming":
+        stages.append(Stage("build", build_streaming, after=after, args=(in_path, jsonl_paths),
+                            kwargs={"separator": separator, "chunksize": chunk_size, "assume_sorted": sorted_input, "workers": workers,
+                                    "id_allocator": id_allocator, "triple_paths": triple_paths or None, "variants": variants,
+                                    "registry_path": landmark_registry},
+                            outputs=jsonl_paths + triple_paths, reported=True))
+    else:
+        all_jsonl_paths = [paths[variant][0] for variant in VARIANTS]
+        manifest_path = manifest_path or os.path.join(output_dir, "ground_truth_manifest.json")
+        stages.append(Stage("build", ib.build_incremental, after=after, args=(in_path, all_jsonl_paths, manifest_path),
+                            kwargs={"separator": separator, "workers": workers, "id_allocator": id_allocator},
+                            outputs=all_jsonl_paths, stats=lambda stats: dict(stats)))
+        if write_triples:
+            for variant in variants:
+                stages.append(Stage(f"triples_{variant}", convert_triples_if_changed, inputs=["build"], args=paths[variant],
+                                    outputs=[paths[variant][1]], in_process=True))
+
+    writers = {variant: f"write_{variant}" if mode == "memory" else "build" for variant in variants}
+    stages.append(Stage("split_assign", assign_splits, after=[writers[variants[0]]], args=(jsonl_paths[0], tuple(ratios), seed),
+                        stats=lambda subsets: {"events": sum(len(subset) for subset in subsets)}))
+    for variant in variants:
+        stages.append(Stage(f"split_{variant}", split_variant, inputs=["split_assign"], after=[writers[variant]],
+                            args=(paths[variant][0], split_dir), outputs=split_paths(split_dir, variant), in_process=True))
+    return stages
+
+def run_pipeline(in_path: str = os.path.join(DATA_DIR, "ground_truth.csv"), output_dir: str = DATA_DIR, split_dir: str = None,
+                 variants=VARIANTS, stages=None, only: bool = False, mode: str = "memory", jobs: int = 4, processes: int = 0,
+                 report_path: str = None, profile_stages=(), profile_dir: str = None, **options) -> pr.PipelineReport:
+    """
+    Construit et exécute le graphe des étapes (voir build_stages et run_stages), puis écrit le rapport d'exécution.
+
+    Args:
+        in_path (str): Fichier CSV de la vérité terrain.
+        output_dir (str): Dossier des fichiers JSONL et .triples.
+        split_dir (str): Dossier des sous-ensembles entraînement / validation / test (output_dir par défaut).
+        variants (list): Versions à produire parmi "simple", "bert_simple" et "complex".
+        stages (list): Étapes ou groupes d'étapes à exécuter ("validate", "load", "write", "build", "triples", "split"
+            ou un nom complet comme "write_bert_simple"), avec leurs dépendances ; toutes si None.
+        only (bool): N'exécuter que `stages`, sans leurs dépendances.
+        mode (str): "memory", "streaming" ou "incremental".
+        jobs (int): Nombre d'étapes exécutées en même temps (threads).
+        processes (int): Taille du pool de processus des étapes de génération, de conversion .triples et de découpage
+            de chaque version (0 : threads uniquement).
+        report_path (str): Fichier du rapport d'exécution (JSON), aucun si None.
+        profile_stages (list): Étapes profilées avec cProfile (ex. ["write_complex"]).
+        profile_dir (str): Dossier des profils complets.
+        **options: Autres paramètres de build_stages (separator, workers, id_mode, write_triples, batch_size, chunk_size,
+            sorted_input, manifest_path, ratios, seed, landmark_registry, raw_path, allow).
+
+    Returns:
+        PipelineReport: Mesures de l'exécution.
+    """
+    report = pr.PipelineReport(profile_stages=profile_stages, profile_dir=profile_dir,
+                               settings={"in_path": in_path, "output_dir": output_dir, "variants": list(variants), "stages": stages,
+                                         "mode": mode, "jobs": jobs, "processes": processes, **options})
+    graph = build_stages(in_path, output_dir, split_dir, variants, mode, **options)
+    run_stages(graph, stages, only=only, jobs=jobs, processes=processes, report=report)
+    if report_path:
+        report.write(report_path)
+    return report
+
+def make_parser(defaults: dict = None) -> argparse.ArgumentParser:
+    """
+    Interface en ligne de commande du pipeline ; `defaults` remplace les valeurs par défaut (voir prepare_dataset.py).
+    """
+    parser = argparse.ArgumentParser(description="Prépare la vérité terrain : descriptions d'événements (JSONL, .triples) "
+                                                 "et découpage entraînement / validation / test.")
+    parser.add_argument("--input", dest="in_path", default=os.path.join(DATA_DIR, "ground_truth.csv"), help="Fichier CSV de la vérité terrain")
+    parser.add_argument("--output-dir", default=DATA_DIR, help="Dossier des fichiers JSONL et .triples")
+    parser.add_argument("--split-dir", default=None, help="Dossier des sous-ensembles (par défaut : --output-dir)")
+    parser.add_argument("--variants", nargs="+", default=list(VARIANTS), choices=VARIANTS, help="Versions à produire")
+    parser.add_argument("--stages", nargs="+", default=None,
+                        help="Étapes ou groupes à exécuter avec leurs dépendances (validate, load, write, build, triples, split, "
+                             "ou un nom complet comme write_bert_simple)")
+    parser.add_argument("--only", action="store_true", help="N'exécuter que les étapes de --stages, sans leurs dépendances")
+    parser.add_argument("--mode", default="memory", choices=MODES,
+                        help="memory : tout en mémoire ; streaming : lecture par morceaux ; incremental : seuls les événements modifiés")
+    parser.add_argument("--jobs", type=int, default=4, help="Nombre d'étapes exécutées en même temps")
+    parser.add_argument("--processes", type=int, default=0, help="Pool de processus pour la génération, la conversion .triples et le découpage "
+                             "de chaque version (0 : threads)")
+    parser.add_argument("--workers", type=int, default=1, help="Processus de travail pour la génération des descriptions")
+    parser.add_argument("--id-mode", default="uuid5", choices=["uuid5", "counter", "random"], help="Identifiants des descriptions complexes")
+    parser.add_argument("--no-triples", dest="write_triples", action="store_false", help="Ne pas écrire les fichiers .triples")
+    parser.add_argument("--separator", default="\t", help="Séparateur du fichier CSV")
+    parser.add_argument("--batch-size", type=int, default=100_000, help="Lignes par lot de génération")
+    parser.add_argument("--chunk-size", type=int, default=100_000, help="Lignes lues à la fois (mode streaming)")
+    parser.add_argument("--sorted-input", action="store_true", help="Le fichier est trié par event_id (mode streaming)")
+    parser.add_argument("--manifest", dest="manifest_path", default=None, help="Manifeste de la construction incrémentale")
+    parser.add_argument("--landmark-registry", default=None,
+                        help="Registre des repères (JSON) : un seul identifiant par repère pour toute l'exécution, conservé d'une exécution à l'autre")
+    parser.add_argument("--raw", dest="raw_path", default=None,
+                        help="Vérité terrain brute (ex. ground_truth_raw.csv) à valider d'abord : le fichier nettoyé remplace --input")
+    parser.add_argument("--allow", nargs="*", default=list(vgt.DEFAULT_ALLOW), choices=vgt.REASONS,
+                        help="Motifs de rejet de la validation (--raw) pour lesquels la ligne est conservée "
+                             f"(par défaut : {' '.join(vgt.DEFAULT_ALLOW)} ; sans motif : validation stricte)")
+    parser.add_argument("--ratios", nargs=3, type=float, default=[0.8, 0.1, 0.1], metavar=("TRAIN", "VAL", "TEST"))
+    parser.add_argument("--seed", type=int, default=42, help="Graine du découpage")
+    parser.add_argument("--report", dest="report_path", default=None,
+                        help="Rapport d'exécution (JSON), par défaut dans --output-dir ; chaîne vide pour ne pas l'écrire")
+    parser.add_argument("--profile", dest="profile_stages", nargs="*", default=[], help="Étapes à profiler avec cProfile (ex. write_complex)")
+    parser.add_argument("--profile-dir", default=None, help="Dossier des profils complets (par défaut : --output-dir/profiles)")
+    parser.add_argument("--list", action="store_true", help="Afficher les étapes sélectionnées et leurs dépendances, sans les exécuter")
+    if defaults:
+        parser.set_defaults(**defaults)
+    return parser
+
+def main(argv=None, defaults: dict = None) -> None:
+    parser = make_parser(defaults)
+    args = vars(parser.parse_args(argv))
+    if args["report_path"] is None:
+        args["report_path"] = os.path.join(args["output_dir"], "prepare_dataset_report.json")
+    args["profile_dir"] = args["profile_dir"] or os.path.join(args["output_dir"], "profiles")
+
+    try:
+        if args.pop("list"):
+            options = {key: args[key] for key in ["separator", "workers", "id_mode", "write_triples", "batch_size", "chunk_size",
+                                                  "sorted_input", "manifest_path", "ratios", "seed", "landmark_registry", "raw_path",
+                                                  "allow"]}
+            graph = build_stages(args["in_path"], args["output_dir"], args["split_dir"], args["variants"], args["mode"], **options)
+            for stage in select_stages(graph, args["stages"], args["only"]):
+                print(f"{stage.name:<20} ← {', '.join(stage.dependencies) or '-'}")
+            return
+        report = run_pipeline(**args)
+    except ValueError as error:
+        parser.error(str(error))
+    print(report.summary())
+
+if __name__ == "__main__":
+    main()
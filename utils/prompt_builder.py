@@ -0,0 +1,342 @@
+import os
+import json
+import math
+import argparse
+from itertools import islice
+from typing import Dict, List, Optional
+import numpy as np
+import file_management as fm
+import evaluation as ev
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data")
+DEFAULT_TRAIN_PATH = os.path.join(DATA_DIR, "simple_ground_truth_train.jsonl")
+DEFAULT_K = 5
+DEFAULT_TOKEN_BUDGET = 2_000
+# N-grammes présents dans plus de cette part des phrases d'entraînement (ex. « || ») ignorés : ils ne départagent rien
+DEFAULT_MAX_DF = 0.5
+# Nombre de candidats examinés par exemple demandé, pour pouvoir écarter ceux qui dépassent le budget de tokens
+CANDIDATES_PER_EXAMPLE = 4
+# Taille maximale (en nombre de scores) de la matrice requêtes x exemples calculée à la fois par search_batch
+BATCH_SCORES = 4_000_000
+# Nombre maximal d'entrées des listes inversées lues par requête : les n-grammes les plus rares d'abord,
+# les plus fréquents (faible poids, présents dans beaucoup d'exemples) sont ignorés au-delà
+MAX_POSTINGS = 20_000
+
+DEFAULT_INSTRUCTIONS = (
+    "Extrais de la phrase les triplets (sujet, relation, objet) qui décrivent l'évolution des repères "
+    "(voies, lieux, communes) : types de repères, changements de nom ou de géométrie, apparitions, disparitions "
+    "et dates de ces changements. Réponds uniquement par un objet JSON de la forme "
+    "{\"sentence\": \"...\", \"triples\": [[\"sujet\", \"relation\", \"objet\"], ...]}, comme dans les exemples."
+)
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimation du nombre de tokens d'un texte pour un tokenizer BPE (environ 4 caractères par token en français).
+    """
+    return math.ceil(len(text) / 4)
+
+def format_example(event: Dict[str, any]) -> str:
+    """
+    Exemple au format attendu du LLM : {"sentence": ..., "triples": [[sub, rel, obj], ...]}.
+    """
+    triples = [list(ev._triple_fields(triple)) for triple in event.get("triples", [])]
+    return json.dumps({"sentence": event.get("sent", ""), "triples": triples}, ensure_ascii=False)
+
+def build_prompt(event: Dict[str, any], examples: List[Dict[str, any]], instructions: str = DEFAULT_INSTRUCTIONS) -> str:
+    """
+    Prompt d'un événement : consigne, exemples (les plus proches en dernier, juste avant la phrase) et phrase à traiter.
+    """
+    parts = [instructions, ""]
+    for example in reversed(examples):
+        parts.append(format_example(example))
+    parts.extend(["", json.dumps({"sentence": event.get("sent", "")}, ensure_ascii=False)])
+    return "\n".join(parts)
+
+def _sentence_ngrams(sentence, n: int) -> set:
+    return ev.ngrams(ev.normalize_label(sentence, strip_accents=True), n)
+
+class FewShotIndex:
+    """
+    Index TF-IDF des phrases d'entraînement (n-grammes de caractères, après normalisation) pour choisir
+    les exemples d'un prompt : les plus proches (similarité cosinus) de la phrase à traiter.
+
+    L'index est une liste inversée (n-gramme -> exemples qui le contiennent, avec leur poids) : le score d'une phrase
+    contre tous les exemples s'obtient en additionnant les listes de ses n-grammes (np.bincount), sans parcourir
+    les exemples qui ne partagent rien avec elle. L'index se construit une fois et s'enregistre (voir save et load).
+
+    Args:
+        examples (list): Descriptions d'entraînement ({"id", "sent", "triples"}).
+        n (int): Taille des n-grammes de caractères.
+        max_df (float): Part maximale des phrases contenant un n-gramme pour qu'il soit retenu.
+        count_tokens: Fonction estimant le nombre de tokens d'un exemple formaté (voir estimate_tokens).
+    """
+    def __init__(self, examples, n: int = ev.NGRAM_SIZE, max_df: float = DEFAULT_MAX_DF, count_tokens=estimate_tokens):
+        self.n = n
+        self.max_postings = MAX_POSTINGS
+        self.examples = [format_example(example) for example in examples]
+        self.ids = [str(example.get("id")) for example in examples]
+        self.tokens = np.array([count_tokens(example) for example in self.examples], dtype=np.int32)
+        if not len(self.examples):
+            raise ValueError("Aucun exemple d'entraînement")
+
+        grams = [_sentence_ngrams(example.get("sent", ""), n) for example in examples]
+        vocabulary = {}
+        rows, terms = [], []
+        for row, example_grams in enumerate(grams):
+            for gram in example_grams:
+                terms.append(vocabulary.setdefault(gram, len(vocabulary)))
+            rows.append(np.full(len(example_grams), row, dtype=np.int32))
+        terms = np.array(terms, dtype=np.int64)
+        rows = np.concatenate(rows) if rows else np.zeros(0, dtype=np.int32)
+
+        n_docs = len(self.examples)
+        df = np.bincount(terms, minlength=len(vocabulary))
+        idf = (np.log((1 + n_docs) / (1 + df)) + 1).astype(np.float32)
+        kept = df <= max(1, max_df * n_docs)
+
+        # Poids des n-grammes retenus, normalisés (norme 1) exemple par exemple
+        mask = kept[terms]
+        terms, rows = terms[mask], rows[mask]
+        weights = idf[terms] ** 2
+        norms = np.sqrt(np.bincount(rows, weights=weights, minlength=n_docs))
+        weights = (idf[terms] / np.where(norms > 0, norms, 1)[rows]).astype(np.float32)
+
+        # Liste inversée : exemples de chaque n-gramme, au format CSR (indptr, doc_ids, weights),
+        # et n-grammes de chaque exemple (doc_indptr, doc_terms, doc_weights) pour recalculer les scores exacts
+        remap = np.full(len(vocabulary), -1, dtype=np.int64)
+        remap[kept] = np.arange(kept.sum())
+        grams_list = np.array(list(vocabulary), dtype=object)[kept]
+        self.vocabulary = {gram: term for term, gram in enumerate(grams_list.tolist())}
+        self.idf = idf[kept]
+        terms = remap[terms]
+        self.doc_terms, self.doc_weights = terms.astype(np.int32), weights
+        self.doc_indptr = np.concatenate([[0], np.cumsum(np.bincount(rows, minlength=n_docs))]).astype(np.int64)
+        order = np.argsort(terms, kind="stable")
+        self.doc_ids = rows[order].astype(np.int32)
+        self.weights = weights[order]
+        self.indptr = np.concatenate([[0], np.cumsum(np.bincount(terms, minlength=len(self.vocabulary)))]).astype(np.int64)
+        self.source = None
+
+    @classmethod
+    def from_jsonl(cls, path: str = DEFAULT_TRAIN_PATH, **kwargs) -> "FewShotIndex":
+        index = cls(fm.read_jsonl(path), **kwargs)
+        index.source = _source_signature(path)
+        return index
+
+    def __len__(self):
+        return len(self.examples)
+
+    def _query(self, sentence):
+        # N-grammes connus de la phrase, par ordre croissant de fréquence, et leurs poids
+        # (la norme de la requête ne change pas le classement)
+        terms = np.array([self.vocabulary[gram] for gram in _sentence_ngrams(sentence, self.n) if gram in self.vocabulary], dtype=np.int64)
+        terms = terms[np.argsort(self.indptr[terms + 1] - self.indptr[terms], kind="stable")]
+        return terms, self.idf[terms]
+
+    def search(self, sentence, k: int = DEFAULT_K):
+        """
+        Les `k` exemples les plus proches d'une phrase.
+
+        Returns:
+            tuple: Indices des exemples et scores, du plus proche au moins proche.
+        """
+        indices, scores = self.search_batch([sentence], k)
+        return indices[0], scores[0]
+
+    def search_batch(self, sentences, k: int = DEFAULT_K):
+        """
+        Les `k` exemples les plus proches de chaque phrase d'une liste, calculés par blocs de requêtes
+        (une matrice requêtes x exemples d'au plus BATCH_SCORES valeurs) en quelques opérations par bloc.
+
+        Les scores sont accumulés à partir des listes inversées des n-grammes de chaque requête, des plus rares
+        aux plus fréquents, dans la limite de max_postings entrées par requête. Quand cette limite est atteinte,
+        les k * CANDIDATES_PER_EXAMPLE meilleurs candidats sont rescorés exactement avec tous les n-grammes de la requête.
+
+        Returns:
+            tuple: Tableaux (nombre de phrases, k) des indices et des scores.
+        """
+        sentences = list(sentences)
+        n_docs = len(self.examples)
+        k = min(k, n_docs)
+        pool = min(n_docs, k * CANDIDATES_PER_EXAMPLE)
+        chunk = max(1, BATCH_SCORES // n_docs)
+        indices = np.zeros((len(sentences), k), dtype=np.int64)
+        scores = np.zeros((len(sentences), k), dtype=np.float64)
+        for first in range(0, len(sentences), chunk):
+            queries = [self._query(sentence) for sentence in sentences[first:first + chunk]]
+            kept = [self._within_postings(terms) for terms, _ in queries]
+            terms = _concatenate([q[0][:n] for q, n in zip(queries, kept)], np.int64)
+            query_weights = _concatenate([q[1][:n] for q, n in zip(queries, kept)], np.float32)
+            query_rows = np.repeat(np.arange(len(queries)), kept)
+
+            positions, lengths = _expand(self.indptr, terms)
+            cells = np.repeat(query_rows, lengths) * n_docs + self.doc_ids[positions]
+            matrix = np.bincount(cells, weights=self.weights[positions] * np.repeat(query_weights, lengths),
+                                 minlength=len(queries) * n_docs).reshape(len(queries), n_docs)
+            if all(n == len(q[0]) for q, n in zip(queries, kept)):
+                rows = slice(first, first + len(queries))
+                indices[rows], scores[rows] = _top_k(matrix, k)
+            else:
+                candidates, _ = _top_k(matrix, pool)
+                exact = self._rescore(queries, candidates)
+                order, top = _top_k(exact, k)
+                indices[first:first + len(queries)] = np.take_along_axis(candidates, order, axis=1)
+                scores[first:first + len(queries)] = top
+        return indices, scores
+
+    def _within_postings(self, terms) -> int:
+        # Nombre de n-grammes (les plus rares d'abord) dont les listes inversées totalisent au plus max_postings entrées
+        lengths = np.cumsum(self.indptr[terms + 1] - self.indptr[terms])
+        return max(min(1, len(terms)), int(np.searchsorted(lengths, self.max_postings, side="right")))
+
+    def _rescore(self, queries, candidates: np.ndarray) -> np.ndarray:
+        """
+        Scores exacts (tous les n-grammes de chaque requête) des candidats (tableau requêtes x candidats).
+        """
+        n_terms = len(self.vocabulary)
+        query_keys = _concatenate([row * n_terms + terms for row, (terms, _) in enumerate(queries)], np.int64)
+        query_weights = _concatenate([weights for _, weights in queries], np.float32)
+        order = np.argsort(query_keys)
+        query_keys, query_weights = query_keys[order], query_weights[order]
+
+        positions, lengths = _expand(self.doc_indptr, candidates.ravel())
+        cells = np.repeat(np.arange(candidates.size), lengths)
+        keys = cells // candidates.shape[1] * n_terms + self.doc_terms[positions]
+        found = np.minimum(np.searchsorted(query_keys, keys), max(len(query_keys) - 1, 0))
+        weights = np.where(query_keys[found] == keys, query_weights[found], 0) if len(query_keys) else np.zeros(len(keys))
+        return np.bincount(cells, weights=self.doc_weights[positions] * weights, minlength=candidates.size).reshape(candidates.shape)
+
+    def _within_budget(self, candidates, k: int, token_budget: Optional[int]) -> List[int]:
+        chosen, used = [], 0
+        for candidate in candidates:
+            tokens = int(self.tokens[candidate])
+            if token_budget is None or used + tokens <= token_budget:
+                chosen.append(int(candidate))
+                used += tokens
+                if len(chosen) == k:
+                    break
+        return chosen
+
+    def select(self, sentence, k: int = DEFAULT_K, token_budget: Optional[int] = DEFAULT_TOKEN_BUDGET) -> List[Dict[str, any]]:
+        """
+        Exemples d'un prompt : les plus proches de la phrase, au plus `k`, dont le total (estimé) ne dépasse pas
+        `token_budget` tokens. Un exemple trop long pour le budget restant est remplacé par le suivant.
+        """
+        candidates, _ = self.search(sentence, k * CANDIDATES_PER_EXAMPLE)
+        return [self.example(i) for i in self._within_budget(candidates, k, token_budget)]
+
+    def select_batch(self, sentences, k: int = DEFAULT_K, token_budget: Optional[int] = DEFAULT_TOKEN_BUDGET) -> List[List[Dict[str, any]]]:
+        """
+        Comme select(), pour toute une liste de phrases (voir search_batch).
+        """
+        candidates, _ = self.search_batch(sentences, k * CANDIDATES_PER_EXAMPLE)
+        return [[self.example(i) for i in self._within_budget(row, k, token_budget)] for row in candidates]
+
+    def example(self, index: int) -> Dict[str, any]:
+        """
+        Exemple d'entraînement n° `index` : {"id", "sent", "triples": [[sub, rel, obj], ...]}.
+        """
+        example = json.loads(self.examples[index])
+        return {"id": self.ids[index], "sent": example["sentence"], "triples": example["triples"]}
+
+    def save(self, path: str) -> None:
+        """
+        Enregistre l'index dans un fichier .npz (tableaux NumPy, sans pickle), exemples compris.
+        """
+        blob = "\n".join(self.examples).encode("utf-8")
+        meta = {"n": self.n, "ids": self.ids, "source": self.source}
+        with open(path, "wb") as f:
+            np.savez(f, vocabulary=np.array(list(self.vocabulary), dtype=f"<U{self.n}"), idf=self.idf, indptr=self.indptr,
+                     doc_ids=self.doc_ids, weights=self.weights, doc_indptr=self.doc_indptr, doc_terms=self.doc_terms,
+                     doc_weights=self.doc_weights, tokens=self.tokens,
+                     examples=np.frombuffer(blob, dtype=np.uint8), meta=np.array(json.dumps(meta, ensure_ascii=False)))
+
+    @classmethod
+    def load(cls, path: str) -> "FewShotIndex":
+        with np.load(path, allow_pickle=False) as data:
+            index = cls.__new__(cls)
+            meta = json.loads(str(data["meta"]))
+            index.n, index.ids, index.source = meta["n"], meta["ids"], meta["source"]
+            index.max_postings = MAX_POSTINGS
+            index.vocabulary = {gram: term for term, gram in enumerate(data["vocabulary"].tolist())}
+            for name in ["idf", "indptr", "doc_ids", "weights", "doc_indptr", "doc_terms", "doc_weights", "tokens"]:
+                setattr(index, name, data[name])
+            index.examples = data["examples"].tobytes().decode("utf-8").split("\n")
+        return index
+
+def _top_k(matrix: np.ndarray, k: int):
+    """
+    Indices et valeurs des `k` plus grandes valeurs de chaque ligne, par ordre décroissant.
+    """
+    k = min(k, matrix.shape[1])
+    part = np.argpartition(matrix, matrix.shape[1] - k, axis=1)[:, matrix.shape[1] - k:]
+    values = np.take_along_axis(matrix, part, axis=1)
+    order = np.argsort(-values, axis=1, kind="stable")
+    return np.take_along_axis(part, order, axis=1), np.take_along_axis(values, order, axis=1)
+
+def _expand(indptr: np.ndarray, rows: np.ndarray):
+    """
+    Positions des éléments des lignes `rows` d'une structure CSR (indptr), mises bout à bout, et longueur de chaque ligne.
+    """
+    starts, lengths = indptr[rows], indptr[rows + 1] - indptr[rows]
+    offsets = np.cumsum(lengths) - lengths
+    return np.arange(lengths.sum()) - np.repeat(offsets - starts, lengths), lengths
+
+def _concatenate(arrays, dtype) -> np.ndarray:
+    return np.concatenate(arrays).astype(dtype, copy=False) if arrays else np.zeros(0, dtype=dtype)
+
+def _source_signature(path: str) -> Dict[str, any]:
+    stat = os.stat(path)
+    return {"path": os.path.abspath(path), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+def index_path(train_path: str) -> str:
+    """
+    Fichier de l'index d'un fichier d'entraînement : simple_ground_truth_train.jsonl -> simple_ground_truth_train.fewshot.npz.
+    """
+    return os.path.splitext(train_path)[0] + ".fewshot.npz"
+
+def load_or_build_index(train_path: str = DEFAULT_TRAIN_PATH, path: Optional[str] = None, **kwargs) -> FewShotIndex:
+    """
+    Charge l'index enregistré d'un fichier d'entraînement, ou le construit (et l'enregistre) s'il n'existe pas
+    ou si le fichier d'entraînement a changé depuis (taille ou date de modification).
+    """
+    path = path or index_path(train_path)
+    if os.path.exists(path):
+        index = FewShotIndex.load(path)
+        if index.source == _source_signature(train_path):
+            return index
+    index = FewShotIndex.from_jsonl(train_path, **kwargs)
+    index.save(path)
+    return index
+
+def iter_prompts(events, index: FewShotIndex, k: int = DEFAULT_K, token_budget: Optional[int] = DEFAULT_TOKEN_BUDGET,
+                 instructions: str = DEFAULT_INSTRUCTIONS, batch_size: int = 1_000):
+    """
+    Prompts d'un ensemble d'événements ({"id", "prompt", "examples": identifiants des exemples}),
+    les exemples étant choisis par lots de `batch_size` événements (voir FewShotIndex.select_batch).
+    """
+    events = iter(events)
+    while True:
+        batch = list(islice(events, batch_size))
+        if not batch:
+            break
+        for event, examples in zip(batch, index.select_batch([event.get("sent", "") for event in batch], k, token_budget)):
+            yield {"id": event.get("id"), "prompt": build_prompt(event, examples, instructions),
+                   "examples": [example["id"] for example in examples]}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Construit les prompts few-shot d'un ensemble de test à partir des exemples d'entraînement les plus proches.")
+    parser.add_argument("test", nargs="?", default=None, help="Fichier JSONL des événements à traiter (ex. simple_ground_truth_test.jsonl)")
+    parser.add_argument("--train", default=DEFAULT_TRAIN_PATH, help="Fichier JSONL des exemples d'entraînement")
+    parser.add_argument("--index", default=None, help="Fichier de l'index (par défaut : <train>.fewshot.npz), reconstruit si le fichier d'entraînement a changé")
+    parser.add_argument("--k", type=int, default=DEFAULT_K, help="Nombre d'exemples par prompt")
+    parser.add_argument("--token-budget", type=int, default=DEFAULT_TOKEN_BUDGET, help="Nombre maximal (estimé) de tokens des exemples d'un prompt")
+    parser.add_argument("--output", default=None, help="Fichier JSONL des prompts (par défaut : <test>_prompts.jsonl)")
+    args = parser.parse_args()
+
+    few_shot_index = load_or_build_index(args.train, args.index)
+    print(f"Index : {len(few_shot_index)} exemples, {len(few_shot_index.vocabulary)} n-grammes")
+    if args.test:
+        output = args.output or os.path.splitext(args.test)[0] + "_prompts.jsonl"
+        fm.write_jsonl(iter_prompts(fm.iter_jsonl(args.test), few_shot_index, args.k, args.token_budget), output)
+        print(f"Prompts : {output}")
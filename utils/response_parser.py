@@ -0,0 +1,230 @@
+import os
+import re
+import json
+import time
+import argparse
+from collections import Counter
+from typing import Dict, List, Optional
+import file_management as fm
+import auxiliary_functions as af
+
+# Noms acceptés pour les champs d'un triplet au format dictionnaire
+FIELD_ALIASES = {"sub": "sub", "subject": "sub", "rel": "rel", "relation": "rel", "predicate": "rel",
+                 "obj": "obj", "object": "obj"}
+FIELDS = ("sub", "rel", "obj")
+STAT_KEYS = ["responses", "clean", "repaired", "empty", "triples", "list_triples", "dict_triples", "duplicates",
+             "invalid_items", "prose", "truncated", "unterminated_strings", "unbalanced"]
+
+# Lexèmes : chaîne (éventuellement non terminée), ponctuation JSON, ou tout autre texte (nombres, mots-clés, prose)
+_TOKEN = re.compile(r'"((?:[^"\\]|\\.?)*)("?)|([\[\]{}:,])|([^"\[\]{}:,]+)', re.S)
+_SCALARS = {"null": None, "true": "true", "false": "false"}
+
+def _decode_string(raw: str) -> str:
+    if "\\" not in raw:
+        return raw
+    try:
+        return json.loads(f'"{raw}"')
+    except ValueError:
+        return raw
+
+class _Container:
+    """
+    Tableau ou objet JSON en cours de lecture : valeurs simples d'un tableau, ou champs d'un objet.
+    """
+    __slots__ = ("array", "items", "fields", "key", "last", "nested")
+
+    def __init__(self, array: bool):
+        self.array = array
+        self.items = []
+        self.fields = {}
+        self.key = None
+        self.last = None
+        self.nested = False
+
+    def add(self, value) -> None:
+        if self.array:
+            self.items.append(value)
+        elif self.key is not None:
+            self.fields[self.key] = value
+            self.key = None
+        else:
+            self.last = value
+
+class TripleStreamParser:
+    """
+    Lecteur incrémental et tolérant de la sortie d'un LLM : extrait les triplets [sub, rel, obj] ou
+    {"sub", "rel", "obj"} d'un texte reçu par morceaux (feed), quel que soit leur niveau d'imbrication,
+    sans jamais relire le texte déjà traité : seul un lexème coupé en fin de morceau est conservé pour le suivant.
+
+    Le texte n'a pas besoin d'être un JSON valide : la prose autour du JSON (ou les balises ```json) est ignorée,
+    les fermetures en trop ou mal appariées sont corrigées, et à la fin (close) les tableaux et objets restés ouverts
+    par une réponse tronquée sont récupérés s'ils contiennent déjà un triplet complet.
+    Les réparations sont comptées dans `stats`.
+    """
+    def __init__(self, stats: Optional[Counter] = None):
+        self.stats = stats if stats is not None else Counter()
+        self.stack = []
+        self.pending = ""
+        self.sentence = None
+        self.flags = set()
+
+    def feed(self, chunk: str) -> List[Dict[str, str]]:
+        """
+        Lit un morceau de texte et retourne les triplets qu'il complète.
+        """
+        text = self.pending + chunk
+        self.pending = ""
+        return self._scan(text, final=False)
+
+    def close(self) -> List[Dict[str, str]]:
+        """
+        Termine la lecture : retourne les derniers triplets, dont ceux des tableaux et objets restés ouverts.
+        """
+        triples = self._scan(self.pending, final=True) if self.pending else []
+        self.pending = ""
+        if self.stack:
+            self.flags.add("truncated")
+        while self.stack:
+            self._finish(self.stack.pop(), triples)
+        return triples
+
+    def _scan(self, text: str, final: bool) -> List[Dict[str, str]]:
+        triples = []
+        stack = self.stack
+        for match in _TOKEN.finditer(text):
+            raw, quote, punctuation, other = match.groups()
+            if punctuation is None and match.end() == len(text) and not final and (other is not None or not quote):
+                # Lexème peut-être coupé par la fin du morceau : relu avec le morceau suivant
+                self.pending = text[match.start():]
+                break
+            if raw is not None:
+                if not quote:
+                    self.flags.add("unterminated_strings")
+                    continue
+                if stack:
+                    stack[-1].add(_decode_string(raw))
+                continue
+            if other is not None:
+                if not stack:
+                    if not other.isspace():
+                        self.flags.add("prose")
+                    continue
+                value = other.strip()
+                if value:
+                    stack[-1].add(_SCALARS.get(value, value))
+                continue
+            if punctuation in "[{":
+                if stack:
+                    stack[-1].nested = True
+                    stack[-1].key = None
+                stack.append(_Container(punctuation == "["))
+            elif punctuation in "]}":
+                array = punctuation == "]"
+                if not stack or not any(container.array == array for container in stack):
+                    self.flags.add("unbalanced")
+                    continue
+                while stack[-1].array != array:
+                    self.flags.add("unbalanced")
+                    self._finish(stack.pop(), triples)
+                self._finish(stack.pop(), triples)
+            elif punctuation == ",":
+                if stack and not stack[-1].array:
+                    stack[-1].key = stack[-1].last = None
+            elif punctuation == ":":
+                if stack and not stack[-1].array and stack[-1].last is not None:
+                    stack[-1].key, stack[-1].last = stack[-1].last, None
+        return triples
+
+    def _finish(self, container: _Container, triples: List[Dict[str, str]]) -> None:
+        if container.array:
+            if container.nested or not container.items:
+                return
+            values = container.items[:3]
+            shape = "list_triples"
+        else:
+            fields = {FIELD_ALIASES[key.lower()]: value for key, value in container.fields.items()
+                      if isinstance(key, str) and key.lower() in FIELD_ALIASES}
+            if "sentence" in container.fields and self.sentence is None and isinstance(container.fields["sentence"], str):
+                self.sentence = container.fields["sentence"]
+            if not fields:
+                return
+            values = [fields.get(field) for field in FIELDS]
+            shape = "dict_triples"
+        values = [value.strip() if isinstance(value, str) else value for value in values]
+        if len(values) < 3 or not all(values):
+            self.stats["invalid_items"] += 1
+            return
+        self.stats[shape] += 1
+        triples.append(af.create_dict_triple(*values))
+
+def parse_response(text: str, stats: Optional[Counter] = None) -> Dict[str, any]:
+    """
+    Triplets (format {"sub", "rel", "obj"}, sans doublons) et phrase éventuelle d'une réponse complète.
+    """
+    stats = stats if stats is not None else Counter()
+    parser = TripleStreamParser(stats)
+    triples = parser.feed(text or "") + parser.close()
+    unique = af.deduplicate_triples(triples)
+    stats["responses"] += 1
+    stats["triples"] += len(unique)
+    stats["duplicates"] += len(triples) - len(unique)
+    stats["repaired" if parser.flags else "clean"] += 1
+    stats["empty"] += not unique
+    for flag in parser.flags:
+        stats[flag] += 1
+    result = {"triples": unique}
+    if parser.sentence is not None:
+        result["sentence"] = parser.sentence
+    return result
+
+def parse_responses(records, stats: Optional[Counter] = None):
+    """
+    Prédictions ({"id", "sentence"?, "triples"}) d'un flux de réponses ({"id", "response"}, sortie de llm_runner.py).
+    """
+    stats = stats if stats is not None else Counter()
+    for record in records:
+        yield {"id": record.get("id"), **parse_response(record.get("response"), stats)}
+
+def new_stats() -> Counter:
+    return Counter({key: 0 for key in STAT_KEYS})
+
+def format_stats(stats: Counter) -> str:
+    responses = max(stats["responses"], 1)
+    lines = [f"{stats['responses']} réponses, {stats['triples']} triplets "
+             f"({stats['list_triples']} listes, {stats['dict_triples']} dictionnaires, {stats['duplicates']} doublons retirés)"]
+    for key in ["clean", "repaired", "empty", "prose", "truncated", "unterminated_strings", "unbalanced"]:
+        lines.append(f"{key:<22}{stats[key]:>10}{100 * stats[key] / responses:>8.1f} %")
+    lines.append(f"{'invalid_items':<22}{stats['invalid_items']:>10}")
+    return "\n".join(lines)
+
+def output_path(in_path: str) -> str:
+    """
+    Fichier des prédictions d'un fichier de réponses : simple_ground_truth_test_responses.jsonl -> simple_ground_truth_test_predictions.jsonl.
+    """
+    root = os.path.splitext(in_path)[0]
+    return (root[:-len("_responses")] if root.endswith("_responses") else root) + "_predictions.jsonl"
+
+def parse_file(in_path: str, out_path: str, report_path: Optional[str] = None) -> Counter:
+    """
+    Convertit un fichier JSONL de réponses en prédictions évaluables (evaluation.py) et enregistre éventuellement les statistiques.
+    """
+    stats = new_stats()
+    fm.write_jsonl(parse_responses(fm.iter_jsonl(in_path), stats), out_path)
+    if report_path:
+        with open(report_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps(stats, ensure_ascii=False, indent=2))
+    return stats
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Extrait les triplets des réponses d'un LLM, même tronquées ou entourées de texte.")
+    parser.add_argument("inputs", nargs="+", help="Fichiers JSONL de réponses ({\"id\", \"response\"}, sortie de llm_runner.py)")
+    parser.add_argument("--report", action="store_true", help="Enregistrer les statistiques de réparation (<sortie>_report.json)")
+    args = parser.parse_args()
+
+    for in_path in args.inputs:
+        out_path = output_path(in_path)
+        start = time.perf_counter()
+        stats = parse_file(in_path, out_path, os.path.splitext(out_path)[0] + "_report.json" if args.report else None)
+        seconds = time.perf_counter() - start
+        print(f"{os.path.basename(in_path)} -> {out_path} ({stats['responses'] / max(seconds, 1e-9):.0f} réponses/s)")
+        print(format_stats(stats))
@@ -1,9 +1,16 @@
 import random
 import os
+import json
+from array import array
+import numpy as np
+import file_management as fm
 
 def split_jsonl(file_path, output_dir, train_ratio=0.8, val_ratio=0.1, test_ratio=0.1, seed=42):
     """
     Divise un fichier .jsonl en trois sous-ensembles : entraînement, validation, test.
+    Les lignes vides sont ignorées et les fins de ligne \r\n sont ramenées à \n (voir fm.iter_jsonl_lines), comme dans
+    split_jsonl_streaming() et split_jsonl_files() : seuls les enregistrements sont mélangés, si bien que le découpage
+    d'un fichier sans ligne vide est le même qu'avant, et qu'une dernière ligne sans retour à la ligne n'est plus collée à la suivante.
 
     Args:
         file_path (str): Chemin du fichier .jsonl d'entrée.
@@ -15,11 +22,10 @@ def split_jsonl(file_path, output_dir, train_ratio=0.8, val_ratio=0.1, test_rati
     """
     assert abs(train_ratio + val_ratio + test_ratio - 1.0) < 1e-6, "Les ratios doivent totaliser 1.0"
     
-    with open(file_path, 'r', encoding='utf-8') as f:
-        lines = f.readlines()
+    lines = list(fm.iter_jsonl_lines(file_path))
 
-    random.seed(seed)
-    random.shuffle(lines)
+    # Générateur propre à l'appel (même suite que random.seed(seed)) : plusieurs découpages peuvent s'exécuter en même temps
+    random.Random(seed).shuffle(lines)
 
     total = len(lines)
     train_end = int(train_ratio * total)
@@ -37,7 +43,217 @@ def split_jsonl(file_path, output_dir, train_ratio=0.8, val_ratio=0.1, test_rati
 
     # Écriture des fichiers
     for split_lines, split_file in zip([train_lines, val_lines, test_lines], [train_file, val_file, test_file]):
-        with open(split_file, 'w', encoding='utf-8') as f:
-            f.writelines(split_lines)
+        fm.write_jsonl(split_lines, split_file, encoded=True)
 
     print(f"Fichier divisé en :\n- {train_file}\n- {val_file}\n- {test_file}")
+
+def index_jsonl_lines(file_path, block_size=1 << 24):
+    """
+    Calcule la position (en octets) du début et de la fin de chaque ligne d'un fichier .jsonl, sans charger le fichier en mémoire.
+    Comme pour fm.iter_jsonl_lines(), les lignes vides (ou ne contenant que des retours chariot) sont ignorées.
+
+    Args:
+        file_path (str): Chemin du fichier .jsonl.
+        block_size (int): Taille des blocs lus.
+
+    Returns:
+        tuple: (array, array) positions de début et de fin (retour à la ligne exclu) des lignes, en entiers 64 bits.
+    """
+    file_size = os.path.getsize(file_path)
+    newlines = []
+    # Débuts de ligne suivis d'un retour chariot : seules ces lignes (rares) peuvent être vides sans être de longueur nulle
+    carriage_returns = []
+    position = 0
+    line_start = True
+
+    with open(file_path, 'rb') as f:
+        while True:
+            block = f.read(block_size)
+            if not block:
+                break
+            data = np.frombuffer(block, dtype=np.uint8)
+            is_newline = data == ord('\n')
+            newlines.append(np.flatnonzero(is_newline) + position)
+            starts_with_cr = np.concatenate(([line_start], is_newline[:-1])) & (data == ord('\r'))
+            if starts_with_cr.any():
+                carriage_returns.append(np.flatnonzero(starts_with_cr) + position)
+            line_start = bool(is_newline[-1])
+            position += len(block)
+
+    # Une ligne commence après chaque retour à la ligne et se termine au suivant (ou à la fin du fichier)
+    ends = np.concatenate(newlines + [np.array([file_size], dtype=np.int64)]).astype(np.int64)
+    starts = np.concatenate(([0], ends[:-1] + 1)).astype(np.int64)
+    kept = ends > starts
+    if carriage_returns:
+        with open(file_path, 'rb') as f:
+            for i in np.flatnonzero(kept & np.isin(starts, np.concatenate(carriage_returns))):
+                kept[i] = bool(os.pread(f.fileno(), int(ends[i] - starts[i]), int(starts[i])).strip(b'\r'))
+
+    return array('q', starts[kept].tobytes()), array('q', ends[kept].tobytes())
+
+def split_jsonl_streaming(file_path, output_dir, train_ratio=0.8, val_ratio=0.1, test_ratio=0.1, seed=42, buffer_size=1 << 20):
+    """
+    Divise un fichier .jsonl en trois sous-ensembles comme split_jsonl(), sans jamais garder le fichier en mémoire.
+
+    Seules les positions des lignes (8 octets par ligne) sont mélangées ; les lignes sont ensuite recopiées
+    une à une depuis le fichier d'entrée vers des fichiers de sortie tamponnés, terminées par un seul '\n'
+    (les lignes vides sont ignorées, comme dans split_jsonl()).
+    random.shuffle() ne dépend que du nombre d'éléments et de la graine : pour une même graine,
+    les fichiers produits sont identiques octet pour octet à ceux de split_jsonl().
+
+    Args:
+        file_path (str): Chemin du fichier .jsonl d'entrée.
+        output_dir (str): Dossier de sortie pour les fichiers divisés.
+        train_ratio (float): Ratio pour l'ensemble d'entraînement.
+        val_ratio (float): Ratio pour l'ensemble de validation.
+        test_ratio (float): Ratio pour l'ensemble de test.
+        seed (int): Graine pour le mélange aléatoire.
+        buffer_size (int): Taille des tampons d'écriture (en octets).
+    """
+    assert abs(train_ratio + val_ratio + test_ratio - 1.0) < 1e-6, "Les ratios doivent totaliser 1.0"
+
+    offsets, ends = index_jsonl_lines(file_path)
+    line_numbers = array('q', range(len(offsets)))
+
+    random.Random(seed).shuffle(line_numbers)
+
+    total = len(line_numbers)
+    train_end = int(train_ratio * total)
+    val_end = train_end + int(val_ratio * total)
+
+    # Préparer les noms des fichiers de sortie
+    base_name = os.path.splitext(os.path.basename(file_path))[0]
+    train_file = os.path.join(output_dir, f"{base_name}_train.jsonl")
+    val_file = os.path.join(output_dir, f"{base_name}_val.jsonl")
+    test_file = os.path.join(output_dir, f"{base_name}_test.jsonl")
+
+    # Recopie des lignes dans l'ordre du mélange
+    with open(file_path, 'rb', buffering=0) as source:
+        fd = source.fileno()
+        for (start, end), split_file in zip([(0, train_end), (train_end, val_end), (val_end, total)], [train_file, val_file, test_file]):
+            with open(split_file, 'wb', buffering=buffer_size) as f:
+                for i in line_numbers[start:end]:
+                    f.write(os.pread(fd, ends[i] - offsets[i], offsets[i]).rstrip(b'\r') + b'\n')
+
+    print(f"Fichier divisé en :\n- {train_file}\n- {val_file}\n- {test_file}")
+
+_json_decoder = json.JSONDecoder()
+
+def _record_id(line, id_key="id"):
+    """
+    Extrait l'identifiant d'une ligne JSONL. Les enregistrements produits par le pipeline commencent
+    par la clé `id_key` : on ne décode alors que le début de la ligne. Sinon, la ligne entière est analysée.
+    """
+    prefix = b'{"' + id_key.encode('utf-8') + b'": '
+    if line.startswith(prefix):
+        head = line[len(prefix):len(prefix) + 256].decode('utf-8', errors='ignore')
+        try:
+            return _json_decoder.raw_decode(head)[0]
+        except json.JSONDecodeError:
+            pass
+    return json.loads(line)[id_key]
+
+def index_jsonl_records(file_path, id_key="id"):
+    """
+    Parcourt une fois un fichier .jsonl et retourne la position de début et de fin et l'identifiant de chaque
+    enregistrement. Les lignes vides sont ignorées.
+
+    Returns:
+        tuple: (array, array, list) positions de début et de fin (retour à la ligne exclu) des lignes et identifiants.
+    """
+    offsets, ends = array('q'), array('q')
+    record_ids = []
+    position = 0
+
+    with open(file_path, 'rb') as f:
+        for line in f:
+            record = line.rstrip(b'\r\n')
+            if record:
+                offsets.append(position)
+                ends.append(position + len(record))
+                record_ids.append(_record_id(record, id_key))
+            position += len(line)
+
+    return offsets, ends, record_ids
+
+def assign_splits(record_ids, train_ratio=0.8, val_ratio=0.1, test_ratio=0.1, seed=42):
+    """
+    Mélange des identifiants d'enregistrements (comme split_jsonl() mélange les lignes) et les répartit
+    entre entraînement, validation et test.
+
+    Returns:
+        list: Trois listes d'identifiants (entraînement, validation, test), dans l'ordre d'écriture des enregistrements.
+    """
+    assert abs(train_ratio + val_ratio + test_ratio - 1.0) < 1e-6, "Les ratios doivent totaliser 1.0"
+
+    line_numbers = array('q', range(len(record_ids)))
+    random.Random(seed).shuffle(line_numbers)
+
+    total = len(line_numbers)
+    train_end = int(train_ratio * total)
+    val_end = train_end + int(val_ratio * total)
+    shuffled_ids = [record_ids[i] for i in line_numbers]
+    return [shuffled_ids[:train_end], shuffled_ids[train_end:val_end], shuffled_ids[val_end:]]
+
+def write_split_files(file_path, output_dir, subsets, id_key="id", buffer_size=1 << 20, index=None):
+    """
+    Écrit les sous-ensembles d'un fichier .jsonl selon une répartition de ses identifiants (voir assign_splits) :
+    chaque enregistrement est recopié, d'après son identifiant, dans le sous-ensemble et à la position indiqués.
+
+    Args:
+        file_path (str): Chemin du fichier .jsonl d'entrée.
+        output_dir (str): Dossier de sortie pour les fichiers divisés.
+        subsets (list): Identifiants des enregistrements d'entraînement, de validation et de test.
+        id_key (str): Clé identifiant un événement dans chaque enregistrement.
+        buffer_size (int): Taille des tampons d'écriture (en octets).
+        index (tuple): Résultat de index_jsonl_records() pour ce fichier, s'il a déjà été calculé.
+
+    Raises:
+        ValueError: Si le fichier ne contient pas exactement les identifiants de la répartition, ou si un identifiant est répété.
+    """
+    offsets, ends, record_ids = index or index_jsonl_records(file_path, id_key)
+    line_by_id = {record_id: i for i, record_id in enumerate(record_ids)}
+    if (len(line_by_id) != len(record_ids) or len(record_ids) != sum(len(subset) for subset in subsets)
+            or any(record_id not in line_by_id for subset in subsets for record_id in subset)):
+        raise ValueError(f"Les identifiants de {file_path} ne correspondent pas à ceux du découpage")
+
+    # Préparer les noms des fichiers de sortie
+    base_name = os.path.splitext(os.path.basename(file_path))[0]
+    split_files = [os.path.join(output_dir, f"{base_name}_{split}.jsonl") for split in ["train", "val", "test"]]
+
+    with open(file_path, 'rb', buffering=0) as source:
+        fd = source.fileno()
+        for subset, split_file in zip(subsets, split_files):
+            with open(split_file, 'wb', buffering=buffer_size) as f:
+                for record_id in subset:
+                    i = line_by_id[record_id]
+                    f.write(os.pread(fd, ends[i] - offsets[i], offsets[i]) + b'\n')
+
+    print(f"Fichier divisé en :\n- {split_files[0]}\n- {split_files[1]}\n- {split_files[2]}")
+
+def split_jsonl_files(file_paths, output_dir, train_ratio=0.8, val_ratio=0.1, test_ratio=0.1, seed=42, id_key="id", buffer_size=1 << 20):
+    """
+    Divise conjointement plusieurs fichiers .jsonl décrivant les mêmes événements (ex: versions complexe,
+    simple pour BERT et simple) : un événement donné est placé dans le même sous-ensemble pour tous les fichiers.
+
+    Le mélange est tiré une seule fois sur les identifiants du premier fichier (voir assign_splits), puis appliqué
+    à chaque fichier via son identifiant (voir write_split_files). Lorsque les fichiers sont alignés ligne à ligne,
+    le résultat est identique octet pour octet à des appels séparés à split_jsonl() avec la même graine.
+
+    Args:
+        file_paths (list): Chemins des fichiers .jsonl d'entrée.
+        output_dir (str): Dossier de sortie pour les fichiers divisés.
+        train_ratio (float): Ratio pour l'ensemble d'entraînement.
+        val_ratio (float): Ratio pour l'ensemble de validation.
+        test_ratio (float): Ratio pour l'ensemble de test.
+        seed (int): Graine pour le mélange aléatoire.
+        id_key (str): Clé identifiant un événement dans chaque enregistrement.
+        buffer_size (int): Taille des tampons d'écriture (en octets).
+
+    Raises:
+        ValueError: Si les fichiers ne contiennent pas exactement les mêmes identifiants, ou si un identifiant est répété.
+    """
+    reference = index_jsonl_records(file_paths[0], id_key)
+    subsets = assign_splits(reference[2], train_ratio, val_ratio, test_ratio, seed)
+    for i, file_path in enumerate(file_paths):
+        write_split_files(file_path, output_dir, subsets, id_key, buffer_size, index=reference if i == 0 else None)
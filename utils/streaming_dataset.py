@@ -0,0 +1,205 @@
+import os
+import tempfile
+import pandas as pd
+import event_description_generator as edg
+import file_management as fm
+import triple_file as tf
+
+def iter_sorted_event_frames(chunks, event_column="event_id"):
+    """
+    Regroupe des morceaux de DataFrame triés par event_id en DataFrames ne contenant que des événements complets.
+    Les lignes du dernier événement d'un morceau sont conservées et ajoutées au morceau suivant,
+    car cet événement peut se poursuivre au-delà de la frontière du morceau.
+
+    Args:
+        chunks (iterable): Morceaux de DataFrame dont la colonne `event_column` est triée.
+        event_column (str): Nom de la colonne identifiant l'événement.
+
+    Yields:
+        pd.DataFrame: DataFrame d'événements complets.
+    """
+    carry = None
+    previous_event = None
+
+    for chunk in chunks:
+        chunk = chunk[chunk[event_column].notna()]
+        if chunk.empty:
+            continue
+
+        events = chunk[event_column]
+        if not events.is_monotonic_increasing or (previous_event is not None and events.iloc[0] < previous_event):
+            raise ValueError(f"Le fichier n'est pas trié selon la colonne '{event_column}' : utilisez le tri externe (assume_sorted=False)")
+        previous_event = events.iloc[-1]
+
+        if carry is not None:
+            chunk = pd.concat([carry, chunk], ignore_index=True)
+            events = chunk[event_column]
+
+        is_last_event = (events == events.iloc[-1]).to_numpy()
+        carry = chunk[is_last_event]
+        if not is_last_event.all():
+            yield chunk[~is_last_event]
+
+    if carry is not None:
+        yield carry
+
+def event_ids_are_numeric(in_path, separator="\t", chunksize=1_000_000, event_column="event_id") -> bool:
+    """
+    Indique si la colonne event_id du fichier est lue comme des entiers par edg.read_ground_truth() (type déduit par Pandas).
+    Seule cette colonne est lue : les identifiants sont alors convertis en entiers dans chaque morceau (voir iter_event_frames),
+    si bien que l'ordre des événements et les identifiants produits sont ceux du mode en mémoire.
+    """
+    for chunk in pd.read_csv(in_path, sep=separator, encoding="utf-8", usecols=[event_column], chunksize=chunksize):
+        if not pd.api.types.is_integer_dtype(chunk[event_column]):
+            return False
+    return True
+
+def with_numeric_event_ids(chunks, event_column="event_id"):
+    """
+    Convertit en entiers les event_id de morceaux lus en chaînes (voir event_ids_are_numeric).
+    """
+    for chunk in chunks:
+        chunk[event_column] = chunk[event_column].astype("int64")
+        yield chunk
+
+def write_sorted_runs(chunks, run_dir, event_column="event_id"):
+    """
+    Première étape du tri externe : chaque morceau est trié par event_id (tri stable, l'ordre des lignes
+    d'un même événement est conservé) puis déversé sur disque dans un fichier temporaire.
+
+    Returns:
+        list: Chemins des fichiers triés, dans l'ordre de lecture des morceaux.
+    """
+    run_paths = []
+    for i, chunk in enumerate(chunks):
+        chunk = chunk[chunk[event_column].notna()].sort_values(event_column, kind="stable")
+        run_path = os.path.join(run_dir, f"run_{i:06d}.tsv")
+        chunk.to_csv(run_path, sep="\t", index=False, encoding="utf-8")
+        run_paths.append(run_path)
+    return run_paths
+
+def merge_sorted_runs(run_paths, chunksize, event_column="event_id", numeric_ids=False):
+    """
+    Seconde étape du tri externe : fusion k-voies des fichiers triés, morceau par morceau.
+    À chaque tour, on émet toutes les lignes dont l'event_id est strictement inférieur à la borne,
+    c'est-à-dire au plus petit « dernier event_id chargé » parmi les fichiers non épuisés :
+    aucune ligne restant à lire ne peut les précéder. Les fichiers qui atteignent la borne sont ensuite rechargés.
+    À égalité d'event_id, les lignes du fichier le plus ancien passent en premier, comme dans le fichier d'origine.
+
+    Chaque fichier est lu par morceaux de chunksize / nombre de fichiers lignes (au moins 1000), si bien que
+    la mémoire occupée par les tampons reste de l'ordre de `chunksize` lignes tant que le nombre de fichiers est raisonnable.
+    Avec `numeric_ids`, les event_id relus sont convertis en entiers (voir with_numeric_event_ids).
+
+    Yields:
+        pd.DataFrame: Morceaux triés par event_id, ne contenant que des événements complets.
+    """
+    run_chunksize = max(min(chunksize, 1_000), chunksize // max(1, len(run_paths)))
+    readers = [fm.read_csv_in_chunks(path, separator="\t", chunksize=run_chunksize) for path in run_paths]
+    if numeric_ids:
+        readers = [with_numeric_event_ids(reader, event_column) for reader in readers]
+    buffers = [None] * len(readers)
+    exhausted = [False] * len(readers)
+
+    def refill(i):
+        following = next(readers[i], None)
+        if following is None:
+            exhausted[i] = True
+        else:
+            buffers[i] = following if buffers[i] is None else pd.concat([buffers[i], following], ignore_index=True)
+
+    for i in range(len(readers)):
+        refill(i)
+
+    while True:
+        loaded = [i for i in range(len(readers)) if buffers[i] is not None]
+        live = [i for i in loaded if not exhausted[i]]
+        if not live:
+            break
+        watermark = min(buffers[i][event_column].iloc[-1] for i in live)
+
+        ready = []
+        for i in loaded:
+            before = (buffers[i][event_column] < watermark).to_numpy()
+            ready.append(buffers[i][before])
+            buffers[i] = buffers[i][~before]
+        for i in live:
+            if buffers[i].empty or buffers[i][event_column].iloc[-1] == watermark:
+                refill(i)
+
+        merged = pd.concat(ready, ignore_index=True)
+        if not merged.empty:
+            yield merged.sort_values(event_column, kind="stable")
+
+    remaining = [buffers[i] for i in range(len(readers)) if buffers[i] is not None]
+    if remaining:
+        merged = pd.concat(remaining, ignore_index=True)
+        if not merged.empty:
+            yield merged.sort_values(event_column, kind="stable")
+
+def iter_event_frames(in_path, separator="\t", chunksize=100_000, assume_sorted=True, tmp_dir=None):
+    """
+    Lit un fichier CSV de vérité terrain par morceaux et produit des DataFrames d'événements complets,
+    dans l'ordre croissant des event_id (le même que df.groupby("event_id")). Comme avec edg.read_ground_truth(),
+    les event_id sont des entiers s'ils sont tous numériques (une lecture préalable de la seule colonne event_id le vérifie),
+    des chaînes sinon.
+
+    Args:
+        in_path (str): Chemin du fichier CSV.
+        separator (str): Séparateur du fichier CSV.
+        chunksize (int): Nombre de lignes lues à la fois.
+        assume_sorted (bool): Si True, le fichier doit être trié par event_id ; sinon un tri externe
+            (déversement de morceaux triés sur disque puis fusion) est effectué au préalable.
+        tmp_dir (str): Dossier des fichiers temporaires du tri externe (dossier temporaire du système par défaut).
+
+    Yields:
+        pd.DataFrame: DataFrame d'événements complets.
+    """
+    # Seules les colonnes de EventData sont lues (et recopiées dans les fichiers du tri externe)
+    chunks = fm.read_csv_in_chunks(in_path, separator=separator, chunksize=chunksize, usecols=lambda column: column in edg.EventData._fields)
+    numeric_ids = event_ids_are_numeric(in_path, separator=separator)
+    if numeric_ids:
+        chunks = with_numeric_event_ids(chunks)
+    if assume_sorted:
+        yield from iter_sorted_event_frames(chunks)
+        return
+
+    with tempfile.TemporaryDirectory(dir=tmp_dir) as run_dir:
+        run_paths = write_sorted_runs(chunks, run_dir)
+        yield from iter_sorted_event_frames(merge_sorted_runs(run_paths, chunksize, numeric_ids=numeric_ids))
+
+def convert_csv_to_jsonl_streaming(in_path, out_paths, separator="\t", chunksize=100_000, assume_sorted=True, tmp_dir=None, workers=1,
+                                   id_allocator=None, triple_paths=None, variants=edg.VARIANTS, landmark_registry=None, report=None):
+    """
+    Convertit la vérité terrain en fichiers JSONL (simple, simple pour BERT, complexe) sans jamais charger
+    le fichier entier : la mémoire utilisée dépend de la taille des morceaux, pas de celle du fichier.
+    Les enregistrements sont ajoutés aux fichiers de sortie dès qu'un événement est complet.
+
+    Args:
+        in_path (str): Chemin du fichier CSV.
+        out_paths (list): Chemins des fichiers JSONL des versions `variants` (par défaut simple, simple pour BERT et complexe).
+        separator (str): Séparateur du fichier CSV.
+        chunksize (int): Nombre de lignes lues à la fois.
+        assume_sorted (bool): Si True, le fichier doit être trié par event_id, sinon un tri externe est effectué.
+        tmp_dir (str): Dossier des fichiers temporaires du tri externe.
+        workers (int): Nombre de processus de travail pour la génération des descriptions.
+        id_allocator: Allocateur des identifiants des descriptions complexes (voir id_allocators.py).
+        triple_paths (list): Si donné, chemins des fichiers .triples (format colonnaire, voir triple_file.py)
+            écrits en même temps que les fichiers JSONL.
+        variants (tuple): Versions produites, dans l'ordre de `out_paths` (ex. ("bert_simple",)).
+        landmark_registry: Registre des repères partagé par tous les événements (voir landmark_registry.py).
+        report (PipelineReport): Si donné, la lecture et la génération y sont mesurées à part de l'écriture,
+            dans l'étape "generate" (voir pipeline_report.PipelineReport.timed_iter).
+    """
+    frames = iter_event_frames(in_path, separator=separator, chunksize=chunksize, assume_sorted=assume_sorted, tmp_dir=tmp_dir)
+    if triple_paths or tuple(variants) != edg.VARIANTS:
+        tables = edg.iter_frames_event_tables(frames, batch_size=chunksize, workers=workers, id_allocator=id_allocator, variants=variants,
+                                              landmark_registry=landmark_registry)
+        if report:
+            tables = report.timed_iter("generate", tables, count=lambda batch: batch[0].n_events)
+        tf.write_event_tables(tables, out_paths, triple_paths)
+        return
+    event_descriptions = edg.iter_frames_event_descriptions(frames, batch_size=chunksize, workers=workers, as_json=True,
+                                                            id_allocator=id_allocator, landmark_registry=landmark_registry)
+    if report:
+        event_descriptions = report.timed_iter("generate", event_descriptions)
+    fm.write_jsonl_files(event_descriptions, out_paths, encoded=True)